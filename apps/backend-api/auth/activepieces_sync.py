@@ -15,10 +15,14 @@ This approach:
 """
 
 import os
-import httpx
-from typing import Optional, Tuple
+import time
+from jose import jwt
+from typing import Any, Dict, Optional, Tuple
 
 from auth.signing_key import create_activepieces_jwt
+from cache import AsyncTTLCache
+from executors import run_blocking
+from http_clients import get_http_client
 
 
 ACTIVEPIECES_URL = os.getenv("ACTIVEPIECES_URL", "")
@@ -28,6 +32,69 @@ _is_cloud_run = os.getenv("K_SERVICE") is not None
 _has_local_ap_url = "activepieces:80" in ACTIVEPIECES_URL or "localhost" in ACTIVEPIECES_URL
 ACTIVEPIECES_AVAILABLE = bool(ACTIVEPIECES_URL) and not (_is_cloud_run and _has_local_ap_url)
 
+# Session token cache, keyed by (user, project, role)
+ACTIVEPIECES_SESSION_CACHE_SIZE = int(os.getenv("ACTIVEPIECES_SESSION_CACHE_SIZE", "4096"))
+# Lifetime assumed for session tokens that carry no readable `exp`
+ACTIVEPIECES_SESSION_TTL = int(os.getenv("ACTIVEPIECES_SESSION_TTL", "3600"))
+# Start a background refresh this many seconds before a session expires
+ACTIVEPIECES_SESSION_REFRESH_MARGIN = int(os.getenv("ACTIVEPIECES_SESSION_REFRESH_MARGIN", "300"))
+# How long a failed exchange is remembered before it is retried
+ACTIVEPIECES_SESSION_FAILURE_TTL = float(os.getenv("ACTIVEPIECES_SESSION_FAILURE_TTL", "5"))
+
+_session_cache = AsyncTTLCache(maxsize=ACTIVEPIECES_SESSION_CACHE_SIZE, name="activepieces_sessions")
+
+
+async def _exchange_session(
+    user_id: str,
+    project_id: str,
+    first_name: str,
+    last_name: str,
+    role: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """Exchange a freshly minted JWT for a session token (uncached)."""
+    try:
+        # Step 1: Generate JWT using Bronn's signing key (RSA, off the event loop)
+        external_token = await run_blocking(
+            "signing",
+            create_activepieces_jwt,
+            user_id=user_id,
+            project_id=project_id,
+            first_name=first_name,
+            last_name=last_name,
+            role=role,
+            expires_in_minutes=5
+        )
+        
+        # Step 2: Exchange JWT for Activepieces session
+        # NOTE: Activepieces nginx routes /api/* to the Node.js backend
+        response = await get_http_client("activepieces").request(
+            "POST",
+            f"{ACTIVEPIECES_URL}/api/v1/managed-authn/external-token",
+            route="managed_auth",
+            json={"externalAccessToken": external_token}
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("token"), None
+        else:
+            error_detail = response.text[:200] if response.text else "Unknown error"
+            return None, f"Managed auth failed: {response.status_code} - {error_detail}"
+                
+    except Exception as e:
+        return None, f"Could not authenticate with Activepieces: {e}"
+
+
+def _session_expiry(token: str) -> float:
+    """Expiry of a session token: its `exp` claim if readable, else the default TTL."""
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+        if isinstance(exp, (int, float)):
+            return float(exp)
+    except Exception:
+        pass
+    return time.time() + ACTIVEPIECES_SESSION_TTL
+
 
 async def get_activepieces_session(
     user_id: str,
@@ -42,6 +109,12 @@ async def get_activepieces_session(
     This is the PRIMARY and ONLY way to authenticate with Activepieces
     when AP_BRONN_AUTH_MODE=managed is set.
     
+    Session tokens are cached per (user, project, role) and refreshed in
+    the background ACTIVEPIECES_SESSION_REFRESH_MARGIN seconds before they
+    expire. Concurrent calls for the same key share one exchange, and a
+    failed exchange is remembered for ACTIVEPIECES_SESSION_FAILURE_TTL
+    seconds so a struggling Activepieces isn't hammered by retries.
+    
     Args:
         user_id: Bronn user ID (becomes externalUserId)
         project_id: Bronn project/workspace ID (becomes externalProjectId)
@@ -55,34 +128,33 @@ async def get_activepieces_session(
     if not ACTIVEPIECES_AVAILABLE:
         return None, "Activepieces not configured"
     
-    try:
-        # Step 1: Generate JWT using Bronn's signing key
-        external_token = create_activepieces_jwt(
-            user_id=user_id,
-            project_id=project_id,
-            first_name=first_name,
-            last_name=last_name,
-            role=role,
-            expires_in_minutes=5
-        )
+    key = (user_id, project_id, role)
+    
+    async def load():
+        token, error = await _exchange_session(user_id, project_id, first_name, last_name, role)
+        now = time.time()
+        if token:
+            expires_at = _session_expiry(token)
+            return (token, None), expires_at, expires_at - ACTIVEPIECES_SESSION_REFRESH_MARGIN
         
-        # Step 2: Exchange JWT for Activepieces session
-        # NOTE: Activepieces nginx routes /api/* to the Node.js backend
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                f"{ACTIVEPIECES_URL}/api/v1/managed-authn/external-token",
-                json={"externalAccessToken": external_token}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("token"), None
-            else:
-                error_detail = response.text[:200] if response.text else "Unknown error"
-                return None, f"Managed auth failed: {response.status_code} - {error_detail}"
-                
-    except Exception as e:
-        return None, f"Could not authenticate with Activepieces: {e}"
+        current = _session_cache.peek(key)
+        if current and current[0][0]:
+            # A background refresh failed: keep serving the still-valid
+            # token and retry after the backoff
+            return current[0], current[1], now + ACTIVEPIECES_SESSION_FAILURE_TTL
+        return (None, error), now + ACTIVEPIECES_SESSION_FAILURE_TTL, None
+    
+    return await _session_cache.get_or_load(key, load)
+
+
+def invalidate_activepieces_session(user_id: str, project_id: str, role: str = "EDITOR") -> None:
+    """Drop a cached session token (e.g. after Activepieces rejected it)."""
+    _session_cache.invalidate((user_id, project_id, role))
+
+
+def get_session_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the session token cache."""
+    return _session_cache.stats()
 
 
 async def ensure_user_in_activepieces(
@@ -2,6 +2,7 @@
 Authentication Dependencies
 
 Common dependencies for FastAPI routes to handle Firebase authentication.
+Both Firebase ID tokens and Bronn session tokens are accepted.
 """
 
 from fastapi import Depends, HTTPException, Header
@@ -9,18 +10,49 @@ from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 
 from database import get_db, set_db_context
+from executors import run_blocking
 from auth.firebase_auth import verify_firebase_token
-from models.user import User
+from auth.session_tokens import decode_session_token, is_session_token, session_claims_to_decoded
+from auth.user_sync import UserSnapshot, get_user_snapshot
+
+
+def _load_user(db: Session, decoded: Dict[str, Any]) -> UserSnapshot:
+    """Fetch or auto-provision the user and set the RLS context (blocking)."""
+    # Cached read-only snapshot, auto-provisioning on first access
+    user = get_user_snapshot(db, decoded)
+    
+    # Set DB context for RLS and auditing
+    # Default to 'default' tenant if not specified in claims
+    tenant_id = decoded.get("tenant_id", "default")
+    set_db_context(db, tenant_id, user.email)
+    
+    return user
+
+
+async def verify_request_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a bearer token and return Firebase-shaped claims, or None.
+
+    Bronn session tokens are an HMAC check done inline; Firebase ID tokens
+    go to the auth pool.
+    """
+    if is_session_token(token):
+        claims = decode_session_token(token)
+        return session_claims_to_decoded(claims) if claims else None
+    return await run_blocking("auth", verify_firebase_token, token)
+
 
 async def get_current_user(
     authorization: str = Header(...),
     db: Session = Depends(get_db)
-) -> User:
+) -> UserSnapshot:
     """
-    Dependency to get the current authenticated user from a Firebase ID token.
+    Dependency to get the current authenticated user from a Firebase ID token
+    or a Bronn session token.
     
     Verifies the token, fetches/syncs the user to the database, and sets
-    the database context for RLS/Auditing.
+    the database context for RLS/Auditing. The user is a read-only snapshot
+    served from an in-process cache; it is not attached to `db`.
     """
     # Extract token from "Bearer <token>"
     if not authorization.startswith("Bearer "):
@@ -30,28 +62,9 @@ async def get_current_user(
     if not token:
         raise HTTPException(status_code=401, detail="No token provided")
     
-    # Verify with Firebase
-    decoded = verify_firebase_token(token)
+    # Verify the session token inline, or Firebase off the event loop
+    decoded = await verify_request_token(token)
     if not decoded:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    firebase_uid = decoded["uid"]
-    email = decoded.get("email", "")
-    
-    # Find user in database
-    user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
-    
-    if not user:
-        # Auto-provision user on first access if they authenticated with Firebase
-        from datetime import datetime
-        user = User.from_firebase_token(decoded)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    
-    # Set DB context for RLS and auditing
-    # Default to 'default' tenant if not specified in claims
-    tenant_id = decoded.get("tenant_id", "default")
-    set_db_context(db, tenant_id, user.email)
-    
-    return user
+    return await run_blocking("db", _load_user, db, decoded)
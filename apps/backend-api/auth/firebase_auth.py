@@ -6,16 +6,48 @@ Integrates with Google Cloud Run and Cloud SQL.
 """
 
 import os
+import re
+import time
+import hashlib
+import threading
+import httpx
 import firebase_admin
 from firebase_admin import auth, credentials
-from typing import Optional, Dict, Any
+from jose import jwk, jwt, JWTError
+from typing import Optional, Dict, Any, Tuple, Callable
 import logging
 
+from cache import TTLCache
+from auth.session_tokens import revoke_user
+
 logger = logging.getLogger(__name__)
 
 # Track initialization state
 _firebase_initialized = False
 
+# Verified-token cache: decoded claims keyed by SHA-256 of the ID token.
+# Entries never outlive the token's own `exp`, and are further capped by
+# FIREBASE_TOKEN_CACHE_TTL so that revocations propagate eventually.
+FIREBASE_TOKEN_CACHE_SIZE = int(os.getenv("FIREBASE_TOKEN_CACHE_SIZE", "2048"))
+FIREBASE_TOKEN_CACHE_TTL = int(os.getenv("FIREBASE_TOKEN_CACHE_TTL", "300"))
+
+_token_cache = TTLCache(maxsize=FIREBASE_TOKEN_CACHE_SIZE, name="firebase_tokens")
+
+# Local verification: check ID tokens against an in-memory copy of Google's
+# signing certs instead of going through the Admin SDK. Set to "false" to
+# fall back to auth.verify_id_token.
+FIREBASE_LOCAL_VERIFY = os.getenv("FIREBASE_LOCAL_VERIFY", "true").lower() == "true"
+FIREBASE_CERTS_URL = os.getenv(
+    "FIREBASE_CERTS_URL",
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+# Refresh the cert set once this fraction of its Cache-Control max-age has elapsed
+FIREBASE_CERTS_REFRESH_FRACTION = float(os.getenv("FIREBASE_CERTS_REFRESH_FRACTION", "0.8"))
+# Allowed clock skew (seconds) when checking exp/iat
+FIREBASE_CLOCK_SKEW = int(os.getenv("FIREBASE_CLOCK_SKEW", "30"))
+# How long (seconds) a verification waits for the startup cert prefetch
+FIREBASE_CERTS_WAIT = float(os.getenv("FIREBASE_CERTS_WAIT", "5"))
+
 
 def init_firebase() -> bool:
     """
@@ -67,17 +99,250 @@ def init_firebase() -> bool:
         return False
 
 
-def verify_firebase_token(id_token: str) -> Optional[Dict[str, Any]]:
+# =============================================================================
+# Local ID Token Verification
+# =============================================================================
+
+# A key source returns ({kid: PEM certificate or public key}, max_age_seconds)
+KeySource = Callable[[], Tuple[Dict[str, str], float]]
+
+
+def fetch_google_certs() -> Tuple[Dict[str, str], float]:
     """
-    Verify a Firebase ID token.
+    Fetch Google's securetoken x509 certs and their Cache-Control max-age.
     
-    Args:
-        id_token: The Firebase ID token from the client
-        
-    Returns:
-        Decoded token payload if valid, None otherwise.
-        Payload includes: uid, email, email_verified, name, picture, etc.
+    This is the default key source for FirebaseTokenVerifier.
+    """
+    response = httpx.get(FIREBASE_CERTS_URL, timeout=10.0)
+    response.raise_for_status()
+    
+    max_age = 3600.0
+    match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+    if match:
+        max_age = float(match.group(1))
+    return response.json(), max_age
+
+
+class FirebaseTokenVerifier:
+    """
+    Verifies Firebase ID tokens locally against an in-memory cert set.
+    
+    The cert set is prefetched by a background thread started at app
+    startup and refreshed ahead of its Cache-Control expiry, so
+    verification itself never does network I/O: a token arriving before
+    the first load waits for it (up to FIREBASE_CERTS_WAIT) instead of
+    fetching on its own, and is rejected at once while the first load is
+    failing. Without the thread, the first verification loads the certs
+    once for all concurrent callers. The key source is injectable, which
+    lets tests and benchmarks use a local stand-in issuer.
     """
+    
+    def __init__(
+        self,
+        project_id: str,
+        key_source: KeySource = fetch_google_certs,
+        refresh_fraction: float = FIREBASE_CERTS_REFRESH_FRACTION,
+        clock_skew: int = FIREBASE_CLOCK_SKEW,
+        min_refresh_interval: float = 60.0,
+    ):
+        self.project_id = project_id
+        self.issuer = f"https://securetoken.google.com/{project_id}"
+        self.key_source = key_source
+        self.refresh_fraction = refresh_fraction
+        self.clock_skew = clock_skew
+        self.min_refresh_interval = min_refresh_interval
+        
+        self._keys: Dict[str, Any] = {}
+        self._next_refresh_at = 0.0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._cold_failed = False
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+    
+    @property
+    def ready(self) -> bool:
+        """True once a cert set has been loaded."""
+        return bool(self._keys)
+    
+    def refresh(self) -> bool:
+        """Reload the cert set from the key source. Returns True on success."""
+        try:
+            certs, max_age = self.key_source()
+            keys = {kid: jwk.construct(pem, "RS256") for kid, pem in certs.items()}
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.warning(f"Failed to refresh Firebase signing certs: {e}")
+            return False
+        
+        with self._lock:
+            self._keys = keys
+            self._next_refresh_at = time.time() + max(
+                self.min_refresh_interval, max_age * self.refresh_fraction
+            )
+        self._loaded.set()
+        self.refreshes += 1
+        logger.debug(f"Loaded {len(keys)} Firebase signing certs (max-age {max_age}s)")
+        return True
+    
+    def start(self) -> None:
+        """Start the background refresh thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="firebase-cert-refresh", daemon=True
+        )
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def _wait_for_keys(self) -> None:
+        """
+        Block until the first cert set is loaded, sharing a single load.
+        
+        With the refresher running, only a load attempt that is pending or
+        in flight is waited for: once one has failed (or a wait has timed
+        out), callers fail fast until the refresher's next attempt starts.
+        """
+        if self._thread and self._thread.is_alive():
+            if not self._cold_failed and not self._loaded.wait(timeout=FIREBASE_CERTS_WAIT):
+                self._cold_failed = True
+            return
+        with self._load_lock:
+            if not self._keys:
+                self.refresh()
+    
+    def _run(self) -> None:
+        backoff = 5.0
+        while not self._stopped.is_set():
+            if time.time() >= self._next_refresh_at:
+                # Cold verifications may wait for this attempt again
+                self._cold_failed = False
+                if self.refresh():
+                    backoff = 5.0
+                else:
+                    # Keep serving the previous cert set while retrying
+                    self._cold_failed = not self._keys
+                    self._next_refresh_at = time.time() + backoff
+                    backoff = min(backoff * 2, 300.0)
+            
+            self._wakeup.wait(timeout=max(1.0, self._next_refresh_at - time.time()))
+            self._wakeup.clear()
+    
+    def verify(self, id_token: str) -> Dict[str, Any]:
+        """
+        Verify signature, aud, iss, exp, iat and sub of an ID token.
+        
+        Returns the decoded claims with `uid` set, as the Admin SDK does.
+        Raises JWTError if the token is invalid.
+        """
+        if not self._keys:
+            self._wait_for_keys()
+            if not self._keys:
+                raise JWTError("Firebase signing certs are not loaded")
+        
+        header = jwt.get_unverified_header(id_token)
+        if header.get("alg") != "RS256":
+            raise JWTError("ID token must be signed with RS256")
+        
+        key = self._keys.get(header.get("kid"))
+        if key is None:
+            # Unknown kid: nudge the refresher, but don't fetch inline
+            self._wakeup.set()
+            raise JWTError("ID token signed with unknown key")
+        
+        claims = jwt.decode(
+            id_token,
+            key,
+            algorithms=["RS256"],
+            audience=self.project_id,
+            issuer=self.issuer,
+            options={"leeway": self.clock_skew, "require_exp": True, "require_iat": True},
+        )
+        
+        now = time.time()
+        if claims.get("iat", 0) > now + self.clock_skew:
+            raise JWTError("ID token issued in the future")
+        if claims.get("auth_time", 0) > now + self.clock_skew:
+            raise JWTError("ID token auth_time is in the future")
+        sub = claims.get("sub")
+        if not isinstance(sub, str) or not sub or len(sub) > 128:
+            raise JWTError("ID token has an invalid subject")
+        
+        claims["uid"] = sub
+        return claims
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            "keys": len(self._keys),
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "next_refresh_in": max(0.0, round(self._next_refresh_at - time.time(), 1)),
+        }
+
+
+_local_verifier: Optional[FirebaseTokenVerifier] = None
+
+
+def get_local_verifier() -> Optional[FirebaseTokenVerifier]:
+    """Return the process-wide local verifier, or None if disabled."""
+    global _local_verifier
+    
+    if _local_verifier is None and FIREBASE_LOCAL_VERIFY:
+        project_id = os.getenv("FIREBASE_PROJECT_ID") or os.getenv("GCP_PROJECT_ID")
+        if project_id:
+            _local_verifier = FirebaseTokenVerifier(project_id)
+    return _local_verifier
+
+
+def set_local_verifier(verifier: Optional[FirebaseTokenVerifier]) -> None:
+    """Install a verifier (e.g. one backed by a local stand-in issuer)."""
+    global _local_verifier
+    
+    if _local_verifier is not None and _local_verifier is not verifier:
+        _local_verifier.stop()
+    _local_verifier = verifier
+    _token_cache.clear()
+
+
+def start_token_verifier() -> None:
+    """Prefetch signing certs and start background refresh (app startup)."""
+    verifier = get_local_verifier()
+    if verifier:
+        verifier.start()
+
+
+def stop_token_verifier() -> None:
+    """Stop background cert refresh (app shutdown)."""
+    if _local_verifier:
+        _local_verifier.stop()
+
+
+def _verify_id_token_uncached(id_token: str) -> Optional[Dict[str, Any]]:
+    """Verify an ID token, bypassing the cache."""
+    verifier = get_local_verifier()
+    if verifier:
+        try:
+            return verifier.verify(id_token)
+        except JWTError as e:
+            logger.warning(f"Invalid token: {e}")
+            return None
+        except Exception as e:
+            print(f"Token verification failed: {e}")
+            return None
+    
     if not init_firebase():
         print("Firebase not initialized, cannot verify token")
         return None
@@ -102,6 +367,59 @@ def verify_firebase_token(id_token: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def _token_cache_key(id_token: str) -> str:
+    """Cache key for an ID token - never keep raw bearer tokens in memory."""
+    return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+
+def _load_verified_token(id_token: str) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+    """Verify a token and work out how long its claims may be cached."""
+    decoded = _verify_id_token_uncached(id_token)
+    if not decoded:
+        # Failures are not cached; waiting callers still share the result
+        return None, None
+    
+    expires_at = time.time() + FIREBASE_TOKEN_CACHE_TTL
+    exp = decoded.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, float(exp))
+    return decoded, expires_at
+
+
+def verify_firebase_token(id_token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a Firebase ID token.
+    
+    Tokens are checked locally against the prefetched signing certs when
+    FIREBASE_LOCAL_VERIFY is on, and through the Admin SDK otherwise.
+    Verified claims are cached in-process until the token expires, and
+    concurrent verifications of the same token are merged into one.
+    
+    Args:
+        id_token: The Firebase ID token from the client
+        
+    Returns:
+        Decoded token payload if valid, None otherwise.
+        Payload includes: uid, email, email_verified, name, picture, etc.
+    """
+    decoded = _token_cache.get_or_load(
+        _token_cache_key(id_token),
+        lambda: _load_verified_token(id_token)
+    )
+    # Hand out a copy so callers can't mutate the shared cache entry
+    return dict(decoded) if decoded else None
+
+
+def invalidate_cached_token(id_token: str) -> None:
+    """Drop a token from the verification cache (e.g. on sign-out)."""
+    _token_cache.invalidate(_token_cache_key(id_token))
+
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the verified-token cache."""
+    return _token_cache.stats()
+
+
 def get_firebase_user(uid: str) -> Optional[Dict[str, Any]]:
     """
     Get Firebase user by UID.
@@ -120,6 +438,8 @@ def get_firebase_user(uid: str) -> Optional[Dict[str, Any]]:
             'display_name': user.display_name,
             'photo_url': user.photo_url,
             'disabled': user.disabled,
+            # Tokens issued before this (epoch seconds) were revoked
+            'tokens_valid_after': (user.tokens_valid_after_timestamp or 0) / 1000,
             'provider_data': [
                 {'provider_id': p.provider_id, 'email': p.email}
                 for p in user.provider_data
@@ -227,6 +547,9 @@ def update_firebase_user(
         if update_args:
             auth.update_user(uid, **update_args)
             print(f"Updated Firebase user: {uid}")
+        if disabled or password is not None:
+            # End the user's Bronn sessions too, on every instance
+            revoke_user(uid)
         return True
         
     except Exception as e:
@@ -246,6 +569,7 @@ def delete_firebase_user(uid: str) -> bool:
     try:
         auth.delete_user(uid)
         print(f"Deleted Firebase user: {uid}")
+        revoke_user(uid)
         return True
     except auth.UserNotFoundError:
         logger.warning(f"User not found for deletion: {uid}")
@@ -255,6 +579,25 @@ def delete_firebase_user(uid: str) -> bool:
         return False
 
 
+def revoke_firebase_tokens(uid: str) -> bool:
+    """
+    Revoke a user's Firebase refresh tokens and every Bronn session.
+    
+    Returns True if successful.
+    """
+    if not init_firebase():
+        return False
+    
+    try:
+        auth.revoke_refresh_tokens(uid)
+        revoke_user(uid)
+        print(f"Revoked tokens for Firebase user: {uid}")
+        return True
+    except Exception as e:
+        print(f"Failed to revoke tokens: {e}")
+        return False
+
+
 def create_custom_token(uid: str, claims: Optional[Dict] = None) -> Optional[str]:
     """
     Create a custom token for a user.
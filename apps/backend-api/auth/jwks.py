@@ -0,0 +1,39 @@
+"""
+Signing Key Publication
+
+HTTP responses for the public half of the Activepieces signing keys: the
+JWKS document (all active kids) and the legacy single-PEM endpoint. Both
+carry a strong ETag and Cache-Control, and answer If-None-Match with 304,
+so verifiers can cache keys and revalidate cheaply.
+"""
+
+import json
+
+from fastapi import Request, Response
+
+from auth.signing_key import JWKS_MAX_AGE, get_jwks, get_public_key
+from proxy_cache import etag_matches, strong_etag
+
+
+def _cacheable(request: Request, body: bytes, etag: str, media_type: str) -> Response:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={JWKS_MAX_AGE}",
+    }
+    if etag_matches(request.headers, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def jwks_response(request: Request) -> Response:
+    """The JWKS document for all active signing keys."""
+    body, etag = get_jwks()
+    return _cacheable(request, body, etag, "application/jwk-set+json")
+
+
+def public_key_response(request: Request) -> Response:
+    """The current key as {"keyId", "publicKey"} (PEM), for older verifiers."""
+    key_id, public_key = get_public_key()
+    body = json.dumps({"keyId": key_id, "publicKey": public_key}).encode()
+    etag = strong_etag(body)
+    return _cacheable(request, body, etag, "application/json")
@@ -0,0 +1,404 @@
+"""
+Bronn Session Tokens
+
+Short-lived tokens issued by /api/auth/verify-token once the Firebase ID
+token has been verified. Later requests present the session token instead,
+which is checked with a single HMAC (HS256) in-process: no Google certs,
+no Firebase round trip.
+
+A session comes with a longer-lived refresh token. POST /api/auth/refresh
+trades it for a new pair (the old refresh token is revoked on use), and
+POST /api/auth/logout revokes both. Refreshing keeps the original login
+time (auth_time): no session outlives BRONN_SESSION_MAX_AGE, and each
+refresh re-checks that the account still exists and is enabled.
+
+Revocations are shared through the revoked_tokens and user_revocations
+tables. Refresh tokens are redeemed by inserting their id, so each works
+once across all instances. Session tokens are checked against an
+in-memory copy, pulled from the database every
+BRONN_REVOCATION_SYNC_INTERVAL seconds, so a logout or account revocation
+on one instance takes effect on the others within that interval (and
+survives restarts).
+
+Sessions fail closed: unless BRONN_SESSION_SECRET is set (at least
+BRONN_SESSION_SECRET_MIN_LENGTH characters) none are issued and none are
+accepted. There is deliberately no fallback to JWT_SECRET_KEY, whose
+default is a published placeholder.
+
+Bearer tokens of either kind are verified by
+auth.dependencies.verify_request_token.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from jose import jwt, JWTError
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models.session_revocation import RevokedToken, UserRevocation
+
+logger = logging.getLogger(__name__)
+
+# Signing configuration
+BRONN_SESSION_SECRET = os.getenv("BRONN_SESSION_SECRET", "")
+BRONN_SESSION_SECRET_MIN_LENGTH = 32
+BRONN_SESSION_TTL = int(os.getenv("BRONN_SESSION_TTL", "900"))
+BRONN_REFRESH_TTL = int(os.getenv("BRONN_REFRESH_TTL", str(7 * 24 * 3600)))
+# Longest a session can be kept alive by refreshing, from the original login
+BRONN_SESSION_MAX_AGE = int(os.getenv("BRONN_SESSION_MAX_AGE", str(30 * 24 * 3600)))
+# How often (seconds) each instance pulls revocations made elsewhere
+BRONN_REVOCATION_SYNC_INTERVAL = float(os.getenv("BRONN_REVOCATION_SYNC_INTERVAL", "10"))
+# Overlap (seconds) between pulls, covering clock skew across instances
+REVOCATION_SYNC_OVERLAP = 60.0
+REVOCATION_PURGE_INTERVAL = 3600.0
+SESSION_ALGORITHM = "HS256"
+SESSION_ISSUER = "bronn"
+
+
+# =============================================================================
+# Revocation List
+# =============================================================================
+
+class RevocationList:
+    """
+    Revoked token ids (until their own expiry) and per-user cut-offs.
+
+    revoke_user() invalidates every token for a uid issued before the call,
+    e.g. after a password change or account disable.
+
+    Every write goes to the database and to this process's memory;
+    is_revoked() only reads memory. sync() pulls session-token revocations
+    and user cut-offs written by other instances since the last pull.
+    Redeemed refresh tokens are not pulled: redeem() consults the database.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        sync_interval: float = BRONN_REVOCATION_SYNC_INTERVAL,
+    ):
+        self._session_factory = session_factory
+        self.sync_interval = sync_interval
+        self._revoked: Dict[str, float] = {}
+        self._user_cutoff: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._synced_to = 0.0
+        self._purged_at = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.syncs = 0
+        self.sync_failures = 0
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _remember(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+            if len(self._revoked) % 256 == 0:
+                self._purge_locked(time.time())
+
+    def _insert(self, jti: str, token_type: str, expires_at: float) -> bool:
+        """Record a revoked token id. Returns False if it was already recorded."""
+        db = self._new_session()
+        try:
+            insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+            stmt = insert(RevokedToken).values(
+                jti=jti, token_type=token_type, expires_at=expires_at, revoked_at=time.time()
+            ).on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            inserted = db.execute(stmt).rowcount == 1
+            db.commit()
+            return inserted
+        finally:
+            db.close()
+
+    def revoke(self, jti: str, expires_at: float, token_type: str = "session") -> None:
+        self._insert(jti, token_type, expires_at)
+        self._remember(jti, expires_at)
+
+    def redeem(self, jti: str, expires_at: float) -> bool:
+        """Revoke a refresh token on use. False if any instance already did."""
+        redeemed = self._insert(jti, "refresh", expires_at)
+        self._remember(jti, expires_at)
+        return redeemed
+
+    def revoke_user(self, uid: str) -> None:
+        now = time.time()
+        db = self._new_session()
+        try:
+            insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+            stmt = insert(UserRevocation).values(firebase_uid=uid, revoked_at=now)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[UserRevocation.firebase_uid],
+                set_={"revoked_at": stmt.excluded.revoked_at},
+            ))
+            db.commit()
+        finally:
+            db.close()
+        with self._lock:
+            self._user_cutoff[uid] = max(now, self._user_cutoff.get(uid, 0.0))
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        if claims.get("jti") in self._revoked:
+            return True
+        cutoff = self._user_cutoff.get(claims.get("sub"))
+        return cutoff is not None and claims.get("iat", 0) <= cutoff
+
+    def sync(self) -> int:
+        """Pull revocations recorded since the last pull. Returns rows read."""
+        now = time.time()
+        since = self._synced_to - REVOCATION_SYNC_OVERLAP
+        db = self._new_session()
+        try:
+            tokens = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+                RevokedToken.token_type == "session",
+                RevokedToken.revoked_at > since,
+                RevokedToken.expires_at > now,
+            ).all()
+            users = db.query(UserRevocation.firebase_uid, UserRevocation.revoked_at).filter(
+                UserRevocation.revoked_at > max(since, now - BRONN_REFRESH_TTL),
+            ).all()
+            if now - self._purged_at >= REVOCATION_PURGE_INTERVAL:
+                db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+                db.execute(delete(UserRevocation).where(
+                    UserRevocation.revoked_at <= now - BRONN_REFRESH_TTL
+                ))
+                db.commit()
+                self._purged_at = now
+        finally:
+            db.close()
+
+        with self._lock:
+            self._revoked.update(dict(tokens))
+            for uid, revoked_at in users:
+                self._user_cutoff[uid] = max(revoked_at, self._user_cutoff.get(uid, 0.0))
+            self._purge_locked(now)
+        self._synced_to = now
+        self.syncs += 1
+        return len(tokens) + len(users)
+
+    def start(self) -> None:
+        """Load current revocations and start the background sync thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="session-revocation-sync", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sync thread."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                self.sync_failures += 1
+                logger.warning(f"Failed to sync session revocations: {e}")
+            self._stopped.wait(timeout=self.sync_interval)
+
+    def _purge_locked(self, now: float) -> None:
+        for jti in [j for j, exp in self._revoked.items() if exp <= now]:
+            del self._revoked[jti]
+        horizon = now - BRONN_REFRESH_TTL
+        for uid in [u for u, t in self._user_cutoff.items() if t <= horizon]:
+            del self._user_cutoff[uid]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "revoked_tokens": len(self._revoked),
+            "revoked_users": len(self._user_cutoff),
+            "syncs": self.syncs,
+            "sync_failures": self.sync_failures,
+        }
+
+
+revocations = RevocationList()
+
+
+# =============================================================================
+# Issue / Verify
+# =============================================================================
+
+class SessionsDisabled(RuntimeError):
+    """Raised when issuing a session without a configured BRONN_SESSION_SECRET."""
+
+
+def sessions_enabled() -> bool:
+    """True if a real session secret is configured."""
+    return len(BRONN_SESSION_SECRET) >= BRONN_SESSION_SECRET_MIN_LENGTH
+
+
+def _encode(claims: Dict[str, Any], token_type: str, ttl: int) -> str:
+    if not sessions_enabled():
+        raise SessionsDisabled("BRONN_SESSION_SECRET is not set")
+    now = int(time.time())
+    payload = {
+        **claims,
+        "iss": SESSION_ISSUER,
+        "typ": token_type,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + ttl,
+    }
+    return jwt.encode(payload, BRONN_SESSION_SECRET, algorithm=SESSION_ALGORITHM)
+
+
+def issue_session(
+    firebase_uid: str,
+    user_id: str,
+    email: str,
+    tenant_id: Optional[str] = None,
+    is_admin: bool = False,
+    name: Optional[str] = None,
+    auth_time: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Create a session/refresh token pair for a verified user.
+
+    auth_time is when the user logged in (now, unless this is a refresh);
+    neither token is valid past auth_time + BRONN_SESSION_MAX_AGE.
+
+    Returns a dict with session_token, refresh_token and expires_in (seconds).
+    Raises SessionsDisabled if no session secret is configured.
+    """
+    now = int(time.time())
+    auth_time = int(auth_time or now)
+    remaining = auth_time + BRONN_SESSION_MAX_AGE - now
+    claims = {
+        "sub": firebase_uid,
+        "uid": user_id,
+        "email": email,
+        "tenant_id": tenant_id or "default",
+        "admin": bool(is_admin),
+        "name": name or "",
+        "auth_time": auth_time,
+    }
+    session_ttl = min(BRONN_SESSION_TTL, remaining)
+    return {
+        "session_token": _encode(claims, "session", session_ttl),
+        "refresh_token": _encode(claims, "refresh", min(BRONN_REFRESH_TTL, remaining)),
+        "expires_in": session_ttl,
+    }
+
+
+def decode_session_token(token: str, token_type: str = "session") -> Optional[Dict[str, Any]]:
+    """Verify a Bronn token of the given type. Returns its claims, or None."""
+    if not sessions_enabled():
+        return None
+    try:
+        claims = jwt.decode(
+            token,
+            BRONN_SESSION_SECRET,
+            algorithms=[SESSION_ALGORITHM],
+            issuer=SESSION_ISSUER,
+            options={"verify_aud": False},
+        )
+    except JWTError:
+        return None
+    if claims.get("typ") != token_type or revocations.is_revoked(claims):
+        return None
+    return claims
+
+
+def is_session_token(token: str) -> bool:
+    """True if token is shaped like a Bronn token rather than a Firebase ID token."""
+    try:
+        return jwt.get_unverified_header(token).get("alg") == SESSION_ALGORITHM
+    except JWTError:
+        return False
+
+
+def refresh_session(
+    refresh_token: str,
+    account_active: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Trade a refresh token for a new session/refresh pair.
+
+    The presented refresh token is redeemed, so each one works once. The
+    new pair keeps the original auth_time; past BRONN_SESSION_MAX_AGE the
+    user has to log in again. account_active(claims), when given, is
+    asked whether the account may still hold a session; if not, all of
+    the user's tokens are revoked.
+
+    Blocking (database, and whatever account_active does).
+    """
+    claims = decode_session_token(refresh_token, "refresh")
+    if claims is None:
+        return None
+    auth_time = claims.get("auth_time") or claims["iat"]
+    if time.time() - auth_time >= BRONN_SESSION_MAX_AGE:
+        return None
+    if account_active is not None and not account_active(claims):
+        revocations.revoke_user(claims["sub"])
+        return None
+    if not revocations.redeem(claims["jti"], claims["exp"]):
+        return None
+    return issue_session(
+        firebase_uid=claims["sub"],
+        user_id=claims["uid"],
+        email=claims["email"],
+        tenant_id=claims.get("tenant_id"),
+        is_admin=claims.get("admin", False),
+        name=claims.get("name"),
+        auth_time=auth_time,
+    )
+
+
+def revoke_token(token: str, token_type: str = "session") -> bool:
+    """Revoke a single token on all instances. Returns False if it was already invalid."""
+    claims = decode_session_token(token, token_type)
+    if claims is None:
+        return False
+    revocations.revoke(claims["jti"], claims["exp"], token_type)
+    return True
+
+
+def revoke_user(firebase_uid: str) -> None:
+    """Revoke every token issued to a user so far, on all instances."""
+    revocations.revoke_user(firebase_uid)
+
+
+def session_claims_to_decoded(claims: Dict[str, Any]) -> Dict[str, Any]:
+    """Map session claims to the shape verify_firebase_token returns."""
+    return {
+        "uid": claims["sub"],
+        "email": claims.get("email", ""),
+        "email_verified": True,
+        "name": claims.get("name", ""),
+        "tenant_id": claims.get("tenant_id", "default"),
+        "admin": claims.get("admin", False),
+        "bronn_session": True,
+    }
+
+
+def start_revocation_sync() -> None:
+    """Start pulling shared revocations (app startup); no-op without sessions."""
+    if sessions_enabled():
+        revocations.start()
+
+
+def stop_revocation_sync() -> None:
+    """Stop pulling shared revocations (app shutdown)."""
+    revocations.stop()
+
+
+def get_session_stats() -> Dict[str, Any]:
+    """Whether sessions are enabled, and the revocation list size, for monitoring."""
+    return {"enabled": sessions_enabled(), **revocations.stats()}
@@ -1,24 +1,48 @@
 """
 Activepieces Authentication - Signing Key Management
 
-This module handles RSA key generation and JWT token creation
+This module handles signing key generation and JWT token creation
 for authenticating Bronn users with the embedded Activepieces instance.
+
+Keys can be RSA-2048 (RS256), P-256 (ES256) or Ed25519 (EdDSA); the
+algorithm is a property of the key, chosen by SIGNING_ALGORITHM when a key
+is generated. Activepieces' managed auth verifies RS256, so only switch
+when the consumer of the tokens accepts the other algorithms.
+
+Signing goes through a SigningBackend: python-jose (RS256/ES256) or the
+`cryptography` package directly (all three). Use
+benchmarks/signing_benchmark.py to compare them.
 """
 
 import os
 import json
+import math
+import time
+import base64
+import hashlib
+import secrets
+import tempfile
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
 from cryptography.hazmat.backends import default_backend
-from jose import jwt
+from jose import jwk, jwt
+from jose.backends.base import Key
+
+from cache import TTLCache
 
 # Directory to store signing keys
 def _get_keys_dir() -> Path:
     """Get the directory for storing signing keys, with fallback for test environments."""
-    import tempfile
-    
     env_dir = os.getenv("SIGNING_KEYS_DIR")
     if env_dir:
         return Path(env_dir)
@@ -47,19 +71,40 @@ def ensure_keys_dir():
     KEYS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def generate_signing_key() -> tuple[str, str, str]:
+# Algorithm for newly generated keys: RS256, ES256 or EdDSA
+SIGNING_ALGORITHM = os.getenv("SIGNING_ALGORITHM", "RS256")
+# Preferred signing backend: jose or cryptography
+SIGNING_BACKEND = os.getenv("SIGNING_BACKEND", "jose")
+# Worker processes used by mint_activepieces_jwts(processes=None)
+SIGNING_PROCESSES = int(os.getenv("SIGNING_PROCESSES", str(os.cpu_count() or 1)))
+
+SUPPORTED_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+
+def generate_signing_key(algorithm: str = None) -> tuple[str, str, str]:
     """
-    Generate a new RSA key pair for signing Activepieces JWTs.
+    Generate a new key pair for signing Activepieces JWTs.
+    
+    Args:
+        algorithm: RS256 (RSA-2048), ES256 (P-256) or EdDSA (Ed25519).
+            Defaults to SIGNING_ALGORITHM.
     
     Returns:
         Tuple of (key_id, private_key_pem, public_key_pem)
     """
-    # Generate RSA key pair
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-        backend=default_backend()
-    )
+    algorithm = algorithm or SIGNING_ALGORITHM
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=2048,
+            backend=default_backend()
+        )
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1(), backend=default_backend())
+    elif algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"Unsupported signing algorithm: {algorithm}")
     
     # Serialize private key to PEM format
     private_pem = private_key.private_bytes(
@@ -81,34 +126,472 @@ def generate_signing_key() -> tuple[str, str, str]:
     return key_id, private_pem, public_pem
 
 
-def get_or_create_signing_key() -> tuple[str, str]:
+# Provisioning JWT reuse: a minted token is handed out again until less than
+# this fraction of its lifetime remains
+ACTIVEPIECES_JWT_CACHE_SIZE = int(os.getenv("ACTIVEPIECES_JWT_CACHE_SIZE", "4096"))
+ACTIVEPIECES_JWT_REUSE_MARGIN = float(os.getenv("ACTIVEPIECES_JWT_REUSE_MARGIN", "0.4"))
+
+_jwt_cache = TTLCache(maxsize=ACTIVEPIECES_JWT_CACHE_SIZE, name="activepieces_jwts")
+
+# How long (seconds) verifiers may cache the published JWKS / public key
+JWKS_MAX_AGE = int(os.getenv("JWKS_MAX_AGE", "300"))
+
+# How often (seconds) the key files' mtimes are checked for external changes
+SIGNING_KEY_CHECK_INTERVAL = float(os.getenv("SIGNING_KEY_CHECK_INTERVAL", "5"))
+# How long (seconds) a rotated-out key stays published for verification
+SIGNING_KEY_RETIRE_GRACE = int(os.getenv("SIGNING_KEY_RETIRE_GRACE", "86400"))
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+@lru_cache(maxsize=32)
+def key_algorithm(pem: str) -> str:
+    """The JWS algorithm for a PEM public or private key."""
+    if "PRIVATE KEY" in pem:
+        key = _load_crypto_key(pem)
+    else:
+        key = serialization.load_pem_public_key(pem.encode())
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        return "ES256"
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    raise ValueError(f"Unsupported key type: {type(key).__name__}")
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    """A loaded signing key. private_key is None for retired (verify-only) keys."""
+    key_id: str
+    public_key: str
+    private_key: Optional[str] = None
+    created_at: Optional[str] = None
+    retired_at: Optional[float] = None
+    
+    @property
+    def algorithm(self) -> str:
+        return key_algorithm(self.public_key)
+
+
+def _int_b64url(value: int, length: int = None) -> str:
+    length = length or (value.bit_length() + 7) // 8
+    return _b64url(value.to_bytes(length, "big"))
+
+
+@lru_cache(maxsize=32)
+def public_jwk(key_id: str, public_pem: str) -> Dict[str, str]:
+    """RFC 7517 JWK for a PEM public key."""
+    key = serialization.load_pem_public_key(public_pem.encode())
+    jwk_dict = {"kid": key_id, "use": "sig", "alg": key_algorithm(public_pem)}
+    if isinstance(key, rsa.RSAPublicKey):
+        numbers = key.public_numbers()
+        jwk_dict.update(kty="RSA", n=_int_b64url(numbers.n), e=_int_b64url(numbers.e))
+    elif isinstance(key, ec.EllipticCurvePublicKey):
+        numbers = key.public_numbers()
+        jwk_dict.update(kty="EC", crv="P-256",
+                        x=_int_b64url(numbers.x, 32), y=_int_b64url(numbers.y, 32))
+    else:
+        raw = key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        jwk_dict.update(kty="OKP", crv="Ed25519", x=_b64url(raw))
+    return jwk_dict
+
+
+@lru_cache(maxsize=16)
+def _load_private_key(private_pem: str, algorithm: str = "RS256") -> Key:
+    """Parse a PEM private key once; jwt.encode accepts the parsed key directly."""
+    return jwk.construct(private_pem, algorithm)
+
+
+@lru_cache(maxsize=16)
+def _load_crypto_key(private_pem: str):
+    """Parse a PEM private key into a `cryptography` key object once."""
+    return serialization.load_pem_private_key(private_pem.encode(), password=None)
+
+
+# =============================================================================
+# Signing Backends
+# =============================================================================
+
+class SigningBackend(ABC):
+    """Signs a JWT payload with a PEM private key."""
+    
+    name = "base"
+    algorithms: Tuple[str, ...] = ()
+    
+    @abstractmethod
+    def sign(self, payload: Dict[str, Any], private_pem: str, algorithm: str,
+             headers: Optional[Dict[str, Any]] = None) -> str:
+        """Return the compact JWS for payload."""
+        pass
+
+
+class JoseBackend(SigningBackend):
+    """python-jose, as used elsewhere in the backend. No EdDSA support."""
+    
+    name = "jose"
+    algorithms = ("RS256", "ES256")
+    
+    def sign(self, payload, private_pem, algorithm, headers=None):
+        return jwt.encode(
+            payload,
+            _load_private_key(private_pem, algorithm),
+            algorithm=algorithm,
+            headers=headers
+        )
+
+
+class CryptographyBackend(SigningBackend):
+    """Compact JWS built directly on `cryptography`, skipping jose's per-call overhead."""
+    
+    name = "cryptography"
+    algorithms = SUPPORTED_ALGORITHMS
+    
+    def sign(self, payload, private_pem, algorithm, headers=None):
+        header = {"alg": algorithm, "typ": "JWT", **(headers or {})}
+        signing_input = (
+            _b64url(json.dumps(header, separators=(",", ":")).encode())
+            + "."
+            + _b64url(json.dumps(payload, separators=(",", ":")).encode())
+        ).encode("ascii")
+        
+        key = _load_crypto_key(private_pem)
+        if algorithm == "RS256":
+            signature = key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+        elif algorithm == "ES256":
+            # JWS wants raw r || s, not the DER encoding cryptography returns
+            r, s = decode_dss_signature(key.sign(signing_input, ec.ECDSA(hashes.SHA256())))
+            signature = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+        elif algorithm == "EdDSA":
+            signature = key.sign(signing_input)
+        else:
+            raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+        return signing_input.decode("ascii") + "." + _b64url(signature)
+
+
+SIGNING_BACKENDS: Dict[str, SigningBackend] = {
+    backend.name: backend for backend in (JoseBackend(), CryptographyBackend())
+}
+
+
+def get_signing_backend(algorithm: str, name: Optional[str] = None) -> SigningBackend:
     """
-    Get the current signing key or create one if it doesn't exist.
+    The backend to sign `algorithm` with.
     
-    Returns:
-        Tuple of (key_id, private_key_pem)
+    Uses `name` (default SIGNING_BACKEND) when it supports the algorithm,
+    otherwise the first backend that does.
+    """
+    preferred = SIGNING_BACKENDS.get(name or SIGNING_BACKEND)
+    if preferred is not None and algorithm in preferred.algorithms:
+        return preferred
+    for backend in SIGNING_BACKENDS.values():
+        if algorithm in backend.algorithms:
+            return backend
+    raise ValueError(f"No signing backend supports {algorithm}")
+
+
+def sign_jwt(payload: Dict[str, Any], private_pem: str, key_id: str,
+             backend: Optional[str] = None) -> str:
+    """Sign payload with the key's own algorithm, tagging it with kid."""
+    algorithm = key_algorithm(private_pem)
+    return get_signing_backend(algorithm, backend).sign(
+        payload, private_pem, algorithm, headers={"kid": key_id}
+    )
+
+
+def sign_jwt_batch(payloads: List[Dict[str, Any]], private_pem: str, key_id: str,
+                   backend: Optional[str] = None) -> List[str]:
+    """Sign many payloads with one key. Module-level so process pools can run it."""
+    algorithm = key_algorithm(private_pem)
+    signer = get_signing_backend(algorithm, backend)
+    headers = {"kid": key_id}
+    return [signer.sign(payload, private_pem, algorithm, headers=headers) for payload in payloads]
+
+
+def _write_json_atomic(path: Path, data: Any, exclusive: bool = False) -> bool:
     """
-    ensure_keys_dir()
-    key_file = KEYS_DIR / "current_key.json"
+    Write JSON via a temp file so readers never see a partial file.
     
-    if key_file.exists():
-        with open(key_file, "r") as f:
-            data = json.load(f)
-            return data["key_id"], data["private_key"]
+    With exclusive=True the write fails (returns False) if path already
+    exists, so concurrent workers agree on a single first key.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        if exclusive:
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                return False
+        else:
+            os.replace(tmp_path, path)
+        return True
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+class SigningKeyManager:
+    """
+    In-memory holder for the Activepieces signing keys.
+    
+    Keys are read from KEYS_DIR once and re-read only when a key file's
+    mtime changes (checked at most every SIGNING_KEY_CHECK_INTERVAL seconds)
+    or after rotate(). Several keys can be active at once: the current key
+    signs new tokens, and recently retired keys stay published by `kid` so
+    tokens signed before a rotation still verify.
+    """
     
-    # Generate new key
-    key_id, private_pem, public_pem = generate_signing_key()
+    def __init__(self, keys_dir: Path, check_interval: float = SIGNING_KEY_CHECK_INTERVAL):
+        self.keys_dir = keys_dir
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._current: Optional[SigningKey] = None
+        self._retired: List[SigningKey] = []
+        self._mtimes: Tuple[Optional[float], Optional[float]] = (None, None)
+        self._checked_at = 0.0
+        self._jwks: Optional[Tuple[Tuple[str, ...], bytes, str]] = None
+        self.reloads = 0
     
-    # Save key
-    with open(key_file, "w") as f:
-        json.dump({
+    @property
+    def current_file(self) -> Path:
+        return self.keys_dir / "current_key.json"
+    
+    @property
+    def retired_file(self) -> Path:
+        return self.keys_dir / "retired_keys.json"
+    
+    def _file_mtimes(self) -> Tuple[Optional[float], Optional[float]]:
+        def mtime(path: Path) -> Optional[float]:
+            try:
+                return path.stat().st_mtime_ns
+            except FileNotFoundError:
+                return None
+        return mtime(self.current_file), mtime(self.retired_file)
+    
+    def _create_first_key(self) -> None:
+        key_id, private_pem, public_pem = generate_signing_key()
+        _write_json_atomic(self.current_file, {
             "key_id": key_id,
             "private_key": private_pem,
             "public_key": public_pem,
             "created_at": datetime.utcnow().isoformat()
-        }, f, indent=2)
+        }, exclusive=True)
     
-    return key_id, private_pem
+    def _load(self) -> None:
+        """Read both key files into memory (caller holds the lock)."""
+        self.keys_dir.mkdir(parents=True, exist_ok=True)
+        if not self.current_file.exists():
+            self._create_first_key()
+        
+        with open(self.current_file, "r") as f:
+            data = json.load(f)
+        current = SigningKey(
+            key_id=data["key_id"],
+            public_key=data["public_key"],
+            private_key=data["private_key"],
+            created_at=data.get("created_at"),
+        )
+        
+        retired = []
+        if self.retired_file.exists():
+            with open(self.retired_file, "r") as f:
+                for entry in json.load(f):
+                    retired.append(SigningKey(
+                        key_id=entry["key_id"],
+                        public_key=entry["public_key"],
+                        created_at=entry.get("created_at"),
+                        retired_at=entry.get("retired_at"),
+                    ))
+        
+        # Parse the private key now rather than on the first mint
+        algorithm = key_algorithm(current.private_key)
+        if algorithm in JoseBackend.algorithms:
+            _load_private_key(current.private_key, algorithm)
+        
+        self._current = current
+        self._retired = retired
+        self._jwks = None
+        self._mtimes = self._file_mtimes()
+        self.reloads += 1
+    
+    def _ensure_fresh(self) -> None:
+        now = time.monotonic()
+        if self._current is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if self._current is None or self._file_mtimes() != self._mtimes:
+                self._load()
+            self._checked_at = now
+    
+    def reload(self) -> None:
+        """Force a re-read of the key files."""
+        with self._lock:
+            self._load()
+            self._checked_at = time.monotonic()
+    
+    def current(self) -> SigningKey:
+        """The key used to sign new tokens."""
+        self._ensure_fresh()
+        return self._current
+    
+    def get(self, key_id: str) -> Optional[SigningKey]:
+        """Look up an active key by kid."""
+        for key in self.active_keys():
+            if key.key_id == key_id:
+                return key
+        return None
+    
+    def active_keys(self) -> List[SigningKey]:
+        """The current key followed by retired keys still within their grace period."""
+        self._ensure_fresh()
+        cutoff = time.time() - SIGNING_KEY_RETIRE_GRACE
+        retired = [k for k in self._retired if (k.retired_at or 0) >= cutoff]
+        return [self._current] + retired
+    
+    def jwks(self) -> Tuple[bytes, str]:
+        """
+        The JWKS document for all active keys, serialized, and its ETag.
+        
+        Built once per key-set change (a reload, or a retired key aging
+        out). The body depends only on the key files, so every instance
+        sharing KEYS_DIR serves byte-identical documents and ETags.
+        """
+        keys = self.active_keys()
+        kids = tuple(k.key_id for k in keys)
+        cached = self._jwks
+        if cached is not None and cached[0] == kids:
+            return cached[1], cached[2]
+        
+        body = json.dumps(
+            {"keys": [public_jwk(k.key_id, k.public_key) for k in keys]},
+            separators=(",", ":"),
+            sort_keys=True
+        ).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self._jwks = (kids, body, etag)
+        return body, etag
+    
+    def rotate(self, algorithm: Optional[str] = None) -> SigningKey:
+        """
+        Generate a new current key and retire the old one.
+        
+        The previous key stays published for SIGNING_KEY_RETIRE_GRACE
+        seconds so tokens it already signed keep verifying. `algorithm`
+        defaults to SIGNING_ALGORITHM, so rotation is also how a deployment
+        switches algorithms.
+        """
+        with self._lock:
+            previous = self.current()
+            key_id, private_pem, public_pem = generate_signing_key(algorithm)
+            if key_id == previous.key_id:
+                key_id = f"{key_id}-{secrets.token_hex(3)}"
+            
+            now = time.time()
+            cutoff = now - SIGNING_KEY_RETIRE_GRACE
+            retired = [
+                {
+                    "key_id": k.key_id,
+                    "public_key": k.public_key,
+                    "created_at": k.created_at,
+                    "retired_at": k.retired_at,
+                }
+                for k in self._retired if (k.retired_at or 0) >= cutoff
+            ]
+            retired.insert(0, {
+                "key_id": previous.key_id,
+                "public_key": previous.public_key,
+                "created_at": previous.created_at,
+                "retired_at": now,
+            })
+            
+            # Publish the retired key before switching, so there is no window
+            # in which the old kid is unknown to verifiers
+            _write_json_atomic(self.retired_file, retired)
+            _write_json_atomic(self.current_file, {
+                "key_id": key_id,
+                "private_key": private_pem,
+                "public_key": public_pem,
+                "created_at": datetime.utcnow().isoformat()
+            })
+            self._load()
+            self._checked_at = time.monotonic()
+            return self._current
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            "current_kid": self._current.key_id if self._current else None,
+            "algorithm": self._current.algorithm if self._current else None,
+            "active_keys": len(self.active_keys()) if self._current else 0,
+            "reloads": self.reloads,
+        }
+
+
+_key_manager: Optional[SigningKeyManager] = None
+
+
+def get_key_manager() -> SigningKeyManager:
+    """Return the process-wide signing key manager."""
+    global _key_manager
+    
+    if _key_manager is None:
+        _key_manager = SigningKeyManager(KEYS_DIR)
+    return _key_manager
+
+
+def rotate_signing_key(algorithm: Optional[str] = None) -> str:
+    """Rotate the signing key. Returns the new key ID."""
+    return get_key_manager().rotate(algorithm).key_id
+
+
+def get_or_create_signing_key() -> tuple[str, str]:
+    """
+    Get the current signing key or create one if it doesn't exist.
+    
+    Served from memory; the key file is only re-read when it changes.
+    
+    Returns:
+        Tuple of (key_id, private_key_pem)
+    """
+    key = get_key_manager().current()
+    return key.key_id, key.private_key
+
+
+def build_activepieces_claims(
+    user_id: str,
+    project_id: str,
+    first_name: str = "User",
+    last_name: str = "",
+    role: str = "EDITOR",
+    expires_in_minutes: int = 5,
+    project_name: str = None
+) -> Dict[str, Any]:
+    """Provisioning JWT payload per the Activepieces embedding spec."""
+    # Calculate expiration (short-lived for security)
+    now = datetime.utcnow()
+    exp = now + timedelta(minutes=expires_in_minutes)
+    
+    payload = {
+        "version": "v3",
+        "externalUserId": user_id,
+        "externalProjectId": project_id,
+        "firstName": first_name,
+        "lastName": last_name,
+        "role": role,
+        "piecesFilterType": "NONE",
+        "exp": int(exp.timestamp()),
+        "iat": int(now.timestamp())
+    }
+    
+    # Add project display name if provided
+    if project_name:
+        payload["projectDisplayName"] = project_name
+    
+    return payload
 
 
 def create_activepieces_jwt(
@@ -141,35 +624,135 @@ def create_activepieces_jwt(
     """
     key_id, private_key = get_or_create_signing_key()
     
-    # Calculate expiration (short-lived for security)
-    exp = datetime.utcnow() + timedelta(minutes=expires_in_minutes)
+    payload = build_activepieces_claims(
+        user_id=user_id,
+        project_id=project_id,
+        first_name=first_name,
+        last_name=last_name,
+        role=role,
+        expires_in_minutes=expires_in_minutes,
+        project_name=project_name
+    )
     
-    # Build payload according to Activepieces embedding spec
-    payload = {
-        "version": "v3",
-        "externalUserId": user_id,
-        "externalProjectId": project_id,
-        "firstName": first_name,
-        "lastName": last_name,
-        "role": role,
-        "piecesFilterType": "NONE",
-        "exp": int(exp.timestamp()),
-        "iat": int(datetime.utcnow().timestamp())
-    }
+    # Sign with the key's algorithm (the parsed key is cached per backend)
+    return sign_jwt(payload, private_key, key_id)
+
+
+_mint_pool: Optional[ProcessPoolExecutor] = None
+_mint_pool_size = 0
+_mint_pool_lock = threading.Lock()
+
+
+def _get_mint_pool(processes: int) -> ProcessPoolExecutor:
+    """Lazily start the process pool for bulk minting."""
+    global _mint_pool, _mint_pool_size
     
-    # Add project display name if provided
-    if project_name:
-        payload["projectDisplayName"] = project_name
+    with _mint_pool_lock:
+        if _mint_pool is None or _mint_pool_size != processes:
+            if _mint_pool is not None:
+                _mint_pool.shutdown(wait=False)
+            # spawn, not fork: the API process has live threads and sockets
+            _mint_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _mint_pool_size = processes
+        return _mint_pool
+
+
+def shutdown_mint_pool() -> None:
+    """Stop the bulk-minting worker processes, if started."""
+    global _mint_pool
     
-    # Sign the token with RS256
-    token = jwt.encode(
-        payload,
-        private_key,
-        algorithm="RS256",
-        headers={"kid": key_id}
-    )
+    with _mint_pool_lock:
+        if _mint_pool is not None:
+            _mint_pool.shutdown(wait=False, cancel_futures=True)
+            _mint_pool = None
+
+
+def mint_activepieces_jwts(
+    requests: Iterable[Dict[str, Any]],
+    processes: Optional[int] = 0,
+    backend: Optional[str] = None
+) -> List[str]:
+    """
+    Sign many provisioning JWTs in one call, e.g. for tenant onboarding.
+    
+    Each request is a dict of create_activepieces_jwt() keyword arguments.
+    The key is resolved and parsed once for the whole batch.
     
-    return token
+    Args:
+        requests: create_activepieces_jwt() kwargs, one dict per token
+        processes: 0 signs in this process; N > 1 splits the batch across N
+            worker processes (None means SIGNING_PROCESSES). Blocking either
+            way: call it through executors.run_blocking from async code.
+        backend: Signing backend name (default SIGNING_BACKEND)
+    
+    Returns:
+        Signed tokens, in request order
+    """
+    key_id, private_key = get_or_create_signing_key()
+    payloads = [build_activepieces_claims(**request) for request in requests]
+    
+    if processes is None:
+        processes = SIGNING_PROCESSES
+    if processes <= 1 or len(payloads) < 2 * processes:
+        return sign_jwt_batch(payloads, private_key, key_id, backend)
+    
+    # A few chunks per worker keeps them evenly loaded
+    chunk_size = math.ceil(len(payloads) / (processes * 4))
+    chunks = [payloads[i:i + chunk_size] for i in range(0, len(payloads), chunk_size)]
+    pool = _get_mint_pool(processes)
+    futures = [
+        pool.submit(sign_jwt_batch, chunk, private_key, key_id, backend)
+        for chunk in chunks
+    ]
+    return [token for future in futures for token in future.result()]
+
+
+def get_activepieces_jwt(
+    user_id: str,
+    project_id: str,
+    first_name: str = "User",
+    last_name: str = "",
+    role: str = "EDITOR",
+    expires_in_minutes: int = 5,
+    project_name: str = None
+) -> tuple[str, int]:
+    """
+    Get a provisioning JWT, reusing a previously minted one when possible.
+    
+    Tokens are cached per (user, project, role, project display name, name)
+    and reused while more than ACTIVEPIECES_JWT_REUSE_MARGIN of their
+    lifetime remains, so re-opening the same workspace is a dictionary
+    lookup instead of an RSA signature. Arguments match
+    create_activepieces_jwt().
+    
+    Returns:
+        Tuple of (token, exp) where exp is the token's expiry (epoch seconds)
+    """
+    cache_key = (user_id, project_id, role, project_name, first_name, last_name, expires_in_minutes)
+    
+    def mint() -> tuple[tuple[str, int], float]:
+        token = create_activepieces_jwt(
+            user_id=user_id,
+            project_id=project_id,
+            first_name=first_name,
+            last_name=last_name,
+            role=role,
+            expires_in_minutes=expires_in_minutes,
+            project_name=project_name
+        )
+        exp = int(jwt.get_unverified_claims(token)["exp"])
+        reuse_until = exp - expires_in_minutes * 60 * ACTIVEPIECES_JWT_REUSE_MARGIN
+        return (token, exp), reuse_until
+    
+    return _jwt_cache.get_or_load(cache_key, mint)
+
+
+def get_jwt_cache_stats() -> Dict[str, Any]:
+    """Hit-rate counters for the provisioning JWT cache."""
+    return _jwt_cache.stats()
 
 
 def get_public_key() -> tuple[str, str]:
@@ -179,13 +762,25 @@ def get_public_key() -> tuple[str, str]:
     Returns:
         Tuple of (key_id, public_key_pem)
     """
-    ensure_keys_dir()
-    key_file = KEYS_DIR / "current_key.json"
+    key = get_key_manager().current()
+    return key.key_id, key.public_key
+
+
+def get_jwks() -> tuple[bytes, str]:
+    """
+    Get the serialized JWKS for every active signing key.
     
-    if not key_file.exists():
-        # Generate key if it doesn't exist
-        get_or_create_signing_key()
+    Returns:
+        Tuple of (json_body, etag)
+    """
+    return get_key_manager().jwks()
+
+
+def get_active_public_keys() -> List[tuple[str, str]]:
+    """
+    Get every public key that may have signed a still-valid token.
     
-    with open(key_file, "r") as f:
-        data = json.load(f)
-        return data["key_id"], data["public_key"]
+    Returns:
+        List of (key_id, public_key_pem), current key first
+    """
+    return [(k.key_id, k.public_key) for k in get_key_manager().active_keys()]
@@ -0,0 +1,457 @@
+"""
+Firebase User Provisioning
+
+Resolves the Bronn `users` row for a verified Firebase token: finds it by
+firebase_uid, links an existing row with the same email, or creates it.
+
+New users are created in a single INSERT ... ON CONFLICT ... RETURNING
+statement (PostgreSQL and SQLite both support it), instead of separate
+lookups by uid and email followed by an insert and an exception-driven
+retry when two requests race to create the same user.
+
+For returning users, the non-critical login bookkeeping (last_login_at,
+avatar_url, display_name) is buffered in memory and written in batches
+as one multi-row UPDATE, so login traffic doesn't turn into one small
+write transaction per request.
+
+Per-request authentication reads users through a small in-process cache of
+read-only UserSnapshot objects keyed by firebase_uid. Writes made here
+refresh the cached snapshot; a short TTL catches changes made elsewhere.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from cache import TTLCache
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Write-behind flush triggers: every LOGIN_WRITE_FLUSH_INTERVAL seconds, or
+# as soon as LOGIN_WRITE_BATCH_SIZE distinct users are pending
+LOGIN_WRITE_FLUSH_INTERVAL = float(os.getenv("LOGIN_WRITE_FLUSH_INTERVAL", "5"))
+LOGIN_WRITE_BATCH_SIZE = int(os.getenv("LOGIN_WRITE_BATCH_SIZE", "200"))
+# Pending updates kept across failed flushes before the oldest are dropped
+LOGIN_WRITE_MAX_PENDING = int(os.getenv("LOGIN_WRITE_MAX_PENDING", "10000"))
+
+# User snapshot cache for get_current_user
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "4096"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+
+def _profile_values(decoded: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for a new user row, derived as in User.from_firebase_token."""
+    user = User.from_firebase_token(decoded)
+    return {
+        "firebase_uid": user.firebase_uid,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "display_name": user.display_name,
+        "avatar_url": user.avatar_url,
+        "tenant_id": user.tenant_id,
+        "is_active": True,
+    }
+
+
+def _commit_keep_loaded(db: Session) -> None:
+    """Commit without expiring the rows RETURNING just loaded, so callers don't re-query."""
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
+def _insert_for(db: Session):
+    """Dialect-specific INSERT construct that supports ON CONFLICT."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+def upsert_user_from_token(db: Session, decoded: Dict[str, Any]) -> User:
+    """
+    Create or update the user for a verified token and record the login.
+
+    On conflict with an existing firebase_uid, updates last_login_at and,
+    when the token carries them, avatar_url and display_name. Other profile
+    fields are only set on insert.
+
+    If a row already exists with the same email under a different
+    firebase_uid (provider change or migration), that row is linked to the
+    new uid instead. This happens once per migrated user.
+
+    Returns the persistent, fully loaded User.
+    """
+    values = _profile_values(decoded)
+    now = datetime.utcnow()
+    picture = decoded.get("picture") or None
+    name = decoded.get("name") or None
+
+    insert = _insert_for(db)
+    stmt = insert(User).values(**values, last_login_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.firebase_uid],
+        set_={
+            "last_login_at": now,
+            "avatar_url": picture if picture else User.avatar_url,
+            "display_name": name if name else User.display_name,
+            "updated_at": func.now(),
+        },
+    ).returning(User)
+
+    try:
+        user = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+        _commit_keep_loaded(db)
+        cache_user(user)
+        return user
+    except IntegrityError as e:
+        # Only the email unique index can still conflict here
+        db.rollback()
+        if not values["email"]:
+            raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
+
+    user = _link_by_email(db, values["email"], values["firebase_uid"], now, picture, name)
+    if user is None:
+        raise HTTPException(status_code=500, detail="Failed to create user")
+    return user
+
+
+def _link_by_email(
+    db: Session,
+    email: str,
+    firebase_uid: str,
+    now: datetime,
+    picture: Optional[str],
+    name: Optional[str],
+) -> Optional[User]:
+    """
+    Point the row with this email at a new firebase_uid.
+
+    The snapshot cached under the previous uid is dropped, so a token
+    still carrying it re-resolves instead of seeing the moved row.
+    """
+    previous_uid = db.query(User.firebase_uid).filter(User.email == email).scalar()
+    set_values: Dict[str, Any] = {"firebase_uid": firebase_uid, "last_login_at": now}
+    if picture:
+        set_values["avatar_url"] = picture
+    if name:
+        set_values["display_name"] = name
+
+    stmt = (
+        update(User)
+        .where(User.email == email)
+        .values(**set_values)
+        .returning(User)
+    )
+    user = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+    _commit_keep_loaded(db)
+    if previous_uid and previous_uid != firebase_uid:
+        invalidate_cached_user(previous_uid)
+    if user is not None:
+        cache_user(user)
+    return user
+
+
+def get_or_create_user(db: Session, decoded: Dict[str, Any]) -> User:
+    """
+    Fetch the user for a verified token, provisioning it on first access.
+
+    Used on per-request paths, where writing last_login_at on every call
+    would be wasteful: the common case is a single indexed SELECT.
+    """
+    user = db.query(User).filter(User.firebase_uid == decoded["uid"]).first()
+    if user is None:
+        user = upsert_user_from_token(db, decoded)
+    return user
+
+
+# =============================================================================
+# User Snapshot Cache
+# =============================================================================
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    Immutable copy of a users row, detached from any session.
+
+    Exposes the same attributes and to_dict() as User, so routers that only
+    read the current user can take either.
+    """
+    id: str
+    firebase_uid: str
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    display_name: Optional[str]
+    avatar_url: Optional[str]
+    tenant_id: Optional[str]
+    is_active: bool
+    is_admin: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    last_login_at: Optional[datetime]
+
+    to_dict = User.to_dict
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            firebase_uid=user.firebase_uid,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            display_name=user.display_name,
+            avatar_url=user.avatar_url,
+            tenant_id=user.tenant_id,
+            is_active=user.is_active,
+            is_admin=user.is_admin,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            last_login_at=user.last_login_at,
+        )
+
+
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, name="users")
+
+
+def cache_user(user: User) -> UserSnapshot:
+    """Store a fresh snapshot of a row we just wrote or read."""
+    snapshot = UserSnapshot.from_user(user)
+    _user_cache.set(snapshot.firebase_uid, snapshot, time.time() + USER_CACHE_TTL)
+    return snapshot
+
+
+def get_user_snapshot(db: Session, decoded: Dict[str, Any]) -> UserSnapshot:
+    """
+    Cached equivalent of get_or_create_user for per-request authentication.
+
+    Hits skip the database entirely. Concurrent misses for the same uid
+    share one lookup.
+    """
+    def load():
+        user = get_or_create_user(db, decoded)
+        return UserSnapshot.from_user(user), time.time() + USER_CACHE_TTL
+
+    return _user_cache.get_or_load(decoded["uid"], load)
+
+
+def peek_cached_user(firebase_uid: str) -> Optional[UserSnapshot]:
+    """The cached snapshot for a user, if any, without touching the database."""
+    return _user_cache.get(firebase_uid)
+
+
+def invalidate_cached_user(firebase_uid: str) -> None:
+    """Drop the cached snapshot for a user."""
+    _user_cache.invalidate(firebase_uid)
+
+
+def get_user_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the user snapshot cache."""
+    return _user_cache.stats()
+
+
+# =============================================================================
+# Write-Behind Login Updates
+# =============================================================================
+
+class LoginWriteBuffer:
+    """
+    Coalesces per-user login updates in memory and flushes them in batches.
+
+    Repeated logins by the same user between flushes collapse into one row
+    of the batch (latest values win). Each flush is a single UPDATE that
+    sets every pending row via CASE on the primary key.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: int = LOGIN_WRITE_BATCH_SIZE,
+        flush_interval: float = LOGIN_WRITE_FLUSH_INTERVAL,
+        max_pending: int = LOGIN_WRITE_MAX_PENDING,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def add(self, user_id: str, last_login_at: datetime,
+            avatar_url: Optional[str] = None, display_name: Optional[str] = None) -> None:
+        """Queue a login update for user_id."""
+        with self._lock:
+            entry = self._pending.pop(user_id, {})
+            entry["last_login_at"] = last_login_at
+            if avatar_url:
+                entry["avatar_url"] = avatar_url
+            if display_name:
+                entry["display_name"] = display_name
+            self._pending[user_id] = entry
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _requeue(self, batch: Dict[str, Dict[str, Any]]) -> None:
+        """Put a failed batch back without overwriting newer updates."""
+        with self._lock:
+            merged = dict(batch)
+            for user_id, entry in self._pending.items():
+                merged[user_id] = {**merged.get(user_id, {}), **entry}
+            while len(merged) > self.max_pending:
+                merged.pop(next(iter(merged)))
+                self.dropped += 1
+            self._pending = merged
+
+    def flush(self) -> int:
+        """Write all pending updates. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            
+            written = 0
+            items = list(batch.items())
+            try:
+                for start in range(0, len(items), self.batch_size):
+                    written += self._write(dict(items[start:start + self.batch_size]))
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Failed to flush {len(batch)} login updates: {e}")
+                self._requeue(dict(items[written:]))
+            self.flushes += 1
+            self.rows_written += written
+            return written
+
+    def _write(self, batch: Dict[str, Dict[str, Any]]) -> int:
+        ids = list(batch)
+        values: Dict[str, Any] = {
+            "last_login_at": case(
+                {uid: entry["last_login_at"] for uid, entry in batch.items()},
+                value=User.id
+            ),
+            "updated_at": func.now(),
+        }
+        for column in ("avatar_url", "display_name"):
+            changed = {uid: entry[column] for uid, entry in batch.items() if column in entry}
+            if changed:
+                values[column] = func.coalesce(
+                    case(changed, value=User.id), getattr(User, column)
+                )
+        
+        stmt = (
+            update(User)
+            .where(User.id.in_(ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db = self._new_session()
+        try:
+            db.execute(stmt)
+            db.commit()
+        finally:
+            db.close()
+        return len(ids)
+
+    def start(self) -> None:
+        """Start the background flush thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="login-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write whatever is still pending."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            if not self._stopped.is_set():
+                self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+login_writes = LoginWriteBuffer()
+
+
+def record_login(db: Session, decoded: Dict[str, Any]) -> User:
+    """
+    Resolve the user for a login and record it.
+
+    Existing users cost one indexed SELECT; their last_login_at and profile
+    changes are queued on the write-behind buffer and reflected on the
+    returned object without marking it dirty. New (or re-linked) users go
+    through upsert_user_from_token, which writes immediately.
+    """
+    user = db.query(User).filter(User.firebase_uid == decoded["uid"]).first()
+    if user is None:
+        return upsert_user_from_token(db, decoded)
+
+    now = datetime.utcnow()
+    picture = decoded.get("picture") or None
+    name = decoded.get("name") or None
+    login_writes.add(
+        user.id,
+        now,
+        avatar_url=picture if picture != user.avatar_url else None,
+        display_name=name if name != user.display_name else None,
+    )
+
+    set_committed_value(user, "last_login_at", now)
+    if picture:
+        set_committed_value(user, "avatar_url", picture)
+    if name:
+        set_committed_value(user, "display_name", name)
+    # Cache what the row will hold once the buffer is flushed
+    cache_user(user)
+    return user
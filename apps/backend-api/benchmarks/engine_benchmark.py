@@ -0,0 +1,127 @@
+"""
+Workflow Engine Benchmark
+
+Starts the fake Activepieces server on a local port and drives
+ActivepiecesAdapter against it over real sockets, reporting throughput,
+latency percentiles and errors per operation.
+
+Usage (from apps/backend-api):
+    python benchmarks/engine_benchmark.py [--requests 2000] [--concurrency 8]
+        [--latency-ms 20] [--jitter-ms 10] [--error-rate 0.01] [--payload-bytes 2048]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+
+from benchmarks.fake_activepieces import FakeActivepieces, Faults
+from http_clients import close_http_clients, http_client_stats
+from workflow_engine import ActivepiecesAdapter
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(fake: FakeActivepieces, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(fake.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def bench(name: str, requests: int, concurrency: int, call) -> None:
+    latencies, errors = [], 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with gate:
+            start = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"  {name:<18} {requests / elapsed:>8,.0f} req/s"
+        f"  p50 {statistics.median(latencies) * 1000:>7.1f} ms"
+        f"  p99 {p99 * 1000:>7.1f} ms  errors {errors}"
+    )
+
+
+async def run(args) -> None:
+    fake = FakeActivepieces(
+        flows=args.flows,
+        faults=Faults(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            payload_bytes=args.payload_bytes,
+            run_duration_ms=args.latency_ms * 5,
+        ),
+    )
+    port = free_port()
+    server = serve(fake, port)
+
+    engine = ActivepiecesAdapter(api_token="bench")
+    engine.base_url = f"http://127.0.0.1:{port}/v1"
+    flow_ids = list(fake.flows)
+    run_ids = list(fake.runs)
+
+    print(f"{args.requests} requests per operation, concurrency {args.concurrency}")
+    try:
+        await bench("get_workflow", args.requests, args.concurrency,
+                    lambda i: engine.get_workflow(flow_ids[i % len(flow_ids)]))
+        await bench("get_execution", args.requests, args.concurrency,
+                    lambda i: engine.get_execution_status(run_ids[i % len(run_ids)]))
+        await bench("list_workflows", args.requests // 10, args.concurrency,
+                    lambda i: engine.list_workflows("proj-1", limit=50))
+        await bench("iter_workflows", max(1, args.requests // 100), 1,
+                    lambda i: _drain(engine.iter_workflows("proj-1", page_size=50)))
+        upstream = http_client_stats()["upstreams"].get("activepieces", {})
+        print(f"  upstream: requests {upstream.get('requests')}  errors {upstream.get('errors')}"
+              f"  rejected {upstream.get('rejected')}  retry budget {upstream.get('retry_budget')}")
+        print(f"  fake server: injected errors {fake.injected_errors}")
+    finally:
+        await close_http_clients()
+        server.should_exit = True
+
+
+async def _drain(iterator) -> None:
+    async for _ in iterator:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--flows", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
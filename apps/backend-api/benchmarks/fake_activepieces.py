@@ -0,0 +1,419 @@
+"""
+Fake Activepieces Server
+
+An in-memory stand-in for the parts of the Activepieces API that Bronn
+calls, for load and latency testing of the proxies, ActivepiecesAdapter
+and activepieces_sync without a live instance:
+
+    GET/POST        /v1/flows                   (cursor-paginated)
+    GET/POST/DELETE /v1/flows/{id}
+    GET/POST        /v1/flow-runs               (cursor-paginated)
+    GET             /v1/flow-runs/{id}
+    GET             /v1/flow-runs/{id}/steps
+    GET             /v1/projects                (filtered by externalId)
+    POST            /v1/managed-authn/external-token
+
+Every route is also served under /api/v1, as Activepieces' nginx does.
+Runs created through POST /flow-runs report RUNNING until
+`run_duration_ms` has passed, then SUCCEEDED.
+
+Faults are injected per request: fixed latency plus uniform jitter, an
+error rate (answered with `error_status`), and padding added to every
+flow and run object to inflate payloads. They can be changed while the
+server runs with PUT /_fake/config; GET /_fake/stats reports request and
+injected-error counts.
+
+Usage (from apps/backend-api):
+    python benchmarks/fake_activepieces.py [--port 8090] [--flows 500]
+        [--latency-ms 20] [--jitter-ms 10] [--error-rate 0.01] [--payload-bytes 2048]
+
+then point ACTIVEPIECES_URL at http://127.0.0.1:8090. In-process, mount
+FakeActivepieces(...).app with httpx.ASGITransport instead.
+"""
+
+import argparse
+import asyncio
+import base64
+import random
+import re
+import string
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from jose import jwt
+
+FAKE_SESSION_SECRET = "fake-activepieces"
+RUN_STATUSES = ["SUCCEEDED"] * 8 + ["FAILED", "TIMEOUT"]
+# Activepieces IDs are 21-character nanoids; stats group paths by route
+_ID_SEGMENT = re.compile(r"/[A-Za-z0-9]{21}(?=/|$)")
+
+
+@dataclass
+class Faults:
+    """Per-request fault injection settings."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    payload_bytes: int = 0
+    run_duration_ms: float = 500.0
+
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+
+def _decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class FakeActivepieces:
+    """Seeded dataset plus the ASGI app serving it (`.app`)."""
+
+    def __init__(
+        self,
+        flows: int = 100,
+        runs_per_flow: int = 5,
+        steps_per_run: int = 3,
+        project_id: str = "proj-1",
+        project_external_id: Optional[str] = None,
+        faults: Optional[Faults] = None,
+        require_auth: bool = True,
+        seed: int = 0,
+    ):
+        self.project_id = project_id
+        self.project_external_id = project_external_id
+        self.steps_per_run = steps_per_run
+        self.faults = faults or Faults()
+        self.require_auth = require_auth
+        self._rng = random.Random(seed)
+        self.requests: Counter = Counter()
+        self.injected_errors = 0
+        self.flows: Dict[str, Dict[str, Any]] = {}
+        self.runs: Dict[str, Dict[str, Any]] = {}
+        self._run_deadlines: Dict[str, float] = {}
+        self._seed(flows, runs_per_flow)
+        self.app = self._build_app()
+
+    # ------------------------------------------------------------------
+    # Dataset
+    # ------------------------------------------------------------------
+
+    def _new_id(self) -> str:
+        return "".join(self._rng.choices(string.ascii_letters + string.digits, k=21))
+
+    def _seed(self, flows: int, runs_per_flow: int) -> None:
+        epoch = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for i in range(flows):
+            created = epoch + timedelta(minutes=i)
+            flow = self._make_flow(f"Flow {i}", self.project_id, created)
+            flow["updated"] = _iso(created + timedelta(seconds=self._rng.randint(0, 86400)))
+            flow["status"] = "ENABLED" if i % 3 else "DISABLED"
+            for j in range(runs_per_flow):
+                started = created + timedelta(hours=j + 1)
+                run = self._make_run(flow, started)
+                duration = self._rng.randint(50, 30000)
+                run["status"] = self._rng.choice(RUN_STATUSES)
+                run["finishTime"] = _iso(started + timedelta(milliseconds=duration))
+                run["duration"] = duration
+                if run["status"] != "SUCCEEDED":
+                    run["error"] = f"step_{self.steps_per_run} {run['status'].lower()}"
+
+    def _make_flow(self, name: str, project_id: str, created: datetime,
+                   folder_id: Optional[str] = None) -> Dict[str, Any]:
+        flow_id = self._new_id()
+        flow = {
+            "id": flow_id,
+            "created": _iso(created),
+            "updated": _iso(created),
+            "projectId": project_id,
+            "folderId": folder_id,
+            "status": "DISABLED",
+            "publishedVersionId": None,
+            "version": {
+                "id": self._new_id(),
+                "flowId": flow_id,
+                "displayName": name,
+                "valid": True,
+                "state": "DRAFT",
+                "trigger": {"name": "trigger", "type": "EMPTY", "displayName": "Select Trigger"},
+            },
+        }
+        self.flows[flow_id] = flow
+        return flow
+
+    def _make_run(self, flow: Dict[str, Any], started: datetime) -> Dict[str, Any]:
+        run_id = self._new_id()
+        run = {
+            "id": run_id,
+            "created": _iso(started),
+            "updated": _iso(started),
+            "projectId": flow["projectId"],
+            "flowId": flow["id"],
+            "flowDisplayName": flow["version"]["displayName"],
+            "environment": "PRODUCTION",
+            "status": "RUNNING",
+            "startTime": _iso(started),
+            "finishTime": None,
+            "duration": None,
+        }
+        self.runs[run_id] = run
+        return run
+
+    def _advance(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        """Finish a created run once its duration has elapsed."""
+        deadline = self._run_deadlines.get(run["id"])
+        if deadline is not None and time.monotonic() >= deadline:
+            del self._run_deadlines[run["id"]]
+            now = datetime.now(timezone.utc)
+            run["status"] = "SUCCEEDED"
+            run["finishTime"] = run["updated"] = _iso(now)
+            run["duration"] = int(self.faults.run_duration_ms)
+        return run
+
+    def _render(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        if self.faults.payload_bytes <= 0:
+            return item
+        return {**item, "metadata": {"padding": "x" * self.faults.payload_bytes}}
+
+    def _page(self, items: List[Dict[str, Any]], limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+        start = _decode_cursor(cursor)
+        page = items[start:start + limit]
+        end = start + len(page)
+        return {
+            "data": [self._render(item) for item in page],
+            "next": _encode_cursor(end) if end < len(items) else None,
+            "previous": _encode_cursor(max(0, start - limit)) if start else None,
+        }
+
+    # ------------------------------------------------------------------
+    # App
+    # ------------------------------------------------------------------
+
+    async def _inject(self, request: Request, call_next):
+        if request.url.path.startswith("/_fake"):
+            return await call_next(request)
+        self.requests[f"{request.method} {_ID_SEGMENT.sub('/{id}', request.url.path)}"] += 1
+        faults = self.faults
+        delay = faults.latency_ms + self._rng.uniform(0, faults.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if faults.error_rate and self._rng.random() < faults.error_rate:
+            self.injected_errors += 1
+            return JSONResponse(status_code=faults.error_status, content={"message": "Injected failure"})
+        if self.require_auth and not request.headers.get("authorization", "").startswith("Bearer ") \
+                and not request.url.path.endswith("/managed-authn/external-token"):
+            return JSONResponse(status_code=401, content={"message": "Unauthorized"})
+        return await call_next(request)
+
+    def _api(self) -> APIRouter:
+        router = APIRouter()
+
+        def get_flow(flow_id: str) -> Dict[str, Any]:
+            flow = self.flows.get(flow_id)
+            if flow is None:
+                raise HTTPException(status_code=404, detail="Flow not found")
+            return flow
+
+        def get_run(run_id: str) -> Dict[str, Any]:
+            run = self.runs.get(run_id)
+            if run is None:
+                raise HTTPException(status_code=404, detail="Run not found")
+            return self._advance(run)
+
+        @router.get("/flows")
+        def list_flows(projectId: Optional[str] = None, folderId: Optional[str] = None,
+                       status: Optional[str] = None, limit: int = 10, cursor: Optional[str] = None):
+            flows = [
+                f for f in self.flows.values()
+                if (projectId is None or f["projectId"] == projectId)
+                and (folderId is None or f["folderId"] == folderId)
+                and (status is None or f["status"] == status)
+            ]
+            flows.sort(key=lambda f: f["created"], reverse=True)
+            return self._page(flows, limit, cursor)
+
+        @router.post("/flows", status_code=201)
+        def create_flow(body: Dict[str, Any]):
+            flow = self._make_flow(
+                body.get("displayName", "Untitled"),
+                body.get("projectId", self.project_id),
+                datetime.now(timezone.utc),
+                body.get("folderId"),
+            )
+            return self._render(flow)
+
+        @router.get("/flows/{flow_id}")
+        def read_flow(flow_id: str):
+            return self._render(get_flow(flow_id))
+
+        @router.post("/flows/{flow_id}")
+        def update_flow(flow_id: str, body: Dict[str, Any]):
+            flow = get_flow(flow_id)
+            # Both Bronn's {"status": ...} and Activepieces' operation form
+            request = body.get("request") if body.get("type") == "CHANGE_STATUS" else body
+            if request.get("status") in ("ENABLED", "DISABLED"):
+                flow["status"] = request["status"]
+            if body.get("type") == "CHANGE_NAME":
+                flow["version"]["displayName"] = body.get("request", {}).get("displayName", "Untitled")
+            flow["updated"] = _iso(datetime.now(timezone.utc))
+            return self._render(flow)
+
+        @router.delete("/flows/{flow_id}", status_code=204)
+        def delete_flow(flow_id: str):
+            get_flow(flow_id)
+            del self.flows[flow_id]
+
+        @router.get("/flow-runs")
+        def list_runs(flowId: Optional[str] = None, projectId: Optional[str] = None,
+                      status: Optional[str] = None, limit: int = 10, cursor: Optional[str] = None):
+            runs = [
+                self._advance(r) for r in self.runs.values()
+                if (flowId is None or r["flowId"] == flowId)
+                and (projectId is None or r["projectId"] == projectId)
+            ]
+            if status:
+                runs = [r for r in runs if r["status"] == status]
+            runs.sort(key=lambda r: r["created"], reverse=True)
+            return self._page(runs, limit, cursor)
+
+        @router.post("/flow-runs", status_code=201)
+        def create_run(body: Dict[str, Any]):
+            flow = get_flow(body.get("flowId", ""))
+            run = self._make_run(flow, datetime.now(timezone.utc))
+            self._run_deadlines[run["id"]] = time.monotonic() + self.faults.run_duration_ms / 1000
+            return self._render(run)
+
+        @router.get("/flow-runs/{run_id}")
+        def read_run(run_id: str):
+            return self._render(get_run(run_id))
+
+        @router.get("/flow-runs/{run_id}/steps")
+        def read_steps(run_id: str):
+            run = get_run(run_id)
+            done = run["status"] != "RUNNING"
+            steps = []
+            for i in range(1, self.steps_per_run + 1):
+                failed = done and run["status"] != "SUCCEEDED" and i == self.steps_per_run
+                steps.append(self._render({
+                    "name": f"step_{i}",
+                    "type": "PIECE",
+                    "status": "FAILED" if failed else ("SUCCEEDED" if done else "RUNNING"),
+                    "duration": (run["duration"] or 0) // self.steps_per_run,
+                    "input": {"index": i},
+                    "output": {"ok": not failed},
+                }))
+            return {"data": steps}
+
+        @router.get("/projects")
+        def list_projects(externalId: Optional[str] = None, limit: int = 10, cursor: Optional[str] = None):
+            projects = [{"id": self.project_id, "externalId": self.project_external_id}]
+            if externalId is not None:
+                projects = [p for p in projects if p["externalId"] == externalId]
+            return self._page(projects, limit, cursor)
+
+        @router.post("/managed-authn/external-token")
+        def external_token(body: Dict[str, Any]):
+            token = body.get("externalAccessToken")
+            if not token:
+                raise HTTPException(status_code=400, detail="externalAccessToken is required")
+            try:
+                claims = jwt.get_unverified_claims(token)
+            except Exception:
+                raise HTTPException(status_code=401, detail="Invalid external token")
+            session = jwt.encode(
+                {
+                    "id": claims.get("externalUserId", "user"),
+                    "projectId": claims.get("externalProjectId", self.project_id),
+                    "exp": int(time.time()) + 7 * 24 * 3600,
+                },
+                FAKE_SESSION_SECRET,
+            )
+            return {
+                "token": session,
+                "id": claims.get("externalUserId", "user"),
+                "projectId": claims.get("externalProjectId", self.project_id),
+                "firstName": claims.get("firstName", ""),
+                "lastName": claims.get("lastName", ""),
+            }
+
+        return router
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Activepieces")
+        app.middleware("http")(self._inject)
+        api = self._api()
+        app.include_router(api, prefix="/v1")
+        app.include_router(api, prefix="/api/v1")
+
+        @app.get("/_fake/config")
+        def read_config():
+            return asdict(self.faults)
+
+        @app.put("/_fake/config")
+        def update_config(body: Dict[str, Any]):
+            self.faults = Faults(**{**asdict(self.faults), **body})
+            return asdict(self.faults)
+
+        @app.get("/_fake/stats")
+        def stats():
+            return {
+                "flows": len(self.flows),
+                "runs": len(self.runs),
+                "requests": sum(self.requests.values()),
+                "injected_errors": self.injected_errors,
+                "by_route": dict(self.requests),
+            }
+
+        return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--flows", type=int, default=100)
+    parser.add_argument("--runs-per-flow", type=int, default=5)
+    parser.add_argument("--project-id", default="proj-1")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    parser.add_argument("--run-duration-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    server = FakeActivepieces(
+        flows=args.flows,
+        runs_per_flow=args.runs_per_flow,
+        project_id=args.project_id,
+        faults=Faults(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            payload_bytes=args.payload_bytes,
+            run_duration_ms=args.run_duration_ms,
+        ),
+    )
+    uvicorn.run(server.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+In-Process Caching Utilities
+
+Bounded LRU caches whose entries carry their own expiry time. Used to keep
+hot, expensive-to-compute values (verified tokens, signed JWTs, session
+tokens) in memory between requests.
+
+Concurrent misses for the same key are collapsed into a single load, so a
+burst of parallel requests does the expensive work once.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a per-entry absolute expiry (epoch seconds).
+
+    Entries are never returned once their expiry has passed. When the cache
+    is full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024, name: str = "cache"):
+        self.maxsize = maxsize
+        self.name = name
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, "_Flight"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _get_locked(self, key: Hashable, now: float) -> Tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if expires_at <= now:
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired."""
+        with self._lock:
+            found, value = self._get_locked(key, time.time())
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        """Store value until the given absolute expiry (epoch seconds)."""
+        if expires_at <= time.time() or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Tuple[Any, Optional[float]]],
+    ) -> Any:
+        """
+        Return the cached value for key, loading it on a miss.
+
+        The loader returns (value, expires_at). A None expiry means the value
+        is returned to every waiting caller but not stored. Only one thread
+        runs the loader per key; concurrent callers wait for its result.
+        """
+        with self._lock:
+            found, value = self._get_locked(key, time.time())
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            value, expires_at = loader()
+        except BaseException as e:
+            flight.fail(e)
+            raise
+        else:
+            if expires_at is not None:
+                self.set(key, value, expires_at)
+            flight.resolve(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class _Flight:
+    """A load in progress that other threads can wait on."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._value: Any = None
+        self._error: Optional[BaseException] = None
+
+    def resolve(self, value: Any) -> None:
+        self._value = value
+        self._event.set()
+
+    def fail(self, error: BaseException) -> None:
+        self._error = error
+        self._event.set()
+
+    def wait(self) -> Any:
+        self._event.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class AsyncTTLCache:
+    """
+    LRU cache for values produced by coroutines, for use on one event loop.
+
+    Like TTLCache, entries carry an absolute expiry and concurrent misses
+    for a key share a single load. Entries may also carry a refresh time:
+    once it passes, the cached value is still served but a background
+    reload is started, so callers don't wait for the refresh.
+    """
+
+    def __init__(self, maxsize: int = 1024, name: str = "cache"):
+        self.maxsize = maxsize
+        self.name = name
+        # key -> (value, expires_at, refresh_at)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, Optional[float]]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.refreshes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _store(self, key: Hashable, value: Any, expires_at: float, refresh_at: Optional[float]) -> None:
+        if expires_at <= time.time() or self.maxsize <= 0:
+            return
+        self._data[key] = (value, expires_at, refresh_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _start_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Tuple[Any, float, Optional[float]]]],
+    ) -> "asyncio.Task":
+        async def load() -> Any:
+            try:
+                value, expires_at, refresh_at = await loader()
+                self._store(key, value, expires_at, refresh_at)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(load())
+        self._inflight[key] = task
+        return task
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Tuple[Any, float, Optional[float]]]],
+    ) -> Any:
+        """
+        Return the cached value for key, loading it on a miss.
+
+        The loader returns (value, expires_at, refresh_at). A refresh_at of
+        None disables refresh-ahead for that entry (e.g. cached failures).
+        """
+        now = time.time()
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires_at, refresh_at = entry
+            if expires_at > now:
+                self.hits += 1
+                self._data.move_to_end(key)
+                if refresh_at is not None and refresh_at <= now and key not in self._inflight:
+                    self.refreshes += 1
+                    task = self._start_load(key, loader)
+                    # Background refresh: a failure keeps the current entry
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                return value
+            del self._data[key]
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_load(key, loader)
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled caller doesn't cancel the shared load
+        return await asyncio.shield(task)
+
+    def peek(self, key: Hashable) -> Optional[Tuple[Any, float, Optional[float]]]:
+        """Return the live (value, expires_at, refresh_at) entry without counting a lookup."""
+        entry = self._data.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
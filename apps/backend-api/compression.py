@@ -0,0 +1,372 @@
+"""
+Negotiated Response Compression
+
+ASGI middleware that compresses responses with the best encoding the
+client accepts: zstd (zstandard package), brotli (brotli package) or
+gzip, in COMPRESSION_ENCODINGS order when q-values tie. brotli and
+zstandard are optional (requirements-compression.txt, installed in the
+Docker image); codecs whose package is missing are simply not offered.
+
+A response is left alone when it is below COMPRESSION_MIN_SIZE, already
+has a Content-Encoding (e.g. passed through from Activepieces), has a
+content type that is already compressed or must stay unbuffered
+(images, archives, text/event-stream), has Cache-Control: no-transform,
+or has no body (204, 304).
+
+Streaming responses (the engine proxy) are compressed chunk by chunk,
+with a flush after each chunk so nothing is held back. Strong ETags
+become weak ETags on compressed responses, which If-None-Match still
+matches (see proxy_cache.etag_matches).
+
+Chunks of COMPRESSION_OFFLOAD_SIZE bytes or more are compressed on the
+"compress" executor instead of the event loop; the codecs release the
+GIL while they work.
+
+Configuration (environment):
+
+    COMPRESSION_ENABLED         - turn the middleware off ("false")
+    COMPRESSION_MIN_SIZE        - smallest body compressed (bytes)
+    COMPRESSION_ENCODINGS       - server preference, e.g. "zstd,br,gzip"
+    COMPRESSION_GZIP_LEVEL      - 1-9
+    COMPRESSION_BROTLI_QUALITY  - 0-11
+    COMPRESSION_ZSTD_LEVEL      - 1-22
+    COMPRESSION_OFFLOAD_SIZE    - chunk size compressed off the event loop (bytes)
+"""
+
+import os
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from executors import ExecutorSaturated, run_blocking
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_ENCODINGS = [
+    e.strip() for e in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if e.strip()
+]
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+COMPRESSION_OFFLOAD_SIZE = int(os.getenv("COMPRESSION_OFFLOAD_SIZE", "262144"))
+
+# Content types that are already compressed, or must not be buffered
+_SKIP_CONTENT_TYPES = (
+    "image/", "video/", "audio/", "font/woff",
+    "application/zip", "application/gzip", "application/x-gzip",
+    "application/zstd", "application/octet-stream",
+    "text/event-stream",
+)
+_COMPRESSIBLE_IMAGES = ("image/svg+xml",)
+
+
+# ============================================================================
+# Codecs
+# ============================================================================
+
+class _Gzip:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self.level = level
+        self._c = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+class _Brotli:
+    name = "br"
+
+    def __init__(self, level: int):
+        import brotli
+        self.level = level
+        self._c = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _Zstd:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        import zstandard
+        self.level = level
+        self._block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(self._block)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+def _available(module: str) -> bool:
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+# encoding -> (codec class, level), for codecs whose package is installed
+CODECS: Dict[str, Tuple[Callable[[int], Any], int]] = {"gzip": (_Gzip, COMPRESSION_GZIP_LEVEL)}
+if _available("brotli"):
+    CODECS["br"] = (_Brotli, COMPRESSION_BROTLI_QUALITY)
+if _available("zstandard"):
+    CODECS["zstd"] = (_Zstd, COMPRESSION_ZSTD_LEVEL)
+
+
+def negotiate(accept_encoding: str, preference: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Pick the encoding for an Accept-Encoding header: the highest q-value
+    among available codecs, ties broken by server preference. None means
+    send the body as is.
+    """
+    if not accept_encoding:
+        return None
+    order = [e for e in (preference or COMPRESSION_ENCODINGS) if e in CODECS]
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        name = "gzip" if name.strip() == "x-gzip" else name.strip()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[name] = q
+
+    wildcard = qualities.get("*")
+    best, best_q = None, 0.0
+    for encoding in order:
+        q = qualities.get(encoding, wildcard if wildcard is not None else 0.0)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+# ============================================================================
+# Metrics
+# ============================================================================
+
+class CompressionStats:
+    """Per-encoding volume and CPU time, plus skip reasons."""
+
+    def __init__(self):
+        self.encodings: Dict[str, Dict[str, float]] = {}
+        self.skipped: Dict[str, int] = {}
+
+    def _entry(self, encoding: str) -> Dict[str, float]:
+        return self.encodings.setdefault(
+            encoding, {"bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0, "responses": 0}
+        )
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float) -> None:
+        entry = self._entry(encoding)
+        entry["bytes_in"] += bytes_in
+        entry["bytes_out"] += bytes_out
+        entry["cpu_seconds"] += cpu_seconds
+
+    def response(self, encoding: str) -> None:
+        self._entry(encoding)["responses"] += 1
+
+    def skip(self, reason: str) -> None:
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        encodings = {}
+        for name, (_, level) in CODECS.items():
+            entry = self.encodings.get(name, {})
+            bytes_in, bytes_out = entry.get("bytes_in", 0), entry.get("bytes_out", 0)
+            encodings[name] = {
+                "level": level,
+                "responses": entry.get("responses", 0),
+                "bytes_in": bytes_in,
+                "bytes_out": bytes_out,
+                "ratio": round(bytes_out / bytes_in, 3) if bytes_in else None,
+                "cpu_ms": round(entry.get("cpu_seconds", 0.0) * 1000, 2),
+                "cpu_us_per_kb": round(entry["cpu_seconds"] * 1e6 / (bytes_in / 1024), 2) if bytes_in else None,
+            }
+        return {
+            "enabled": COMPRESSION_ENABLED,
+            "min_size": COMPRESSION_MIN_SIZE,
+            "preference": [e for e in COMPRESSION_ENCODINGS if e in CODECS],
+            "encodings": encodings,
+            "skipped": dict(self.skipped),
+        }
+
+
+compression_stats = CompressionStats()
+
+
+def get_compression_stats() -> Dict[str, Any]:
+    return compression_stats.stats()
+
+
+# ============================================================================
+# Middleware
+# ============================================================================
+
+def _timed(fn: Callable[[bytes], bytes], data: bytes) -> Tuple[bytes, float]:
+    """Run a codec step, measuring the CPU time of the thread it runs on."""
+    start = time.thread_time()
+    out = fn(data)
+    return out, time.thread_time() - start
+
+
+class CompressionMiddleware:
+    """Compresses HTTP responses per the request's Accept-Encoding."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        preference: Optional[List[str]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.preference = preference
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.preference)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressingResponder:
+    """Per-response state: holds the start message until the first body chunk."""
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.codec = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _skip_reason(self, message: Message) -> Optional[str]:
+        status = message["status"]
+        if status < 200 or status in (204, 304):
+            return "no_body"
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers:
+            return "already_encoded"
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(_SKIP_CONTENT_TYPES) and not content_type.startswith(_COMPRESSIBLE_IMAGES):
+            return "content_type"
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return "no_transform"
+        content_length = headers.get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) < self.minimum_size:
+            return "too_small"
+        return None
+
+    async def _step(self, fn: Callable[[bytes], bytes], data: bytes) -> bytes:
+        if len(data) >= COMPRESSION_OFFLOAD_SIZE:
+            try:
+                out, cpu = await run_blocking("compress", _timed, fn, data)
+            except ExecutorSaturated:
+                out, cpu = _timed(fn, data)
+        else:
+            out, cpu = _timed(fn, data)
+        compression_stats.record(self.encoding, len(data), len(out), cpu)
+        return out
+
+    def _encoded_start(self, body_length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if body_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(body_length)
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        return self.start_message
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            reason = self._skip_reason(message)
+            if reason:
+                compression_stats.skip(reason)
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.start_message = message
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message_type != "http.response.body":
+            # Not a plain body (e.g. a send extension): release the response untouched
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.codec is None:
+            # First body chunk: decide
+            if not more_body and len(body) < self.minimum_size:
+                compression_stats.skip("too_small")
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            factory, level = CODECS[self.encoding]
+            self.codec = factory(level)
+            compression_stats.response(self.encoding)
+            if not more_body:
+                out = await self._step(lambda data: self.codec.compress(data) + self.codec.finish(), body)
+                await self.send(self._encoded_start(len(out)))
+                await self.send({"type": "http.response.body", "body": out})
+                return
+            await self.send(self._encoded_start(None))
+
+        if more_body:
+            out = await self._step(lambda data: self.codec.compress(data) + self.codec.flush(), body)
+        else:
+            out = await self._step(lambda data: self.codec.compress(data) + self.codec.finish(), body)
+        await self.send({"type": "http.response.body", "body": out, "more_body": more_body})
@@ -0,0 +1,173 @@
+"""
+Bounded Executors for Blocking Work
+
+Async routes must not call blocking functions (Firebase Admin SDK, RSA
+signing, sync SQLAlchemy sessions) directly on the event loop: under a
+single uvicorn worker, one slow call stalls every other request and
+WebSocket. This module provides small, named thread pools for that work.
+
+Each pool has a fixed number of workers and a cap on pending calls, so a
+burst of logins queues (or is shed with a 503) instead of spawning
+unbounded threads. Pool sizes are configured per pool via environment:
+
+    EXECUTOR_<NAME>_WORKERS       - worker threads
+    EXECUTOR_<NAME>_MAX_PENDING   - queued + running calls before rejecting
+
+Usage:
+    from executors import run_blocking
+
+    decoded = await run_blocking("auth", verify_firebase_token, token)
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+# Default sizing per pool: (workers, max_pending)
+#   auth    - Firebase Admin SDK calls (network + RSA verify)
+#   signing - RSA JWT minting
+#   db      - sync SQLAlchemy work; matches the engine pool (5 + 2 overflow)
+#   compress - response compression of large bodies (codecs release the GIL)
+_DEFAULTS = {
+    "auth": (8, 256),
+    "signing": (4, 256),
+    "db": (7, 256),
+    "compress": (2, 64),
+}
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a pool already has max_pending calls queued or running."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Executor '{name}' is saturated")
+        self.name = name
+
+
+class BoundedExecutor:
+    """A named thread pool with a pending-call limit and timing metrics."""
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"bronn-{name}"
+        )
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn(*args, **kwargs) on this pool and await its result."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated(self.name)
+            self.pending += 1
+
+        submitted = time.perf_counter()
+
+        def call() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self.active += 1
+                wait = started - submitted
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.total_run += time.perf_counter() - started
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        # Carry contextvars into the worker thread, as asyncio.to_thread does
+        ctx = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool, functools.partial(ctx.run, call))
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        finished = self.completed + self.failed
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / finished * 1000, 3) if finished else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "avg_run_ms": round(self.total_run / finished * 1000, 3) if finished else 0.0,
+        }
+
+
+_executors: Dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """Return the named pool, creating it from environment config on first use."""
+    executor = _executors.get(name)
+    if executor is not None:
+        return executor
+
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            workers, max_pending = _DEFAULTS.get(name, (4, 256))
+            prefix = f"EXECUTOR_{name.upper()}"
+            executor = BoundedExecutor(
+                name,
+                max_workers=int(os.getenv(f"{prefix}_WORKERS", str(workers))),
+                max_pending=int(os.getenv(f"{prefix}_MAX_PENDING", str(max_pending))),
+            )
+            _executors[name] = executor
+        return executor
+
+
+async def run_blocking(pool: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking function on the named pool without stalling the event loop."""
+    return await get_executor(pool).run(fn, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Metrics for every pool created so far."""
+    return {name: executor.stats() for name, executor in _executors.items()}
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Stop all pools (app shutdown)."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait)
+        _executors.clear()
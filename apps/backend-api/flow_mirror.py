@@ -0,0 +1,344 @@
+"""
+Activepieces Flow Mirror
+
+Keeps a copy of each registered engine project's flows in the Bronn
+`workflows` table (definition_json, keyed by engine_flow_id), so flow
+lists can be served from Postgres, with its indexes and RLS, instead of
+a cross-service call on every page load.
+
+A sync walks the project's flows with iter_workflows (cursor-following,
+prefetching) and, in one transaction, writes each flow that has no row
+yet or whose engine `updated` timestamp differs from its row's, then
+deletes rows whose flow no longer exists.
+
+The walk covers the whole project on every pass: Activepieces' flow list
+has no updated-since filter, and a complete walk is the only way to see
+deletions. Deciding per row (rather than against a project-wide
+high-water mark) means a flow edited while a walk was past it is still
+picked up on the next pass, whatever else changed meanwhile. Unchanged
+flows cost one indexed read of their key and timestamp.
+
+Each project's FlowSyncState keeps a high-water mark, the largest engine
+`updated` timestamp mirrored so far, for reporting only.
+
+Projects are registered through the workflows router, which only accepts
+the project provisioned for the target workspace (see
+WorkflowEngine.list_project_ids).
+
+A background task syncs every registered project each
+FLOW_MIRROR_INTERVAL seconds; registering a project syncs it at once.
+Callbacks added with add_listener() run after every sync that wrote
+flows (run_events uses this to retry runs of flows it had not seen).
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from executors import run_blocking
+
+logger = logging.getLogger(__name__)
+
+FLOW_MIRROR_ENABLED = os.getenv("FLOW_MIRROR_ENABLED", "true").lower() in ("1", "true", "yes")
+FLOW_MIRROR_INTERVAL = float(os.getenv("FLOW_MIRROR_INTERVAL", "60"))
+FLOW_MIRROR_PAGE_SIZE = int(os.getenv("FLOW_MIRROR_PAGE_SIZE", "100"))
+# Flow ids per IN (...) lookup of mirrored rows
+MIRROR_QUERY_CHUNK = 500
+
+
+def parse_engine_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Engine ISO-8601 timestamp -> naive UTC datetime (as stored by the models)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def register_project(
+    db: Session,
+    project_id: str,
+    workspace_id,
+    created_by: str,
+    tenant_id: Optional[str] = None,
+):
+    """Create (or re-point) the sync state mirroring project_id into a workspace."""
+    from models import FlowSyncState
+
+    state = db.get(FlowSyncState, project_id)
+    if state is None:
+        state = FlowSyncState(project_id=project_id)
+        db.add(state)
+    elif state.workspace_id != workspace_id:
+        # Mirrored rows belong to the old workspace and are rewritten on the
+        # next sync; restart the reported mark with them
+        state.high_water_mark = None
+    state.workspace_id = workspace_id
+    state.created_by = created_by
+    state.tenant_id = tenant_id
+    db.commit()
+    db.refresh(state)
+    return state
+
+
+class FlowMirror:
+    """Syncs registered engine projects into the workflows table."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        engine_factory: Optional[Callable[[], Any]] = None,
+        interval: float = FLOW_MIRROR_INTERVAL,
+        page_size: int = FLOW_MIRROR_PAGE_SIZE,
+    ):
+        self._session_factory = session_factory
+        self._engine_factory = engine_factory
+        self.interval = interval
+        self.page_size = page_size
+        self._task: Optional[asyncio.Task] = None
+        self._syncing: Set[str] = set()
+        self._listeners: List[Callable[[], Any]] = []
+        self.syncs = 0
+        self.failures = 0
+        self.flows_written = 0
+        self.flows_deleted = 0
+        self.flows_scanned = 0
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from database import SessionLocal
+            return SessionLocal()
+        return self._session_factory()
+
+    def add_listener(self, callback: Callable[[], Any]) -> None:
+        """Call callback after each sync that writes flows (idempotent)."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _notify(self) -> None:
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Flow mirror listener failed: {e}")
+
+    def _workflow_engine(self):
+        if self._engine_factory is None:
+            from workflow_engine import get_workflow_engine
+            return get_workflow_engine()
+        return self._engine_factory()
+
+    # ------------------------------------------------------------------
+    # Database side (runs on the "db" executor)
+    # ------------------------------------------------------------------
+
+    def _is_registered(self, project_id: str) -> bool:
+        from models import FlowSyncState
+
+        db = self._new_session()
+        try:
+            return db.get(FlowSyncState, project_id) is not None
+        finally:
+            db.close()
+
+    def _apply(self, project_id: str, flows: List[Any], seen: Optional[Set[str]]) -> Dict[str, int]:
+        """Upsert new or changed flows, delete vanished ones and advance the mark, in one transaction."""
+        from database import set_db_context
+        from models import FlowSyncState, Workflow
+
+        db = self._new_session()
+        try:
+            state = db.get(FlowSyncState, project_id)
+            if state is None:
+                return {"written": 0, "deleted": 0}
+            set_db_context(db, state.tenant_id, "flow-mirror")
+
+            # Key, timestamp and placement of the rows already mirrored
+            stored = {}
+            ids = [flow.id for flow in flows]
+            for start in range(0, len(ids), MIRROR_QUERY_CHUNK):
+                stored.update({
+                    row.engine_flow_id: row for row in db.query(
+                        Workflow.engine_flow_id,
+                        Workflow.engine_project_id,
+                        Workflow.workspace_id,
+                        Workflow.updated_at,
+                    ).filter(Workflow.engine_flow_id.in_(ids[start:start + MIRROR_QUERY_CHUNK]))
+                })
+
+            def unchanged(flow) -> bool:
+                # Without an engine timestamp there is no telling: rewrite
+                row = stored.get(flow.id)
+                updated = parse_engine_timestamp(flow.updated_at)
+                return (
+                    row is not None
+                    and updated is not None
+                    and row.updated_at == updated
+                    and row.engine_project_id == project_id
+                    and row.workspace_id == state.workspace_id
+                )
+
+            changed = [flow for flow in flows if not unchanged(flow)]
+            existing = {}
+            changed_ids = [flow.id for flow in changed if flow.id in stored]
+            for start in range(0, len(changed_ids), MIRROR_QUERY_CHUNK):
+                existing.update({
+                    row.engine_flow_id: row for row in db.query(Workflow).filter(
+                        Workflow.engine_flow_id.in_(changed_ids[start:start + MIRROR_QUERY_CHUNK])
+                    )
+                })
+
+            now = datetime.utcnow()
+            for flow in changed:
+                row = existing.get(flow.id)
+                if row is None:
+                    row = Workflow(
+                        engine_flow_id=flow.id,
+                        created_by=state.created_by,
+                        created_at=parse_engine_timestamp(flow.created_at) or now,
+                    )
+                    db.add(row)
+                row.engine_project_id = project_id
+                row.workspace_id = state.workspace_id
+                row.tenant_id = state.tenant_id
+                row.name = (flow.name or "Untitled")[:255]
+                row.status = flow.status.value
+                row.definition_json = flow.definition
+                row.updated_at = parse_engine_timestamp(flow.updated_at) or now
+
+            deleted = 0
+            if seen is not None:
+                # The walk completed, so anything not seen is gone upstream
+                deleted = db.query(Workflow).filter(
+                    Workflow.engine_project_id == project_id,
+                    Workflow.engine_flow_id.notin_(seen),
+                ).delete(synchronize_session=False)
+
+            marks = [flow.updated_at for flow in changed if flow.updated_at]
+            if marks:
+                state.high_water_mark = max(marks + [state.high_water_mark or ""])
+            state.last_synced_at = now
+            state.last_error = None
+            db.commit()
+            return {"written": len(changed), "deleted": deleted}
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _record_error(self, project_id: str, error: str) -> None:
+        from models import FlowSyncState
+
+        db = self._new_session()
+        try:
+            state = db.get(FlowSyncState, project_id)
+            if state is not None:
+                state.last_error = error[:2000]
+                db.commit()
+        finally:
+            db.close()
+
+    def _project_ids(self) -> List[str]:
+        from models import FlowSyncState
+
+        db = self._new_session()
+        try:
+            return [row[0] for row in db.query(FlowSyncState.project_id).all()]
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    async def sync_project(self, project_id: str) -> Dict[str, int]:
+        """
+        Mirror one project's new, changed and deleted flows.
+
+        Returns counts of flows scanned, written and deleted. A project
+        already being synced is skipped (scanned == -1).
+        """
+        if project_id in self._syncing:
+            return {"scanned": -1, "written": 0, "deleted": 0}
+        self._syncing.add(project_id)
+        try:
+            if not await run_blocking("db", self._is_registered, project_id):
+                return {"scanned": 0, "written": 0, "deleted": 0}
+
+            flows, seen = [], set()
+            async for flow in self._workflow_engine().iter_workflows(project_id, page_size=self.page_size):
+                if flow.id not in seen:
+                    seen.add(flow.id)
+                    flows.append(flow)
+
+            result = await run_blocking("db", self._apply, project_id, flows, seen)
+            self.syncs += 1
+            self.flows_scanned += len(seen)
+            self.flows_written += result["written"]
+            self.flows_deleted += result["deleted"]
+            if result["written"]:
+                self._notify()
+            return {"scanned": len(seen), **result}
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Flow mirror sync failed for project {project_id}: {e}")
+            await run_blocking("db", self._record_error, project_id, str(e))
+            raise
+        finally:
+            self._syncing.discard(project_id)
+
+    async def sync_all(self) -> None:
+        """Sync every registered project, one at a time."""
+        for project_id in await run_blocking("db", self._project_ids):
+            try:
+                await self.sync_project(project_id)
+            except Exception:
+                pass  # Recorded on the project's sync state
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync_all()
+            except Exception as e:
+                logger.warning(f"Flow mirror pass failed: {e}")
+
+    def start(self) -> None:
+        """Start the periodic sync task on the running loop (idempotent)."""
+        if not FLOW_MIRROR_ENABLED or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the periodic sync task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "syncing": len(self._syncing),
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "flows_scanned": self.flows_scanned,
+            "flows_written": self.flows_written,
+            "flows_deleted": self.flows_deleted,
+        }
+
+
+flow_mirror = FlowMirror()
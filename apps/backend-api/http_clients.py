@@ -0,0 +1,343 @@
+"""
+Shared Outbound HTTP Clients
+
+One long-lived httpx.AsyncClient per upstream service, so outbound calls
+reuse pooled keep-alive connections instead of paying for a new TCP (and
+TLS) handshake on every request.
+
+Clients are created in the FastAPI lifespan (or lazily on first use,
+e.g. in the standalone MCP server) and closed on shutdown. Each call
+names a route, which selects its timeout, circuit breaker and bulkhead
+(see resilience.py); idempotent calls are retried within a retry budget.
+Per-upstream counters are exposed through /api/health/metrics.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from resilience import (
+    ADAPTIVE_TIMEOUT_EXEMPT,
+    IDEMPOTENT_METHODS,
+    RETRY_MAX_ATTEMPTS,
+    RETRYABLE_STATUS,
+    Bulkhead,
+    CircuitBreaker,
+    LatencyTracker,
+    RetryBudget,
+    UpstreamUnavailable,
+    backoff_delay,
+    bulkhead_limit,
+    is_failure,
+)
+
+logger = logging.getLogger(__name__)
+
+# Connection pool limits, shared by every upstream client
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+# HTTP/2 needs the `h2` package (httpx[http2]); falls back to HTTP/1.1
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Timeout (seconds) per route; override with HTTP_TIMEOUT_<ROUTE>. httpx
+# applies it to each operation separately (connect, pool wait, every read
+# and write), so it bounds the longest silence, not the whole request
+_DEFAULT_ROUTE_TIMEOUTS = {
+    "proxy": 30.0,          # /api/workflows/engine/* catch-all proxy
+    "flows": 15.0,          # /api/flows-proxy
+    "engine": 30.0,         # ActivepiecesAdapter
+    "managed_auth": 10.0,   # JWT -> session exchange
+    "mcp": 10.0,            # MCP server -> Bronn API
+}
+ROUTE_TIMEOUTS = {
+    route: float(os.getenv(f"HTTP_TIMEOUT_{route.upper()}", str(default)))
+    for route, default in _DEFAULT_ROUTE_TIMEOUTS.items()
+}
+DEFAULT_TIMEOUT = 30.0
+
+
+def route_timeout(route: str) -> httpx.Timeout:
+    """Per-operation timeout for a named route: connect is capped at HTTP_CONNECT_TIMEOUT."""
+    total = ROUTE_TIMEOUTS.get(route, DEFAULT_TIMEOUT)
+    return httpx.Timeout(total, connect=min(total, HTTP_CONNECT_TIMEOUT))
+
+
+# Connection-level failures where the request never reached the upstream
+# application (or hit a stale pooled connection): cheap and safe to retry.
+# Timeouts are not retried, so a brownout fails fast.
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.RemoteProtocolError)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class UpstreamClient:
+    """
+    A pooled AsyncClient for one upstream, plus request metrics.
+
+    An AsyncClient's connections are bound to the event loop they were
+    opened on, so there is one client per loop (e.g. the app's loop plus
+    a test client's). Clients are never swapped under a live loop; those
+    whose loop has been closed are dropped on the next lookup, and
+    aclose() closes every client whose loop is still open.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+        self.requests = 0
+        self.errors = 0
+        self.inflight = 0
+        self.total_seconds = 0.0
+        self.clients_created = 0
+        self.rejected = 0
+        self.retry_budget = RetryBudget()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._bulkheads: Dict[str, Bulkhead] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+
+    def _new_client(self) -> httpx.AsyncClient:
+        http2 = HTTP2_ENABLED and _http2_available()
+        if HTTP2_ENABLED and not http2:
+            logger.warning("HTTP2_ENABLED is set but the h2 package is missing; using HTTP/1.1")
+        self.clients_created += 1
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=DEFAULT_TIMEOUT,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            # Connections of a closed loop cannot be closed from this one
+            for stale in [l for l in self._clients if l.is_closed()]:
+                del self._clients[stale]
+            client = self._clients[loop] = self._new_client()
+        return client
+
+    def breaker(self, route: str) -> CircuitBreaker:
+        if route not in self._breakers:
+            self._breakers[route] = CircuitBreaker(f"{self.name}/{route}")
+        return self._breakers[route]
+
+    def bulkhead(self, route: str) -> Bulkhead:
+        if route not in self._bulkheads:
+            self._bulkheads[route] = Bulkhead(f"{self.name}/{route}", bulkhead_limit(route))
+        return self._bulkheads[route]
+
+    def latency(self, route: str) -> LatencyTracker:
+        if route not in self._latency:
+            self._latency[route] = LatencyTracker()
+        return self._latency[route]
+
+    def adaptive_timeout(self, route: str) -> httpx.Timeout:
+        """
+        The route timeout, with the read timeout tightened to observed
+        latency unless the route is in ADAPTIVE_TIMEOUT_EXEMPT.
+        """
+        base = route_timeout(route)
+        if route in ADAPTIVE_TIMEOUT_EXEMPT:
+            return base
+        read = self.latency(route).timeout(base.read)
+        return httpx.Timeout(read, connect=min(read, base.connect))
+
+    def _admit(self, route: str) -> Tuple[CircuitBreaker, Bulkhead]:
+        """Take a bulkhead slot and pass the breaker, or raise UpstreamUnavailable."""
+        bulkhead = self.bulkhead(route)
+        if not bulkhead.acquire():
+            self.rejected += 1
+            raise UpstreamUnavailable(f"Too many concurrent {self.name} '{route}' requests")
+        breaker = self.breaker(route)
+        if not breaker.allow():
+            bulkhead.release()
+            self.rejected += 1
+            raise UpstreamUnavailable(
+                f"{self.name} '{route}' is failing; circuit open",
+                retry_after=breaker.retry_after(),
+            )
+        return breaker, bulkhead
+
+    async def _send(self, route: str, send) -> httpx.Response:
+        """Run one attempt under the route's bulkhead and breaker, with metrics."""
+        breaker, bulkhead = self._admit(route)
+        self.requests += 1
+        self.inflight += 1
+        start = time.perf_counter()
+        try:
+            response = await send()
+        except httpx.HTTPError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled by our caller (e.g. client went away): no verdict
+            breaker.abandon()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.inflight -= 1
+            self.total_seconds += elapsed
+            bulkhead.release()
+        if is_failure(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            self.latency(route).record(elapsed)
+        return response
+
+    async def request(self, method: str, url: str, *, route: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request with the route's timeout (unless `timeout` is given).
+
+        Idempotent methods are retried, with jittered backoff and within the
+        upstream's retry budget, on connection errors and 502/503/504.
+        Raises UpstreamUnavailable without sending when the route's breaker
+        is open or its bulkhead is full.
+        """
+        kwargs.setdefault("timeout", self.adaptive_timeout(route))
+        client = self.client
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            response = error = None
+            try:
+                response = await self._send(route, lambda: client.request(method, url, **kwargs))
+            except UpstreamUnavailable:
+                raise
+            except httpx.HTTPError as e:
+                error = e
+            retry = idempotent and attempt < RETRY_MAX_ATTEMPTS and (
+                isinstance(error, _RETRYABLE_ERRORS)
+                or (response is not None and response.status_code in RETRYABLE_STATUS)
+            )
+            if not retry or not self.retry_budget.withdraw():
+                if error is not None:
+                    self.errors += 1
+                    raise error
+                return response
+            if response is not None:
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(backoff_delay(attempt))
+
+    async def open_stream(self, method: str, url: str, *, route: str,
+                          timeout: Optional[httpx.Timeout] = None, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request and return as soon as the response headers arrive.
+
+        The body is left unread: iterate it with aiter_raw()/aiter_bytes()
+        and always `await response.aclose()` to return the connection.
+        Guarded by the route's breaker and bulkhead (up to the headers),
+        but never retried: the request body may already be consumed.
+        """
+        client = self.client
+        request = client.build_request(
+            method, url, timeout=timeout or route_timeout(route), **kwargs
+        )
+        try:
+            return await self._send(route, lambda: client.send(request, stream=True))
+        except UpstreamUnavailable:
+            raise
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+
+    async def aclose(self) -> None:
+        """Close the running loop's client, and ask other live loops to close theirs."""
+        current = asyncio.get_running_loop()
+        clients, self._clients = dict(self._clients), weakref.WeakKeyDictionary()
+        for loop, client in clients.items():
+            if client.is_closed or loop.is_closed():
+                continue
+            if loop is current:
+                await client.aclose()
+            else:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    def _pool_connections(self) -> Dict[str, int]:
+        # httpcore exposes no public pool stats; read them defensively
+        open_, idle = 0, 0
+        for client in list(self._clients.values()):
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = getattr(pool, "connections", None) or []
+            open_ += len(connections)
+            idle += sum(1 for c in connections if c.is_idle())
+        return {"open": open_, "idle": idle}
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "inflight": self.inflight,
+            "avg_ms": round(self.total_seconds / self.requests * 1000, 2) if self.requests else 0.0,
+            "clients_created": self.clients_created,
+            "clients": len(self._clients),
+            "connections": self._pool_connections(),
+            "rejected": self.rejected,
+            "retry_budget": self.retry_budget.stats(),
+            "routes": {
+                route: {
+                    "breaker": self.breaker(route).stats(),
+                    "bulkhead": self.bulkhead(route).stats(),
+                    "latency": self.latency(route).stats(),
+                    "timeout_s": self.adaptive_timeout(route).read,
+                }
+                for route in sorted(set(self._breakers) | set(self._latency))
+            },
+        }
+
+
+_clients: Dict[str, UpstreamClient] = {}
+
+
+def get_http_client(upstream: str) -> UpstreamClient:
+    """Return the shared client for an upstream ("activepieces", "bronn", ...)."""
+    client = _clients.get(upstream)
+    if client is None:
+        client = _clients.setdefault(upstream, UpstreamClient(upstream))
+    return client
+
+
+def start_http_clients(*upstreams: str) -> None:
+    """Create the clients for these upstreams on the running loop (app startup)."""
+    for upstream in upstreams:
+        get_http_client(upstream).client
+
+
+async def close_http_clients() -> None:
+    """Close every pooled connection. Called on application shutdown."""
+    for client in list(_clients.values()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close HTTP client {client.name}: {e}")
+
+
+def http_client_stats() -> Dict[str, Any]:
+    """Per-upstream request and pool counters."""
+    return {
+        "http2": HTTP2_ENABLED and _http2_available(),
+        "upstreams": {name: client.stats() for name, client in _clients.items()},
+    }
@@ -3,10 +3,25 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
 from typing import List
 import os
 import models, database
-from routers import activepieces, auth, agents, workflows, workspaces, sso, live_logs, flows_proxy
+from routers import activepieces, auth, agents, workflows, workspaces, sso, live_logs, flows_proxy, webhooks
+from auth.firebase_auth import start_token_verifier, stop_token_verifier, get_token_cache_stats
+from auth.signing_key import get_key_manager, get_jwt_cache_stats, shutdown_mint_pool
+from auth.activepieces_sync import get_session_cache_stats
+from auth.user_sync import login_writes, get_user_cache_stats
+from auth.session_tokens import get_session_stats, start_revocation_sync, stop_revocation_sync
+from executors import ExecutorSaturated, executor_stats, shutdown_executors
+from http_clients import start_http_clients, close_http_clients, http_client_stats
+from routers.activepieces import get_proxy_cache_stats
+from routers.flows_proxy import get_flows_cache_stats
+from workflow_engine import execution_watchers
+from flow_mirror import flow_mirror
+from run_events import run_events
+from serialization import FastJSONResponse
+from compression import CompressionMiddleware, get_compression_stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,11 +55,43 @@ def get_cors_origins() -> List[str]:
     ]
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop process-wide background services."""
+    # Prefetch Firebase signing certs so token checks never fetch inline
+    start_token_verifier()
+    # Revocations (logouts, disabled accounts) made on other instances
+    start_revocation_sync()
+    login_writes.start()
+    # Pooled keep-alive connections for all Activepieces traffic
+    start_http_clients("activepieces")
+    # Periodic mirror of registered Activepieces projects into workflows
+    flow_mirror.start()
+    # Batched writes of ingested engine run events into workflow_runs;
+    # runs of flows the mirror had not seen yet are retried after it syncs
+    run_events.start()
+    flow_mirror.add_listener(run_events.retry_unmatched)
+    yield
+    stop_token_verifier()
+    stop_revocation_sync()
+    # Write buffered login updates and run events before the process exits
+    login_writes.stop()
+    run_events.stop()
+    shutdown_mint_pool()
+    await flow_mirror.stop()
+    await execution_watchers.close()
+    await close_http_clients()
+    shutdown_executors(wait=False)
+
+
 # Create FastAPI app FIRST
 app = FastAPI(
     title="Bronn API",
     description="Bronn Backend with Activepieces Integration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson-backed JSON for every route that doesn't pick its own class
+    default_response_class=FastJSONResponse
 )
 
 # Enable CORS with configurable origins - MUST be before any routes
@@ -56,6 +103,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated gzip / brotli / zstd for bodies above COMPRESSION_MIN_SIZE
+app.add_middleware(CompressionMiddleware)
+
 
 # =============================================================================
 # Global OPTIONS handler - catches all preflight requests BEFORE route matching
@@ -100,6 +150,26 @@ async def cors_exception_handler(request: Request, exc: StarletteHTTPException):
     )
 
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    """Shed load with a 503 when a blocking-work pool is full."""
+    origin = request.headers.get("origin", "")
+    allowed_origins = get_cors_origins()
+    allow_origin = origin if origin in allowed_origins else "*"
+    
+    logger.warning(f"Rejecting request: {exc}")
+    
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry"},
+        headers={
+            "Access-Control-Allow-Origin": allow_origin,
+            "Access-Control-Allow-Credentials": "true",
+            "Retry-After": "1",
+        }
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Catch-all exception handler with CORS headers."""
@@ -158,9 +228,34 @@ app.include_router(workspaces.router)
 app.include_router(sso.router)
 app.include_router(live_logs.router)
 app.include_router(flows_proxy.router)
+app.include_router(webhooks.router)
 
 
 # Health check
 @app.get("/api/health")
 def health_check():
     return {"status": "healthy", "service": "bronn-backend"}
+
+
+# Runtime metrics (executor pools, in-process caches)
+@app.get("/api/health/metrics")
+def runtime_metrics():
+    return {
+        "executors": executor_stats(),
+        "caches": {
+            "firebase_tokens": get_token_cache_stats(),
+            "activepieces_jwts": get_jwt_cache_stats(),
+            "activepieces_sessions": get_session_cache_stats(),
+            "users": get_user_cache_stats(),
+            "flows_proxy": get_flows_cache_stats(),
+            "engine_proxy": get_proxy_cache_stats(),
+        },
+        "signing_keys": get_key_manager().stats(),
+        "login_writes": login_writes.stats(),
+        "sessions": get_session_stats(),
+        "http_clients": http_client_stats(),
+        "execution_watchers": execution_watchers.stats(),
+        "flow_mirror": flow_mirror.stats(),
+        "run_events": run_events.stats(),
+        "compression": get_compression_stats(),
+    }
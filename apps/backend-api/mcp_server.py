@@ -1,9 +1,10 @@
 from mcp.server import Server
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from typing import List, Dict, Any
-import httpx
 import os
 
+from http_clients import get_http_client
+
 # Initialize MCP Server for Bronn
 mcp_server = Server("bronn-skills-server")
 
@@ -12,30 +13,31 @@ BRONN_BACKEND_URL = os.getenv("BRONN_BACKEND_INTERNAL_URL", "http://localhost:80
 @mcp_server.list_tools()
 async def list_tools() -> List[Tool]:
     """List available Bronn Skills (Workflows) as tools."""
-    async with httpx.AsyncClient() as client:
-        # Internal call to fetch workflows
-        # In production, this would use a service token
-        try:
-            response = await client.get(f"{BRONN_BACKEND_URL}/api/workflows")
-            workflows = response.json()
-            
-            tools = []
-            for wf in workflows:
-                tools.append(Tool(
-                    name=f"bronn_skill_{wf['id']}",
-                    description=wf.get('description', f"Bronn Skill: {wf['name']}"),
-                    input_schema={
-                        "type": "object",
-                        "properties": {
-                            "input_data": {"type": "string", "description": "Data to pass to the workflow"}
-                        },
-                        "required": ["input_data"]
-                    }
-                ))
-            return tools
-        except Exception as e:
-            print(f"Error fetching workflows for MCP: {e}")
-            return []
+    # Internal call to fetch workflows
+    # In production, this would use a service token
+    try:
+        response = await get_http_client("bronn").request(
+            "GET", f"{BRONN_BACKEND_URL}/api/workflows", route="mcp"
+        )
+        workflows = response.json()
+        
+        tools = []
+        for wf in workflows:
+            tools.append(Tool(
+                name=f"bronn_skill_{wf['id']}",
+                description=wf.get('description', f"Bronn Skill: {wf['name']}"),
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "input_data": {"type": "string", "description": "Data to pass to the workflow"}
+                    },
+                    "required": ["input_data"]
+                }
+            ))
+        return tools
+    except Exception as e:
+        print(f"Error fetching workflows for MCP: {e}")
+        return []
 
 @mcp_server.call_tool()
 async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
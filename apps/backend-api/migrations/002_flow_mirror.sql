@@ -0,0 +1,40 @@
+-- Migration: 002_flow_mirror.sql
+-- Description: Mirror workflow engine (Activepieces) flows into workflows
+-- Date: 2026-10-17
+
+-- ============================================================================
+-- STEP 1: Engine keys on workflows
+-- ============================================================================
+
+ALTER TABLE workflows ADD COLUMN IF NOT EXISTS engine_flow_id VARCHAR(64);
+ALTER TABLE workflows ADD COLUMN IF NOT EXISTS engine_project_id VARCHAR(64);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_workflows_engine_flow_id ON workflows(engine_flow_id);
+CREATE INDEX IF NOT EXISTS idx_workflows_engine_project ON workflows(engine_project_id, created_at);
+
+-- ============================================================================
+-- STEP 2: Per-project sync state (high-water mark)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS flow_sync_state (
+    project_id VARCHAR(64) PRIMARY KEY,
+    workspace_id UUID NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    created_by VARCHAR(255) NOT NULL,
+    high_water_mark VARCHAR(40),
+    last_synced_at TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    tenant_id VARCHAR(255)
+);
+
+CREATE INDEX IF NOT EXISTS idx_flow_sync_state_workspace_id ON flow_sync_state(workspace_id);
+CREATE INDEX IF NOT EXISTS idx_flow_sync_state_tenant_id ON flow_sync_state(tenant_id);
+
+-- ============================================================================
+-- STEP 3: Row-Level Security
+-- ============================================================================
+
+ALTER TABLE flow_sync_state ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS tenant_isolation_flow_sync_state ON flow_sync_state;
+CREATE POLICY tenant_isolation_flow_sync_state ON flow_sync_state
+    USING (tenant_id = current_setting('app.current_tenant', true));
@@ -0,0 +1,12 @@
+-- Migration: 003_run_events.sql
+-- Description: Ingest workflow engine (Activepieces) run events into workflow_runs
+-- Date: 2026-10-17
+
+-- ============================================================================
+-- STEP 1: Engine run key on workflow_runs
+-- ============================================================================
+
+ALTER TABLE workflow_runs ADD COLUMN IF NOT EXISTS engine_run_id VARCHAR(64);
+
+-- Target of the ingest upsert (INSERT ... ON CONFLICT (engine_run_id))
+CREATE UNIQUE INDEX IF NOT EXISTS idx_workflow_runs_engine_run_id ON workflow_runs(engine_run_id);
@@ -0,0 +1,32 @@
+-- Migration: 004_session_revocations.sql
+-- Description: Share Bronn session revocations across backend instances
+-- Date: 2026-10-17
+
+-- ============================================================================
+-- STEP 1: Revoked (and redeemed refresh) tokens, until they expire
+-- ============================================================================
+
+-- Times are epoch seconds, as in the tokens' iat/exp claims
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti VARCHAR(64) PRIMARY KEY,
+    token_type VARCHAR(16) NOT NULL,
+    expires_at DOUBLE PRECISION NOT NULL,
+    revoked_at DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires_at ON revoked_tokens(expires_at);
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_revoked_at ON revoked_tokens(revoked_at);
+
+-- ============================================================================
+-- STEP 2: Per-user cut-offs (account disabled, Firebase tokens revoked)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS user_revocations (
+    firebase_uid VARCHAR(128) PRIMARY KEY,
+    revoked_at DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_revocations_revoked_at ON user_revocations(revoked_at);
+
+-- Not tenant data: read by every instance without app.current_tenant, so
+-- these tables deliberately have no row-level security policy.
@@ -7,6 +7,8 @@ Re-exports all SQLAlchemy models for easy importing.
 from database import Base
 from models.user import User
 from models.workspace import Workspace
-from models.agent_workflow import Agent, Workflow, WorkflowRun
+from models.agent_workflow import Agent, Workflow, WorkflowRun, FlowSyncState
+from models.session_revocation import RevokedToken, UserRevocation
 
-__all__ = ['Base', 'User', 'Workspace', 'Agent', 'Workflow', 'WorkflowRun']
+__all__ = ['Base', 'User', 'Workspace', 'Agent', 'Workflow', 'WorkflowRun', 'FlowSyncState',
+           'RevokedToken', 'UserRevocation']
@@ -56,6 +56,9 @@ class Workflow(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     tenant_id = Column(String(255), index=True, nullable=True)
+    # Set on rows mirrored from the workflow engine (see flow_mirror.py)
+    engine_flow_id = Column(String(64), nullable=True, unique=True)
+    engine_project_id = Column(String(64), nullable=True)
 
     # Relationships
     workspace = relationship("Workspace", back_populates="workflows")
@@ -64,6 +67,7 @@ class Workflow(Base):
     __table_args__ = (
         Index('idx_workflows_workspace_status', 'workspace_id', 'status'),
         Index('idx_workflows_updated', 'updated_at'),
+        Index('idx_workflows_engine_project', 'engine_project_id', 'created_at'),
     )
 
     def __repr__(self):
@@ -89,6 +93,42 @@ class Workflow(Base):
         return result
 
 
+class FlowSyncState(Base):
+    """
+    FlowSyncState model - one workflow engine project mirrored into a workspace.
+    
+    high_water_mark is the largest engine `updated` timestamp mirrored so
+    far, for reporting; whether a flow is rewritten is decided per row.
+    """
+    __tablename__ = "flow_sync_state"
+
+    project_id = Column(String(64), primary_key=True)  # Engine (Activepieces) project ID
+    workspace_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    created_by = Column(String(255), nullable=False)
+    high_water_mark = Column(String(40), nullable=True)
+    last_synced_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    tenant_id = Column(String(255), index=True, nullable=True)
+
+    def __repr__(self):
+        return f"<FlowSyncState(project_id='{self.project_id}')>"
+
+    def to_dict(self):
+        """Convert to dictionary for API responses."""
+        return {
+            "project_id": self.project_id,
+            "workspace_id": str(self.workspace_id),
+            "high_water_mark": self.high_water_mark,
+            "last_synced_at": self.last_synced_at.isoformat() if self.last_synced_at else None,
+            "last_error": self.last_error,
+        }
+
+
 class WorkflowRun(Base):
     """
     WorkflowRun model - represents a single execution of a workflow.
@@ -109,6 +149,8 @@ class WorkflowRun(Base):
     logs_location = Column(String(500), nullable=True)  # S3/GCS path for logs
     error_message = Column(Text, nullable=True)
     tenant_id = Column(String(255), index=True, nullable=True)
+    # Engine (Activepieces) run ID for runs ingested from run events
+    engine_run_id = Column(String(64), unique=True, nullable=True)
 
     # Indexes
     __table_args__ = (
@@ -124,6 +166,7 @@ class WorkflowRun(Base):
         return {
             "id": str(self.id),
             "workflow_id": str(self.workflow_id),
+            "engine_run_id": self.engine_run_id,
             "status": self.status,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "finished_at": self.finished_at.isoformat() if self.finished_at else None,
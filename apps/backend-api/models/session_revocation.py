@@ -0,0 +1,35 @@
+"""
+Session Revocation Models
+
+Revoked Bronn session/refresh tokens and per-user revocation cut-offs,
+shared by every backend instance (see auth.session_tokens).
+
+Times are epoch seconds, as in the tokens' own iat/exp claims.
+"""
+
+from sqlalchemy import Column, String, Float
+from database import Base
+
+
+class RevokedToken(Base):
+    """A revoked (or, for refresh tokens, redeemed) token, kept until it expires."""
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    token_type = Column(String(16), nullable=False)  # "session" or "refresh"
+    expires_at = Column(Float, nullable=False, index=True)
+    revoked_at = Column(Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken(jti='{self.jti}', type='{self.token_type}')>"
+
+
+class UserRevocation(Base):
+    """Every token for firebase_uid issued at or before revoked_at is invalid."""
+    __tablename__ = "user_revocations"
+
+    firebase_uid = Column(String(128), primary_key=True)
+    revoked_at = Column(Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<UserRevocation(firebase_uid='{self.firebase_uid}')>"
@@ -0,0 +1,222 @@
+"""
+Revalidating Proxy Cache
+
+Keeps the last body returned by Activepieces for proxied GETs, with a
+strong ETag computed from the body. Clients that send the ETag back in
+If-None-Match get a bodiless 304. The cache always revalidates with
+upstream (conditionally, when upstream gave us a validator) so responses
+stay correct, but unchanged payloads are neither re-sent to the browser
+nor, when upstream supports conditional requests, re-downloaded.
+
+Entries are dropped when the same proxy forwards a mutation (POST, PUT,
+PATCH, DELETE) to the same resource collection.
+
+Each cache is bounded by the total size of its bodies (PROXY_CACHE_MAX_BYTES)
+as well as by entry count, evicting least recently used entries first. A
+proxy that keys entries per caller therefore holds at most
+PROXY_CACHE_MAX_BYTES however many callers it serves.
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+import httpx
+from fastapi import Response
+
+# Entries kept, total body bytes kept, and the largest body worth caching
+PROXY_CACHE_SIZE = int(os.getenv("PROXY_CACHE_SIZE", "512"))
+PROXY_CACHE_MAX_BYTES = int(os.getenv("PROXY_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+PROXY_CACHE_MAX_BODY = int(os.getenv("PROXY_CACHE_MAX_BODY", str(128 * 1024)))
+
+# Upstream response headers kept with a cached body
+_STORED_HEADERS = ("content-type", "content-encoding", "etag", "last-modified")
+
+
+def etag_matches(headers: Mapping[str, str], etag: str) -> bool:
+    """True if an If-None-Match header matches etag (weak comparison, per RFC 9110)."""
+    header = headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+@dataclass
+class CachedResponse:
+    """A cached upstream 200 response."""
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+    path: str
+    stored_at: float
+
+    @property
+    def media_type(self) -> Optional[str]:
+        return self.headers.get("content-type")
+
+
+class ProxyCache:
+    """
+    LRU store of upstream GET responses keyed by (path, query, caller).
+
+    Callers key entries by whatever distinguishes responses for the same
+    URL (e.g. a hash of the forwarded Authorization header).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = PROXY_CACHE_SIZE,
+        name: str = "proxy",
+        max_bytes: int = PROXY_CACHE_MAX_BYTES,
+    ):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.name = name
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0            # 304s sent to clients
+        self.revalidated = 0     # 304s received from upstream
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the cached bodies."""
+        return self._bytes
+
+    def accepts(self, size: int) -> bool:
+        """True if a body of `size` bytes would be kept."""
+        return self.maxsize > 0 and size <= min(PROXY_CACHE_MAX_BODY, self.max_bytes)
+
+    def lookup(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """Validators to revalidate entry with upstream, if it gave us any."""
+        if entry is None:
+            return {}
+        headers = {}
+        if "etag" in entry.headers:
+            headers["If-None-Match"] = entry.headers["etag"]
+        if "last-modified" in entry.headers:
+            headers["If-Modified-Since"] = entry.headers["last-modified"]
+        return headers
+
+    def store(self, key: Hashable, path: str, body: bytes, headers: Mapping[str, str]) -> CachedResponse:
+        """Cache a 200 body (if small enough) and return it with its ETag."""
+        entry = CachedResponse(
+            body=body,
+            etag=strong_etag(body),
+            headers={k: headers[k] for k in _STORED_HEADERS if k in headers},
+            path="/" + path.lstrip("/"),
+            stored_at=time.time(),
+        )
+        self.discard(key)
+        if self.accepts(len(body)):
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+        return entry
+
+    def discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+    def invalidate(self, path: str) -> int:
+        """
+        Drop entries for the collection `path` belongs to.
+
+        A mutation of /flows/abc/... invalidates every cached /flows read.
+        """
+        collection = "/" + path.lstrip("/").split("/", 1)[0].split("?", 1)[0]
+        stale = [
+            key for key, entry in self._entries.items()
+            if entry.path == collection or entry.path.startswith(collection + "/")
+            or entry.path.startswith(collection + "?")
+        ]
+        for key in stale:
+            self.discard(key)
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    async def fetch(
+        self,
+        key: Hashable,
+        path: str,
+        send: Callable[[Dict[str, str]], Awaitable[httpx.Response]],
+    ) -> Tuple[Optional[CachedResponse], httpx.Response]:
+        """
+        Revalidate (or load) key via send(conditional_headers).
+
+        Returns (entry, upstream_response). entry is None when upstream
+        answered with something other than 200/304; the caller handles it.
+        """
+        entry = self.lookup(key)
+        response = await send(self.conditional_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            return entry, response
+        if response.status_code == 200:
+            self.misses += 1
+            # response.content is already decoded, so drop Content-Encoding
+            headers = {k: v for k, v in response.headers.items() if k != "content-encoding"}
+            return self.store(key, path, response.content, headers), response
+        self.discard(key)
+        return None, response
+
+    def respond(self, request_headers: Mapping[str, str], entry: CachedResponse,
+                status_code: int = 200) -> Response:
+        """304 if the client already has entry, else the cached body; both carry the ETag."""
+        headers = {
+            "ETag": entry.etag,
+            # Per-caller content: browsers may keep it but must revalidate
+            "Cache-Control": "private, no-cache",
+        }
+        if etag_matches(request_headers, entry.etag):
+            self.hits += 1
+            return Response(status_code=304, headers=headers)
+        if "content-encoding" in entry.headers:
+            headers["Content-Encoding"] = entry.headers["content-encoding"]
+        return Response(
+            content=entry.body,
+            status_code=status_code,
+            headers=headers,
+            media_type=entry.media_type,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "client_304s": self.hits,
+            "upstream_304s": self.revalidated,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,305 @@
+"""
+Resilience Primitives for Outbound Calls
+
+Building blocks used by http_clients so that a slow or failing upstream
+(typically Activepieces during a brownout) makes callers fail fast
+instead of each one waiting out its full timeout:
+
+    CircuitBreaker  - opens after consecutive failures, probes half-open
+    RetryBudget     - caps retries to a fraction of recent traffic
+    Bulkhead        - caps concurrent calls per route
+    LatencyTracker  - derives timeouts from observed latency percentiles
+
+All are per-process and event-loop agnostic (plain counters, no asyncio
+primitives), so they survive the per-loop client recreation in tests.
+
+Configuration (environment):
+
+    CB_FAILURE_THRESHOLD     - consecutive failures that open a breaker
+    CB_RESET_TIMEOUT         - seconds open before a half-open probe
+    RETRY_MAX_ATTEMPTS       - retries per idempotent request
+    RETRY_BACKOFF_BASE/MAX   - full-jitter exponential backoff (seconds)
+    RETRY_BUDGET_RATIO       - retries allowed per request sent
+    RETRY_BUDGET_MIN         - retry tokens always available
+    BULKHEAD_<ROUTE>         - concurrent calls per route
+    ADAPTIVE_TIMEOUTS        - derive read timeouts from latency (true/false)
+    ADAPTIVE_TIMEOUT_FACTOR  - multiple of p99 allowed
+    ADAPTIVE_TIMEOUT_FLOOR   - never go below this (seconds)
+    ADAPTIVE_TIMEOUT_EXEMPT  - comma-separated routes that keep their
+                               configured timeout (default: proxy, whose
+                               exports and uploads dwarf typical latency)
+"""
+
+import bisect
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Circuit breaker
+CB_FAILURE_THRESHOLD = int(os.getenv("CB_FAILURE_THRESHOLD", "5"))
+CB_RESET_TIMEOUT = float(os.getenv("CB_RESET_TIMEOUT", "30"))
+
+# Retries (idempotent methods only)
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "2"))
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.05"))
+RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", "1.0"))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN = float(os.getenv("RETRY_BUDGET_MIN", "10"))
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRYABLE_STATUS = frozenset({502, 503, 504})
+
+# Concurrent calls per route; override with BULKHEAD_<ROUTE>
+_DEFAULT_BULKHEADS = {
+    "proxy": 40,
+    "flows": 15,
+    "engine": 25,
+    "managed_auth": 10,
+    "mcp": 10,
+}
+BULKHEAD_LIMITS = {
+    route: int(os.getenv(f"BULKHEAD_{route.upper()}", str(default)))
+    for route, default in _DEFAULT_BULKHEADS.items()
+}
+DEFAULT_BULKHEAD = 20
+
+# Adaptive timeouts
+ADAPTIVE_TIMEOUTS = os.getenv("ADAPTIVE_TIMEOUTS", "true").lower() in ("1", "true", "yes")
+ADAPTIVE_TIMEOUT_FACTOR = float(os.getenv("ADAPTIVE_TIMEOUT_FACTOR", "3"))
+ADAPTIVE_TIMEOUT_FLOOR = float(os.getenv("ADAPTIVE_TIMEOUT_FLOOR", "2"))
+ADAPTIVE_TIMEOUT_EXEMPT = frozenset(
+    r.strip() for r in os.getenv("ADAPTIVE_TIMEOUT_EXEMPT", "proxy").split(",") if r.strip()
+)
+ADAPTIVE_MIN_SAMPLES = 50
+ADAPTIVE_WINDOW = 500
+
+
+class UpstreamUnavailable(httpx.TransportError):
+    """
+    Raised instead of sending a request: the route's breaker is open or
+    its bulkhead is full. Subclasses httpx.TransportError so existing
+    `except httpx.RequestError` handlers treat it as a connection failure.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_failure(response: Optional[httpx.Response]) -> bool:
+    """Responses that count against a breaker (upstream errors, not 4xx)."""
+    return response is None or response.status_code >= 500
+
+
+# =============================================================================
+# Circuit Breaker
+# =============================================================================
+
+class CircuitBreaker:
+    """
+    Closed -> open after `threshold` consecutive failures. After
+    `reset_timeout` seconds one probe is let through (half-open): success
+    closes the breaker, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, threshold: int = CB_FAILURE_THRESHOLD,
+                 reset_timeout: float = CB_RESET_TIMEOUT):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now (claims the probe when half-open)."""
+        with self._lock:
+            if self.state == self.OPEN and self.retry_after() == 0:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    def abandon(self) -> None:
+        """The call was cancelled before an outcome: free the half-open probe."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+# =============================================================================
+# Retry Budget
+# =============================================================================
+
+class RetryBudget:
+    """
+    Token bucket shared by all routes of an upstream: every request adds
+    `ratio` tokens, every retry spends one. Keeps retries to a bounded
+    fraction of traffic so they cannot multiply load during an outage.
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, minimum: float = RETRY_BUDGET_MIN):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.tokens = minimum
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        with self._lock:
+            # Cap the bucket so a quiet period cannot bank a retry storm
+            self.tokens = min(self.tokens + self.ratio, self.minimum + 100 * self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                self.exhausted += 1
+                return False
+            self.tokens -= 1
+            self.retries += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tokens": round(self.tokens, 2), "retries": self.retries, "exhausted": self.exhausted}
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (1-based)."""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** (attempt - 1)))
+
+
+# =============================================================================
+# Bulkhead
+# =============================================================================
+
+class Bulkhead:
+    """
+    Concurrency cap for one route. Calls beyond the limit are rejected
+    immediately rather than queued, so a stuck route cannot take every
+    pooled connection from the others.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.active >= self.limit:
+                self.rejected += 1
+                return False
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"active": self.active, "limit": self.limit, "rejected": self.rejected}
+
+
+def bulkhead_limit(route: str) -> int:
+    return BULKHEAD_LIMITS.get(route, DEFAULT_BULKHEAD)
+
+
+# =============================================================================
+# Adaptive Timeouts
+# =============================================================================
+
+class LatencyTracker:
+    """
+    Recent successful call durations for one route.
+
+    The window is also kept sorted, updated by bisection as samples
+    arrive and age out, so percentiles are an index lookup rather than a
+    sort on every request.
+    """
+
+    def __init__(self, window: int = ADAPTIVE_WINDOW):
+        self._samples: deque = deque()
+        self._sorted: List[float] = []
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            if len(self._samples) >= self._window:
+                oldest = self._samples.popleft()
+                del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+            self._samples.append(seconds)
+            bisect.insort(self._sorted, seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        ordered = self._sorted
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    def timeout(self, ceiling: float) -> float:
+        """
+        ADAPTIVE_TIMEOUT_FACTOR x p99, clamped to [floor, ceiling].
+
+        The configured route timeout stays the ceiling; until there are
+        enough samples it is used as is.
+        """
+        if not ADAPTIVE_TIMEOUTS or len(self._samples) < ADAPTIVE_MIN_SAMPLES:
+            return ceiling
+        adaptive = self.percentile(99) * ADAPTIVE_TIMEOUT_FACTOR
+        return min(ceiling, max(ADAPTIVE_TIMEOUT_FLOOR, adaptive))
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p99 = self.percentile(50), self.percentile(99)
+        return {
+            "samples": len(self._samples),
+            "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+        }
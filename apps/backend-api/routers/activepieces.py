@@ -6,19 +6,79 @@ and handles JWT authentication for embedded access.
 """
 
 import os
+import asyncio
+import hashlib
 import httpx
 from fastapi import APIRouter, Request, HTTPException, Response
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.requests import ClientDisconnect
+from typing import AsyncIterator, Optional
 
-from auth.users import get_current_user
-from auth.signing_key import create_activepieces_jwt, get_public_key
+from auth.dependencies import verify_request_token
+from auth.signing_key import get_activepieces_jwt
+from auth.jwks import jwks_response, public_key_response
+from executors import run_blocking
+from http_clients import HTTP_CONNECT_TIMEOUT, get_http_client
+from proxy_cache import ProxyCache
+from resilience import UpstreamUnavailable
 
 router = APIRouter(prefix="/api/workflows/engine", tags=["activepieces"])
 
 # Activepieces internal URL
 ACTIVEPIECES_URL = os.getenv("ACTIVEPIECES_URL", "http://activepieces:80")
 
+# Stream request/response bodies through the catch-all proxy instead of
+# buffering them (set to false to restore the buffered behaviour)
+PROXY_STREAMING = os.getenv("PROXY_STREAMING", "true").lower() in ("1", "true", "yes")
+# Longest silence (seconds) tolerated from either side mid-transfer
+PROXY_IDLE_TIMEOUT = float(os.getenv("PROXY_IDLE_TIMEOUT", "30"))
+
+# RFC 9110 section 7.6.1 hop-by-hop headers, plus ones httpx/uvicorn set themselves
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "proxy-connection", "te", "trailer", "trailers", "transfer-encoding", "upgrade",
+    "host",
+})
+
+# Client validators are answered by the proxy cache, not forwarded
+_CONDITIONAL_HEADERS = frozenset({"if-none-match", "if-modified-since"})
+
+# Engine collections whose GETs go through the proxy cache: small JSON
+# resources the UI re-reads. Every other GET is streamed, never buffered
+PROXY_CACHE_COLLECTIONS = frozenset(
+    c.strip() for c in os.getenv("PROXY_CACHE_COLLECTIONS", "flows,folders,app-connections").split(",")
+    if c.strip()
+)
+
+# Last small GET body per (URL, caller), for ETag/304 answers
+_proxy_cache = ProxyCache(name="engine_proxy")
+
+
+def _cacheable(path: str) -> bool:
+    return path.lstrip("/").split("/", 1)[0] in PROXY_CACHE_COLLECTIONS
+
+
+def _cache_key(request: Request, target_url: str) -> tuple:
+    # Responses depend on who asks: key on a digest of the credentials
+    authorization = request.headers.get("authorization", "")
+    return (
+        target_url,
+        str(request.query_params),
+        hashlib.sha256(authorization.encode()).hexdigest(),
+    )
+
+
+def _unavailable(e: UpstreamUnavailable) -> JSONResponse:
+    # Shed without touching Activepieces; tell clients when to come back
+    headers = {"Retry-After": str(max(1, round(e.retry_after)))} if e.retry_after else None
+    return JSONResponse(status_code=503, content={"detail": str(e)}, headers=headers)
+
+
+def get_proxy_cache_stats() -> dict:
+    """Counters for the catch-all proxy cache."""
+    return _proxy_cache.stats()
+
 @router.get("/token")
 async def get_embed_token(
     request: Request,
@@ -33,13 +93,17 @@ async def get_embed_token(
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     token_str = authorization.split(" ")[1]
-    user = get_current_user(token_str)
-    
-    if not user:
+    # Bronn session token or Firebase ID token, as on every other route
+    decoded = await verify_request_token(token_str)
+    if not decoded or not decoded.get("email"):
         raise HTTPException(status_code=401, detail="Invalid token")
+    first_name, _, last_name = (decoded.get("name") or "").partition(" ")
+    user = {"email": decoded["email"], "first_name": first_name, "last_name": last_name}
 
     try:
-        token = create_activepieces_jwt(
+        token, _ = await run_blocking(
+            "signing",
+            get_activepieces_jwt,
             user_id=user["email"],
             project_id=project_id,
             first_name=user["first_name"],
@@ -52,23 +116,189 @@ async def get_embed_token(
 
 
 @router.get("/public-key")
-async def get_signing_public_key():
+async def get_signing_public_key(request: Request):
     """
     Get the public key for Activepieces to verify JWTs.
     
     This endpoint should be called during Activepieces setup to register
-    the signing key.
+    the signing key. Prefer /jwks.json, which also lists keys retired by
+    a recent rotation.
     """
     try:
-        key_id, public_key = get_public_key()
-        return {
-            "keyId": key_id,
-            "publicKey": public_key
-        }
+        return public_key_response(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get public key: {str(e)}")
 
 
+@router.get("/jwks.json")
+async def get_signing_jwks(request: Request):
+    """
+    JWKS for every active signing key, keyed by kid.
+    
+    Served with a strong ETag and Cache-Control; send If-None-Match to
+    revalidate. Must stay above the catch-all proxy route.
+    """
+    try:
+        return jwks_response(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get signing keys: {str(e)}")
+
+
+def filter_hop_by_hop(headers) -> list:
+    """
+    (name, value) pairs minus hop-by-hop headers and any the Connection
+    header names. Repeated headers (e.g. Set-Cookie) are kept separate.
+    """
+    named = {t.strip().lower() for t in headers.get("connection", "").split(",") if t.strip()}
+    drop = HOP_BY_HOP_HEADERS | named
+    pairs = headers.multi_items() if hasattr(headers, "multi_items") else headers.items()
+    return [(key, value) for key, value in pairs if key.lower() not in drop]
+
+
+async def _upload_stream(request: Request) -> AsyncIterator[bytes]:
+    """Relay the client's body chunk by chunk, failing if it goes idle."""
+    chunks = request.stream().__aiter__()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(chunks.__anext__(), PROXY_IDLE_TIMEOUT)
+        except StopAsyncIteration:
+            return
+        if chunk:
+            yield chunk
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the client goes away (only safe when the body isn't being read)."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _stream_to_activepieces(request: Request, target_url: str, path: str) -> Response:
+    """
+    Streaming proxy: the upload is forwarded as it arrives and the response
+    is relayed chunk by chunk, so memory per request stays constant.
+    
+    PROXY_IDLE_TIMEOUT bounds the gap between chunks in both directions.
+    If the client disconnects, the upstream request is cancelled and its
+    connection returned to the pool.
+    
+    Small GET responses from PROXY_CACHE_COLLECTIONS are kept in the proxy
+    cache: clients get an ETag and a 304 when they send it back, and
+    upstream is asked conditionally. Only those are ever read into memory.
+    """
+    headers = filter_hop_by_hop(request.headers)
+    has_body = request.method in ("POST", "PUT", "PATCH")
+    timeout = httpx.Timeout(PROXY_IDLE_TIMEOUT, connect=min(PROXY_IDLE_TIMEOUT, HTTP_CONNECT_TIMEOUT))
+    
+    key = entry = None
+    if request.method == "GET" and _cacheable(path):
+        # Revalidate with upstream using our own validators
+        key = _cache_key(request, target_url)
+        entry = _proxy_cache.lookup(key)
+        headers = [(k, v) for k, v in headers if k.lower() not in _CONDITIONAL_HEADERS]
+        headers.extend(_proxy_cache.conditional_headers(entry).items())
+    elif request.method != "GET":
+        _proxy_cache.invalidate(path)
+    
+    send = asyncio.ensure_future(get_http_client("activepieces").open_stream(
+        request.method,
+        target_url,
+        route="proxy",
+        timeout=timeout,
+        params=request.query_params,
+        headers=headers,
+        content=_upload_stream(request) if has_body else None,
+    ))
+    
+    try:
+        if has_body:
+            upstream = await send
+        else:
+            # Nothing else reads from the client, so watch for it leaving
+            disconnect = asyncio.ensure_future(_wait_for_disconnect(request))
+            try:
+                done, _ = await asyncio.wait({send, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                disconnect.cancel()
+            if send not in done:
+                send.cancel()
+                return Response(status_code=499)
+            upstream = send.result()
+    except ClientDisconnect:
+        send.cancel()
+        return Response(status_code=499)
+    except asyncio.TimeoutError:
+        send.cancel()
+        raise HTTPException(status_code=408, detail="Client request body timed out")
+    except UpstreamUnavailable as e:
+        return _unavailable(e)
+    except httpx.TimeoutException as e:
+        raise HTTPException(status_code=504, detail=f"Activepieces timed out: {str(e)}")
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Failed to connect to Activepieces: {str(e)}"
+        )
+    
+    if key is not None:
+        cached = await _cache_response(request, key, path, entry, upstream)
+        if cached is not None:
+            return cached
+    
+    async def relay() -> AsyncIterator[bytes]:
+        # Raw bytes: any Content-Encoding is passed through untouched
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+        finally:
+            await upstream.aclose()
+    
+    response = StreamingResponse(
+        relay(),
+        status_code=upstream.status_code,
+        background=BackgroundTask(upstream.aclose),
+    )
+    response.raw_headers.extend(
+        (key.lower().encode("latin-1"), value.encode("latin-1"))
+        for key, value in filter_hop_by_hop(upstream.headers)
+    )
+    return response
+
+
+async def _cache_response(request: Request, key: tuple, path: str, entry, upstream: httpx.Response) -> Optional[Response]:
+    """
+    Answer a GET from the proxy cache when possible.
+    
+    Returns None (leaving the upstream body unread) when the response
+    must be streamed instead: not a 200/304, marked no-store, or too large
+    or of unknown size.
+    """
+    if upstream.status_code == 304 and entry is not None:
+        await upstream.aclose()
+        _proxy_cache.revalidated += 1
+        return _proxy_cache.respond(request.headers, entry)
+    
+    length = upstream.headers.get("content-length")
+    if upstream.status_code != 200 or not length or not _proxy_cache.accepts(int(length)) \
+            or "no-store" in upstream.headers.get("cache-control", ""):
+        _proxy_cache.discard(key)
+        return None
+    
+    try:
+        # Raw bytes: stored (and replayed) with their Content-Encoding
+        body = b"".join([chunk async for chunk in upstream.aiter_raw()])
+    except httpx.TimeoutException as e:
+        raise HTTPException(status_code=504, detail=f"Activepieces timed out: {str(e)}")
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=502, detail=f"Failed to read from Activepieces: {str(e)}")
+    finally:
+        await upstream.aclose()
+    _proxy_cache.misses += 1
+    return _proxy_cache.respond(request.headers, _proxy_cache.store(key, path, body, upstream.headers))
+
+
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def proxy_to_activepieces(request: Request, path: str):
     """
@@ -76,7 +306,14 @@ async def proxy_to_activepieces(request: Request, path: str):
     
     This allows Bronn frontend to communicate with Activepieces
     through the Bronn backend, maintaining security boundaries.
+    Bodies are streamed in both directions unless PROXY_STREAMING is off.
     """
+    if PROXY_STREAMING:
+        return await _stream_to_activepieces(request, f"{ACTIVEPIECES_URL}/v1/{path}", path)
+    
+    if request.method != "GET":
+        _proxy_cache.invalidate(path)
+    
     # Build the target URL
     target_url = f"{ACTIVEPIECES_URL}/v1/{path}"
     
@@ -95,22 +332,24 @@ async def proxy_to_activepieces(request: Request, path: str):
         body = await request.body()
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.request(
-                method=request.method,
-                url=target_url,
-                params=query_params,
-                headers=headers,
-                content=body
-            )
-            
-            # Return the proxied response
-            return Response(
-                content=response.content,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type=response.headers.get("content-type")
-            )
+        response = await get_http_client("activepieces").request(
+            request.method,
+            target_url,
+            route="proxy",
+            params=query_params,
+            headers=headers,
+            content=body
+        )
+        
+        # Return the proxied response
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            media_type=response.headers.get("content-type")
+        )
+    except UpstreamUnavailable as e:
+        return _unavailable(e)
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=502,
@@ -9,26 +9,46 @@ from fastapi import APIRouter, HTTPException, Depends, Header
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from functools import partial
+import asyncio
 import os
+import time
 
 from database import get_db
+from executors import run_blocking
 from auth.firebase_auth import (
     verify_firebase_token,
     create_firebase_user,
+    get_firebase_user,
     get_firebase_user_by_email
 )
 from models.user import User
-from auth.signing_key import create_activepieces_jwt
+from auth.signing_key import get_activepieces_jwt
 from auth.activepieces_sync import (
     ensure_user_in_activepieces,
     get_activepieces_session
 )
-from auth.dependencies import get_current_user
+from auth.dependencies import get_current_user, verify_request_token
+from auth.user_sync import cache_user, peek_cached_user, record_login, get_or_create_user
+from auth.session_tokens import (
+    is_session_token,
+    issue_session,
+    refresh_session,
+    revoke_token,
+    sessions_enabled,
+)
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
+# How long (seconds) verify-token waits for the Activepieces session, measured
+# from the start of the request; a slower exchange finishes in the background
+ACTIVEPIECES_LOGIN_DEADLINE = float(os.getenv("ACTIVEPIECES_LOGIN_DEADLINE", "2.0"))
+
+# Strong references to background exchanges that outlived their request
+_background_tasks: set = set()
+
 
 # =============================================================================
 # Request/Response Models
@@ -63,6 +83,25 @@ class AuthResponse(BaseModel):
     user: UserResponse
     valid: bool
     activepieces_token: Optional[str] = None
+    # True when the Activepieces session wasn't ready by the login deadline;
+    # fetch it later from /api/auth/activepieces-token
+    activepieces_pending: bool = False
+    # Bronn session for subsequent API calls (see /api/auth/refresh)
+    session_token: Optional[str] = None
+    refresh_token: Optional[str] = None
+    session_expires_in: Optional[int] = None
+
+
+class RefreshRequest(BaseModel):
+    """Request to exchange a refresh token for a new session."""
+    refresh_token: str
+
+
+class SessionResponse(BaseModel):
+    """A new Bronn session/refresh token pair."""
+    session_token: str
+    refresh_token: str
+    expires_in: int
 
 
 class EmbedTokenRequest(BaseModel):
@@ -77,6 +116,64 @@ class EmbedTokenResponse(BaseModel):
     expires_in_seconds: int = 300
 
 
+# =============================================================================
+# Blocking Helpers (run on the executor pools, never on the event loop)
+# =============================================================================
+
+def _create_db_user(db: Session, user: User) -> User:
+    """Insert a new user row."""
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    cache_user(user)
+    return user
+
+
+def _user_exists(db: Session, email: str) -> bool:
+    return db.query(User).filter(User.email == email).first() is not None
+
+
+def _load_embed_context(db: Session, decoded: dict, project_id: str):
+    """Get (or auto-provision) the user and resolve the workspace display name."""
+    import uuid
+    from models import Workspace
+    
+    user = get_or_create_user(db, decoded)
+    
+    # Try to fetch workspace name if project_id is a valid UUID
+    project_name = None
+    if project_id and project_id != "default":
+        try:
+            workspace_uuid = uuid.UUID(project_id)
+            workspace = db.query(Workspace).filter(Workspace.id == workspace_uuid).first()
+            if workspace:
+                project_name = workspace.name
+        except (ValueError, TypeError):
+            # Invalid UUID format, just use project_id as-is
+            pass
+    
+    return user, project_name
+
+
+def _activepieces_names(decoded: dict) -> tuple:
+    """First and last name for the Activepieces session of a logging-in user."""
+    cached = peek_cached_user(decoded["uid"])
+    source = cached if cached is not None else User.from_firebase_token(decoded)
+    return source.first_name or "", source.last_name or ""
+
+
+def _detach(task: asyncio.Task) -> None:
+    """Keep a task alive past its request and log (rather than leak) its failure."""
+    _background_tasks.add(task)
+    
+    def done(t: asyncio.Task) -> None:
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception():
+            print(f"Activepieces sync warning: {t.exception()}")
+    
+    task.add_done_callback(done)
+
+
 # =============================================================================
 # Firebase Token Verification
 # =============================================================================
@@ -94,6 +191,13 @@ async def verify_token(
     2. Get the ID token from Firebase
     3. Call this endpoint with the token
     4. Receive user data and optional Activepieces token
+    
+    The Activepieces session is fetched concurrently with the user upsert.
+    If it isn't ready within ACTIVEPIECES_LOGIN_DEADLINE seconds, the
+    response omits it and sets activepieces_pending instead.
+    
+    The response also carries a Bronn session token, which other endpoints
+    accept in place of the Firebase ID token without re-verifying it.
     """
     # Extract token from "Bearer <token>"
     token = authorization.replace("Bearer ", "").strip()
@@ -102,68 +206,62 @@ async def verify_token(
         raise HTTPException(status_code=401, detail="No token provided")
     
     # Verify with Firebase
-    decoded = verify_firebase_token(token)
+    decoded = await run_blocking("auth", verify_firebase_token, token)
     if not decoded:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
     firebase_uid = decoded["uid"]
-    email = decoded.get("email", "")
-    
-    # Find user by firebase_uid first, then by email (handles migration/re-auth cases)
-    user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
-    
-    if not user and email:
-        # Check if user exists with this email but different Firebase UID
-        # This handles cases where user signed up with different provider or was migrated
-        user = db.query(User).filter(User.email == email).first()
-        if user:
-            # Link existing user to this Firebase UID
-            user.firebase_uid = firebase_uid
-            user.last_login_at = datetime.utcnow()
-            db.commit()
-    
-    if not user:
-        # First time login - create user in database
-        user = User.from_firebase_token(decoded)
-        try:
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-        except Exception as e:
-            db.rollback()
-            # Race condition - another request created the user
-            user = db.query(User).filter(User.email == email).first()
-            if user:
-                user.firebase_uid = firebase_uid
-                db.commit()
-            else:
-                raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
-    else:
-        # Update last login time
-        user.last_login_at = datetime.utcnow()
-        
-        # Update profile from Firebase if changed
-        if decoded.get("picture") and user.avatar_url != decoded.get("picture"):
-            user.avatar_url = decoded.get("picture")
-        if decoded.get("name") and user.display_name != decoded.get("name"):
-            user.display_name = decoded.get("name")
-        
-        db.commit()
+    
+    # Start the Activepieces session fetch now, so it overlaps the user upsert.
+    # The user row isn't loaded yet: names come from its cached snapshot, else
+    # from the token claims as the insert would store them.
+    first_name, last_name = _activepieces_names(decoded)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + ACTIVEPIECES_LOGIN_DEADLINE
+    # Use managed auth - user is auto-provisioned in Activepieces
+    ap_task = asyncio.create_task(ensure_user_in_activepieces(
+        user_id=firebase_uid,
+        project_id="default",
+        first_name=first_name,
+        last_name=last_name
+    ))
+    
+    try:
+        # One SELECT for returning users (login bookkeeping is written behind);
+        # one INSERT ... ON CONFLICT ... RETURNING for new ones
+        user = await run_blocking("db", record_login, db, decoded)
+    except BaseException:
+        _detach(ap_task)
+        raise
     
     # Get Activepieces token for SSO (optional, may fail if not configured)
     ap_token = None
+    ap_pending = False
     try:
-        # Use managed auth - user is auto-provisioned in Activepieces
-        ap_token = await ensure_user_in_activepieces(
-            user_id=firebase_uid,
-            project_id="default",
-            first_name=user.first_name or "",
-            last_name=user.last_name or ""
+        ap_token = await asyncio.wait_for(
+            asyncio.shield(ap_task), timeout=max(0.0, deadline - loop.time())
         )
+    except asyncio.TimeoutError:
+        # Let it finish in the background; the session cache keeps the result
+        ap_pending = True
+        _detach(ap_task)
     except Exception as e:
         # Don't fail auth if Activepieces sync fails
         print(f"Activepieces sync warning: {e}")
     
+    # Without BRONN_SESSION_SECRET no session is issued; the client keeps
+    # sending its Firebase ID token
+    session = {}
+    if sessions_enabled():
+        session = issue_session(
+            firebase_uid=firebase_uid,
+            user_id=user.id,
+            email=user.email,
+            tenant_id=decoded.get("tenant_id") or user.tenant_id,
+            is_admin=user.is_admin,
+            name=user.display_name,
+        )
+    
     return AuthResponse(
         user=UserResponse(
             id=user.id,
@@ -175,10 +273,66 @@ async def verify_token(
             is_admin=user.is_admin
         ),
         valid=True,
-        activepieces_token=ap_token
+        activepieces_token=ap_token,
+        activepieces_pending=ap_pending,
+        session_token=session.get("session_token"),
+        refresh_token=session.get("refresh_token"),
+        session_expires_in=session.get("expires_in")
     )
 
 
+# =============================================================================
+# Bronn Sessions
+# =============================================================================
+
+def _account_active(db: Session, claims: dict) -> bool:
+    """True if the session's user still exists and is enabled, here and in Firebase."""
+    user = db.query(User).filter(User.firebase_uid == claims["sub"]).first()
+    if user is None or not user.is_active:
+        return False
+    record = get_firebase_user(claims["sub"])
+    if record is None or record["disabled"]:
+        return False
+    # Firebase refresh tokens revoked since this session's login
+    return record["tokens_valid_after"] <= (claims.get("auth_time") or claims["iat"])
+
+
+@router.post("/refresh", response_model=SessionResponse)
+async def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new session/refresh token pair.
+    
+    Each refresh token can be used once, on any instance. The account is
+    looked up again (users row and Firebase record); disabled, deleted or
+    Firebase-revoked users lose all their sessions. Sessions cannot be
+    refreshed past BRONN_SESSION_MAX_AGE from the original login.
+    """
+    try:
+        session = await run_blocking(
+            "auth", refresh_session, request.refresh_token, partial(_account_active, db)
+        )
+    except SQLAlchemyError as e:
+        print(f"Session store error: {e}")
+        raise HTTPException(status_code=503, detail="Session store unavailable")
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+    return SessionResponse(**session)
+
+
+@router.post("/logout")
+async def logout(
+    request: Optional[RefreshRequest] = None,
+    authorization: str = Header(...)
+):
+    """Revoke the presented session token and, if given, its refresh token."""
+    token = authorization.replace("Bearer ", "").strip()
+    if not is_session_token(token) or not await run_blocking("db", revoke_token, token):
+        raise HTTPException(status_code=401, detail="Invalid or expired session token")
+    if request is not None:
+        await run_blocking("db", revoke_token, request.refresh_token, "refresh")
+    return {"message": "Logged out"}
+
+
 # =============================================================================
 # Server-side User Registration (Optional)
 # =============================================================================
@@ -196,13 +350,14 @@ async def register(
     registration is needed (e.g., admin creating users).
     """
     # Check if user already exists
-    existing = db.query(User).filter(User.email == request.email).first()
-    if existing:
+    if await run_blocking("db", _user_exists, db, request.email):
         raise HTTPException(status_code=400, detail="User already exists")
     
     # Create user in Firebase
     display_name = f"{request.first_name or ''} {request.last_name or ''}".strip()
-    firebase_uid = create_firebase_user(
+    firebase_uid = await run_blocking(
+        "auth",
+        create_firebase_user,
         email=request.email,
         password=request.password,
         display_name=display_name or None
@@ -219,9 +374,7 @@ async def register(
         last_name=request.last_name,
         display_name=display_name or request.email.split('@')[0]
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = await run_blocking("db", _create_db_user, db, user)
     
     # Sync to Activepieces via managed auth
     try:
@@ -302,7 +455,8 @@ async def exchange_firebase_for_activepieces(
     db: Session = Depends(get_db)
 ):
     """
-    Exchange a Firebase ID token for an Activepieces provisioning JWT.
+    Exchange a Firebase ID token (or Bronn session token) for an
+    Activepieces provisioning JWT.
     
     This is the core authentication federation endpoint. It:
     1. Verifies the Firebase ID token
@@ -314,31 +468,21 @@ async def exchange_firebase_for_activepieces(
     The returned token is short-lived (5 minutes) and should be immediately
     passed to activepieces.configure() for SDK initialization.
     """
-    import os
-    import uuid
-    from models import Workspace
-    
     # Extract token from "Bearer <token>"
     token = authorization.replace("Bearer ", "").strip()
     
     if not token:
         raise HTTPException(status_code=401, detail="No token provided")
     
-    # Verify with Firebase
-    decoded = verify_firebase_token(token)
+    # Verify the session token, or with Firebase
+    decoded = await verify_request_token(token)
     if not decoded:
         raise HTTPException(status_code=401, detail="Invalid or expired Firebase token")
     
     firebase_uid = decoded["uid"]
     
-    # Get user from database
-    user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
-    if not user:
-        # Auto-provision user on first access
-        user = User.from_firebase_token(decoded)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+    # Get user and workspace name from database
+    user, project_name = await run_blocking("db", _load_embed_context, db, decoded, request.project_id)
     
     # Map Bronn roles to Activepieces roles
     if user.is_admin:
@@ -346,21 +490,11 @@ async def exchange_firebase_for_activepieces(
     else:
         ap_role = "EDITOR"  # Default role for regular users
     
-    # Try to fetch workspace name if project_id is a valid UUID
-    project_name = None
-    if request.project_id and request.project_id != "default":
-        try:
-            workspace_uuid = uuid.UUID(request.project_id)
-            workspace = db.query(Workspace).filter(Workspace.id == workspace_uuid).first()
-            if workspace:
-                project_name = workspace.name
-        except (ValueError, TypeError):
-            # Invalid UUID format, just use project_id as-is
-            pass
-    
     # Generate Activepieces provisioning JWT (RS256 signed)
     try:
-        ap_embed_token = create_activepieces_jwt(
+        ap_embed_token, exp = await run_blocking(
+            "signing",
+            get_activepieces_jwt,
             user_id=firebase_uid,  # Use Firebase UID as external user ID
             project_id=request.project_id,
             first_name=user.first_name or user.display_name or "User",
@@ -382,7 +516,8 @@ async def exchange_firebase_for_activepieces(
     return EmbedTokenResponse(
         token=ap_embed_token,
         instance_url=instance_url,
-        expires_in_seconds=300
+        # A reused token has less than the full 5 minutes left
+        expires_in_seconds=max(0, exp - int(time.time()))
     )
 
 
@@ -5,11 +5,15 @@ This router acts as a proxy between the Bronn Studio UI and the
 Activepieces headless engine, enabling custom workflow management
 without relying on the Activepieces UI.
 """
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Request, Response
 from typing import Optional, Any, Dict, List
 import httpx
 import os
 
+from http_clients import get_http_client
+from proxy_cache import ProxyCache
+from serialization import loads
+
 router = APIRouter(
     prefix="/api/flows-proxy",
     tags=["flows-proxy"]
@@ -27,8 +31,25 @@ if not ACTIVEPIECES_URL:
         "ACTIVEPIECES_URL not configured. Flows proxy will not work."
     )
 
-async def _ap_request(method: str, path: str, data: Optional[Dict] = None) -> Any:
-    """Helper to make authenticated requests to Activepieces."""
+# Last body per GET URL, for ETag/304 answers to polling clients. All
+# requests use the same API key, so the URL alone identifies a response.
+_flows_cache = ProxyCache(name="flows_proxy")
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    if response.status_code >= 400:
+        # Provide cleaner error message for the frontend
+        error_detail = response.text
+        try:
+            error_json = response.json()
+            if "message" in error_json:
+                error_detail = error_json["message"]
+        except:
+            pass
+        raise HTTPException(status_code=response.status_code, detail=error_detail)
+
+
+def _require_api_key() -> None:
     if not ACTIVEPIECES_API_KEY:
         # Don't crash with "Bearer " header, return a clear error instead
         raise HTTPException(
@@ -36,41 +57,78 @@ async def _ap_request(method: str, path: str, data: Optional[Dict] = None) -> An
             detail="Activepieces is not configured in this environment (missing ACTIVEPIECES_API_KEY)"
         )
 
+
+async def _ap_request(method: str, path: str, data: Optional[Dict] = None) -> Any:
+    """Helper to make authenticated requests to Activepieces."""
+    _require_api_key()
+
     headers = {
         "Authorization": f"Bearer {ACTIVEPIECES_API_KEY}",
         "Content-Type": "application/json"
     }
     url = f"{ACTIVEPIECES_URL}/api/v1{path}"
     
+    if method not in ("GET", "POST", "DELETE"):
+        raise ValueError(f"Unsupported method: {method}")
+    
+    try:
+        response = await get_http_client("activepieces").request(
+            method,
+            url,
+            route="flows",
+            headers=headers,
+            json=data if method == "POST" else None
+        )
+        
+        if method != "GET":
+            # Whatever succeeded or not, cached reads of this collection may be stale
+            _flows_cache.invalidate(path)
+        _raise_for_status(response)
+        
+        return loads(response.content)
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=503, detail=f"Failed to connect to Activepieces: {str(e)}")
+
+
+async def _ap_cached_get(request: Request, path: str) -> Response:
+    """
+    GET through the revalidating cache.
+    
+    Answers the client's If-None-Match with 304 when the (revalidated)
+    body is unchanged, and sends upstream its own validators.
+    """
+    _require_api_key()
+    url = f"{ACTIVEPIECES_URL}/api/v1{path}"
+    
+    async def send(conditional_headers: Dict[str, str]) -> httpx.Response:
+        return await get_http_client("activepieces").request(
+            "GET",
+            url,
+            route="flows",
+            headers={"Authorization": f"Bearer {ACTIVEPIECES_API_KEY}", **conditional_headers}
+        )
+    
     try:
-        async with httpx.AsyncClient() as client:
-            if method == "GET":
-                response = await client.get(url, headers=headers)
-            elif method == "POST":
-                response = await client.post(url, headers=headers, json=data)
-            elif method == "DELETE":
-                response = await client.delete(url, headers=headers)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
-            
-            if response.status_code >= 400:
-                # Provide cleaner error message for the frontend
-                error_detail = response.text
-                try:
-                    error_json = response.json()
-                    if "message" in error_json:
-                        error_detail = error_json["message"]
-                except:
-                    pass
-                raise HTTPException(status_code=response.status_code, detail=error_detail)
-            
-            return response.json()
+        entry, response = await _flows_cache.fetch(path, path, send)
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Failed to connect to Activepieces: {str(e)}")
+    
+    if entry is None:
+        _raise_for_status(response)
+        # Any other non-error status: pass it through uncached
+        return Response(content=response.content, status_code=response.status_code,
+                        media_type=response.headers.get("content-type"))
+    return _flows_cache.respond(request.headers, entry)
+
+
+def get_flows_cache_stats() -> Dict[str, Any]:
+    """Counters for the flows proxy cache."""
+    return _flows_cache.stats()
 
 
 @router.get("/flows")
 async def list_flows(
+    request: Request,
     project_id: str,  # Required: Activepieces projectId
     folder_id: Optional[str] = None,
     limit: int = 20,
@@ -90,13 +148,13 @@ async def list_flows(
     if status:
         query_params += f"&status={status}"
     
-    return await _ap_request("GET", f"/flows{query_params}")
+    return await _ap_cached_get(request, f"/flows{query_params}")
 
 
 @router.get("/flows/{flow_id}")
-async def get_flow(flow_id: str):
+async def get_flow(request: Request, flow_id: str):
     """Get a specific flow's details."""
-    return await _ap_request("GET", f"/flows/{flow_id}")
+    return await _ap_cached_get(request, f"/flows/{flow_id}")
 
 
 @router.post("/flows/{flow_id}/run")
@@ -113,6 +171,7 @@ async def trigger_flow_run(flow_id: str, payload: Optional[Dict] = None):
 
 @router.get("/flow-runs")
 async def list_flow_runs(
+    request: Request,
     flow_id: Optional[str] = None,
     limit: int = 20
 ):
@@ -121,10 +180,10 @@ async def list_flow_runs(
     if flow_id:
         query_params += f"&flowId={flow_id}"
     
-    return await _ap_request("GET", f"/flow-runs{query_params}")
+    return await _ap_cached_get(request, f"/flow-runs{query_params}")
 
 
 @router.get("/flow-runs/{run_id}")
-async def get_flow_run(run_id: str):
+async def get_flow_run(request: Request, run_id: str):
     """Get details of a specific flow run."""
-    return await _ap_request("GET", f"/flow-runs/{run_id}")
+    return await _ap_cached_get(request, f"/flow-runs/{run_id}")
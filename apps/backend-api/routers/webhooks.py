@@ -0,0 +1,75 @@
+"""
+Webhooks API Router
+
+Inbound event deliveries from the workflow engine. Requests are signed
+with a shared secret rather than a user token.
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Literal, Optional
+import os
+import logging
+
+import run_events as run_events_module
+from run_events import run_events, verify_signature
+
+logger = logging.getLogger(__name__)
+
+# Largest number of events accepted in one delivery
+RUN_EVENTS_DELIVERY_MAX = int(os.getenv("RUN_EVENTS_DELIVERY_MAX", "1000"))
+
+router = APIRouter(
+    prefix="/api/webhooks",
+    tags=["webhooks"]
+)
+
+
+# ============================================================================
+# Pydantic Models
+# ============================================================================
+
+class RunEvent(BaseModel):
+    type: Literal["run.started", "run.finished"]
+    run_id: str = Field(..., min_length=1, max_length=64)
+    flow_id: str = Field(..., min_length=1, max_length=64)
+    status: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+class RunEventDelivery(BaseModel):
+    events: List[RunEvent] = Field(..., max_length=RUN_EVENTS_DELIVERY_MAX)
+
+
+# ============================================================================
+# Activepieces Run Events
+# ============================================================================
+
+@router.post("/activepieces/runs", status_code=202)
+async def ingest_run_events(request: Request):
+    """
+    Accept a signed batch of run-started / run-finished events. They are
+    written to workflow_runs by the run event buffer within a second or so.
+    """
+    if not run_events_module.RUN_EVENTS_SECRET:
+        raise HTTPException(status_code=503, detail="Run event ingestion is not configured")
+
+    body = await request.body()
+    if not verify_signature(body, request.headers.get("x-bronn-signature")):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+
+    try:
+        delivery = RunEventDelivery.model_validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    if not run_events.add([event.model_dump() for event in delivery.events]):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Run event buffer is full"},
+            headers={"Retry-After": str(max(1, int(run_events.flush_interval)))},
+        )
+    return {"accepted": len(delivery.events)}
@@ -5,20 +5,41 @@ Global workflow operations across all workspaces.
 All data persisted to Cloud SQL.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Header, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, contains_eager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+from pydantic import BaseModel, Field
+import httpx
+import os
 import uuid
 import logging
 
 import models
 import database
-from auth.firebase_auth import verify_firebase_token
-from auth.signing_key import get_public_key
+from auth.dependencies import verify_request_token
+from auth.jwks import jwks_response, public_key_response
+from executors import run_blocking
+from flow_mirror import flow_mirror, register_project
+from serialization import FastJSONResponse, dumps
+from workflow_engine import (
+    TERMINAL_STATUSES,
+    BulkResult,
+    WorkflowEngine,
+    WorkflowStatus,
+    execution_watchers,
+    get_workflow_engine,
+)
 
 logger = logging.getLogger(__name__)
 
+# Largest batch accepted by the /batch endpoints
+WORKFLOW_BATCH_MAX = int(os.getenv("WORKFLOW_BATCH_MAX", "200"))
+# Longest long-poll / event stream (seconds), and the SSE keep-alive interval
+EXECUTION_WAIT_MAX = float(os.getenv("EXECUTION_WAIT_MAX", "60"))
+EXECUTION_STREAM_MAX = float(os.getenv("EXECUTION_STREAM_MAX", "900"))
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+
 router = APIRouter(
     prefix="/api/workflows",
     tags=["workflows"]
@@ -51,12 +72,35 @@ class WorkflowUpdate(BaseModel):
     definition_json: Optional[dict] = None
 
 
+class MirrorProject(BaseModel):
+    project_id: str  # Activepieces project ID
+    workspace_id: str
+
+
+class BatchIds(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=WORKFLOW_BATCH_MAX)
+
+
+class BatchStatusUpdate(BaseModel):
+    # Engine workflow ID -> "active" | "paused"
+    statuses: Dict[str, str] = Field(..., min_length=1, max_length=WORKFLOW_BATCH_MAX)
+
+
+class BatchExecuteItem(BaseModel):
+    workflow_id: str
+    input_data: Optional[Dict[str, Any]] = None
+
+
+class BatchExecute(BaseModel):
+    runs: List[BatchExecuteItem] = Field(..., min_length=1, max_length=WORKFLOW_BATCH_MAX)
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
-def get_authenticated_user(authorization: Optional[str] = Header(None)):
-    """Extract and validate user from Firebase authorization header."""
+async def get_authenticated_user(authorization: Optional[str] = Header(None)):
+    """Extract and validate user from a Firebase or Bronn session authorization header."""
     if not authorization:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
@@ -68,12 +112,12 @@ def get_authenticated_user(authorization: Optional[str] = Header(None)):
     if not token:
         raise HTTPException(status_code=401, detail="No token provided")
     
-    # Verify with Firebase
-    decoded = verify_firebase_token(token)
+    # Verify the Bronn session token, or with Firebase
+    decoded = await verify_request_token(token)
     if not decoded:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    # Return user info from Firebase token
+    # Return user info from the token claims
     return {
         "uid": decoded.get("uid"),
         "email": decoded.get("email", ""),
@@ -87,14 +131,13 @@ def get_authenticated_user(authorization: Optional[str] = Header(None)):
 # ============================================================================
 
 @router.get("/engine/public-key")
-def get_engine_public_key():
+def get_engine_public_key(request: Request):
     """
     Retrieve the public key for Activepieces to verify JWTs.
     This endpoint is called by Activepieces to fetch the signing key.
     """
     try:
-        key_id, public_key = get_public_key()
-        return {"keyId": key_id, "publicKey": public_key}
+        return public_key_response(request)
     except Exception as e:
         logger.error(f"Failed to retrieve public key: {e}")
         raise HTTPException(
@@ -103,13 +146,321 @@ def get_engine_public_key():
         )
 
 
+@router.get("/engine/jwks.json")
+def get_engine_jwks(request: Request):
+    """
+    JWKS for every active signing key (current and recently retired).
+    Cacheable: carries an ETag and answers If-None-Match with 304.
+    """
+    try:
+        return jwks_response(request)
+    except Exception as e:
+        logger.error(f"Failed to build JWKS: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve signing keys: {str(e)}"
+        )
+
+
+# ============================================================================
+# Batch Engine Endpoints
+# ============================================================================
+
+def _batch_response(results: List[BulkResult]) -> dict:
+    """Per-item results in request order, with success/failure counts."""
+    succeeded = sum(1 for r in results if r.ok)
+    return {
+        "results": [
+            {"id": r.id, "ok": r.ok, "data": r.value, "error": r.error}
+            for r in results
+        ],
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    }
+
+
+def _owned_flow_ids(db: Session, user: dict, flow_ids: Iterable[str]) -> Set[str]:
+    """The engine flow IDs among flow_ids that are mirrored into the user's workspaces."""
+    database.set_db_context(db, user.get("tenant_id", "default"), user["email"])
+    wanted = set(flow_ids)
+    if not wanted:
+        return set()
+    rows = db.query(models.Workflow.engine_flow_id)\
+        .join(models.Workspace)\
+        .filter(models.Workspace.owner_id == user["uid"])\
+        .filter(models.Workflow.engine_flow_id.in_(wanted))\
+        .all()
+    return {row[0] for row in rows}
+
+
+async def _authorized_flow_ids(db: Session, user: dict, flow_ids: Iterable[str]) -> Set[str]:
+    # The engine is called with the platform-wide API key, so ownership is
+    # checked here, against the flows mirrored into the user's workspaces
+    return await run_blocking("db", _owned_flow_ids, db, user, list(flow_ids))
+
+
+def _merge_results(ids: List[str], allowed: Set[str], results: List[BulkResult]) -> List[BulkResult]:
+    """Results for the allowed IDs, with every other ID reported as not found, in request order."""
+    found = iter(results)
+    return [next(found) if i in allowed else BulkResult(i, error="Not found") for i in ids]
+
+
+@router.post("/batch/get")
+async def batch_get_workflows(
+    body: BatchIds,
+    user: dict = Depends(get_authenticated_user),
+    db: Session = Depends(database.get_db)
+):
+    """Get several engine workflows in one call."""
+    allowed = await _authorized_flow_ids(db, user, body.ids)
+    results = await get_workflow_engine().get_workflows([i for i in body.ids if i in allowed])
+    return _batch_response(_merge_results(body.ids, allowed, results))
+
+
+@router.post("/batch/status")
+async def batch_update_workflow_statuses(
+    body: BatchStatusUpdate,
+    user: dict = Depends(get_authenticated_user),
+    db: Session = Depends(database.get_db)
+):
+    """Enable or disable several engine workflows in one call."""
+    try:
+        statuses = {wid: WorkflowStatus(status) for wid, status in body.statuses.items()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    allowed = await _authorized_flow_ids(db, user, statuses)
+    results = await get_workflow_engine().update_workflow_statuses(
+        {wid: status for wid, status in statuses.items() if wid in allowed}
+    )
+    return _batch_response(_merge_results(list(statuses), allowed, results))
+
+
+@router.post("/batch/execute")
+async def batch_execute_workflows(
+    body: BatchExecute,
+    user: dict = Depends(get_authenticated_user),
+    db: Session = Depends(database.get_db)
+):
+    """Trigger several engine workflows in one call."""
+    ids = [run.workflow_id for run in body.runs]
+    allowed = await _authorized_flow_ids(db, user, ids)
+    batch = [(run.workflow_id, run.input_data) for run in body.runs if run.workflow_id in allowed]
+    results = await get_workflow_engine().execute_workflows(batch)
+    return _batch_response(_merge_results(ids, allowed, results))
+
+
+@router.post("/batch/executions/status")
+async def batch_get_execution_statuses(
+    body: BatchIds,
+    user: dict = Depends(get_authenticated_user),
+    db: Session = Depends(database.get_db)
+):
+    """Get the status of several executions in one call."""
+    results = await get_workflow_engine().get_execution_statuses(body.ids)
+    # An execution's owner is its flow's owner: only the flow ID comes back
+    # from the engine, so the check runs after the fetch
+    allowed = await _authorized_flow_ids(db, user, {r.value.workflow_id for r in results if r.ok})
+    return _batch_response([
+        r if not r.ok or r.value.workflow_id in allowed else BulkResult(r.id, error="Not found")
+        for r in results
+    ])
+
+
+# ============================================================================
+# Execution Wait Endpoints
+# ============================================================================
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+def _upstream_error(e: httpx.HTTPError) -> HTTPException:
+    """Map an engine failure to 504 (timed out) or 502 (any other failure)."""
+    if isinstance(e, httpx.TimeoutException):
+        return HTTPException(status_code=504, detail="Workflow engine timed out")
+    return HTTPException(status_code=502, detail=f"Workflow engine request failed: {e}")
+
+
+async def _owned_execution(engine: WorkflowEngine, db: Session, user: dict, execution_id: str):
+    """
+    The execution's current status; 404 unless it exists and its flow is
+    mirrored into one of the user's workspaces, 502/504 if the engine fails.
+    """
+    try:
+        execution = await engine.get_execution_status(execution_id)
+    except httpx.HTTPError as e:
+        raise _upstream_error(e)
+    if execution is None or not await _authorized_flow_ids(db, user, [execution.workflow_id]):
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return execution
+
+
+@router.get("/executions/{execution_id}/wait")
+async def wait_for_execution(
+    execution_id: str,
+    timeout: float = Query(25, gt=0, le=EXECUTION_WAIT_MAX),
+    user: dict = Depends(get_authenticated_user),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Long-poll until an execution finishes or `timeout` seconds pass.
+    Concurrent waiters on the same execution share one upstream poller.
+    """
+    engine = get_workflow_engine()
+    execution = await _owned_execution(engine, db, user, execution_id)
+    if execution.status not in TERMINAL_STATUSES:
+        try:
+            execution = await engine.wait_for_execution(execution_id, timeout)
+        except httpx.HTTPError as e:
+            raise _upstream_error(e)
+        if execution is None:
+            raise HTTPException(status_code=404, detail="Execution not found")
+    return {"execution": execution, "done": execution.status in TERMINAL_STATUSES}
+
+
+@router.get("/executions/{execution_id}/events")
+async def stream_execution_events(
+    execution_id: str,
+    timeout: float = Query(300, gt=0, le=EXECUTION_STREAM_MAX),
+    user: dict = Depends(get_authenticated_user),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Server-sent events: a `status` event on every status change, then one
+    `end` event when the execution finishes (or the stream times out). An
+    engine failure after the stream has started is sent as an `error`
+    event before `end`.
+    """
+    engine = get_workflow_engine()
+    first = await _owned_execution(engine, db, user, execution_id)
+    
+    async def events() -> AsyncIterator[str]:
+        latest = first
+        yield _sse("status", first)
+        if first.status not in TERMINAL_STATUSES:
+            try:
+                async for execution in execution_watchers.updates(
+                    engine, execution_id, timeout, heartbeat=SSE_HEARTBEAT
+                ):
+                    if execution is None:
+                        yield ": keep-alive\n\n"
+                        continue
+                    if execution.status != latest.status:
+                        yield _sse("status", execution)
+                    latest = execution
+            except httpx.HTTPError as e:
+                error = _upstream_error(e)
+                yield _sse("error", {"status_code": error.status_code, "detail": error.detail})
+        done = latest.status in TERMINAL_STATUSES
+        yield _sse("end", {"execution": latest, "done": done})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ============================================================================
+# Flow Mirror Endpoints
+# ============================================================================
+
+def _owned_workspace(db: Session, workspace_id: str, user: dict):
+    try:
+        workspace_uuid = uuid.UUID(workspace_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workspace ID format")
+    workspace = db.query(models.Workspace).filter(models.Workspace.id == workspace_uuid).first()
+    if not workspace:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    if workspace.owner_id != user["uid"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return workspace
+
+
+def _load_owned_workspace(db: Session, workspace_id: str, user: dict):
+    database.set_db_context(db, user.get("tenant_id", "default"), user["email"])
+    return _owned_workspace(db, workspace_id, user)
+
+
+def _register_project(db: Session, project_id: str, workspace_id, user: dict) -> dict:
+    tenant_id = user.get("tenant_id", "default")
+    database.set_db_context(db, tenant_id, user["email"])
+    return register_project(db, project_id, workspace_id, user["uid"], tenant_id).to_dict()
+
+
+@router.post("/mirror/projects")
+async def mirror_engine_project(
+    body: MirrorProject,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(get_authenticated_user),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Mirror an engine project's flows into one of the user's workspaces.
+    The project must be the one provisioned for that workspace. The first
+    sync starts immediately; later ones run in the background.
+    """
+    workspace = await run_blocking("db", _load_owned_workspace, db, body.workspace_id, user)
+    
+    # The engine is called with the platform-wide API key: only a project
+    # provisioned for this workspace (externalId) may be mirrored into it
+    try:
+        project_ids = await get_workflow_engine().list_project_ids(str(workspace.id))
+    except httpx.HTTPError as e:
+        raise _upstream_error(e)
+    if body.project_id not in project_ids:
+        raise HTTPException(status_code=403, detail="Project does not belong to this workspace")
+    
+    state = await run_blocking("db", _register_project, db, body.project_id, workspace.id, user)
+    background_tasks.add_task(flow_mirror.sync_project, body.project_id)
+    return state
+
+
+@router.get("/mirror/projects/{project_id}/flows")
+def list_mirrored_flows(
+    project_id: str,
+    user: dict = Depends(get_authenticated_user),
+    db: Session = Depends(database.get_db),
+    status: Optional[str] = Query(None),
+    limit: int = Query(50, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """
+    List a mirrored project's flows from the database, newest first, in
+    the engine's own format. No call to the engine is made.
+    """
+    tenant_id = user.get("tenant_id", "default")
+    database.set_db_context(db, tenant_id, user["email"])
+    
+    state = db.get(models.FlowSyncState, project_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Project is not mirrored")
+    _owned_workspace(db, str(state.workspace_id), user)
+    
+    query = db.query(models.Workflow).filter(models.Workflow.engine_project_id == project_id)
+    if status:
+        query = query.filter(models.Workflow.status == status)
+    flows = query\
+        .order_by(models.Workflow.created_at.desc())\
+        .offset(offset)\
+        .limit(limit)\
+        .all()
+    
+    return FastJSONResponse({
+        "data": [f.definition_json or f.to_dict() for f in flows],
+        "synced_at": state.to_dict()["last_synced_at"],
+        "high_water_mark": state.high_water_mark,
+    })
+
+
 # ============================================================================
 # Global Workflow Endpoints
 # ============================================================================
 
 @router.get("", response_model=List[WorkflowResponse])
 def list_all_workflows(
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db),
     status: Optional[str] = Query(None),
     limit: int = Query(50, le=100),
@@ -119,15 +470,15 @@ def list_all_workflows(
     List all workflows across all workspaces for the authenticated user.
     This is the global workflow index.
     """
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
     
-    # Get all workflows for user's workspaces
+    # Get all workflows for user's workspaces; the joined workspace fills
+    # workflow.workspace, so include_workspace costs no extra queries
     query = db.query(models.Workflow)\
         .join(models.Workspace)\
+        .options(contains_eager(models.Workflow.workspace))\
         .filter(models.Workspace.owner_id == user["uid"])
     
     if status:
@@ -145,12 +496,10 @@ def list_all_workflows(
 @router.get("/{workflow_id}", response_model=WorkflowResponse)
 def get_workflow(
     workflow_id: str,
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db)
 ):
     """Get a specific workflow by ID."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
@@ -175,16 +524,59 @@ def get_workflow(
     return workflow.to_dict(include_workspace=True)
 
 
+@router.get("/{workflow_id}/runs")
+def list_workflow_runs(
+    workflow_id: str,
+    user: dict = Depends(get_authenticated_user),
+    db: Session = Depends(database.get_db),
+    status: Optional[str] = Query(None),
+    limit: int = Query(50, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Run history for a workflow, newest first, from the runs ingested via
+    the run event webhook. No call to the engine is made.
+    """
+    # Set DB context for RLS
+    tenant_id = user.get("tenant_id", "default")
+    database.set_db_context(db, tenant_id, user["email"])
+    
+    try:
+        workflow_uuid = uuid.UUID(workflow_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workflow ID format")
+    
+    workflow = db.query(models.Workflow)\
+        .join(models.Workspace)\
+        .filter(models.Workflow.id == workflow_uuid)\
+        .first()
+    
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    
+    if workflow.workspace.owner_id != user["uid"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    query = db.query(models.WorkflowRun).filter(models.WorkflowRun.workflow_id == workflow_uuid)
+    if status:
+        query = query.filter(models.WorkflowRun.status == status)
+    runs = query\
+        .order_by(models.WorkflowRun.started_at.desc())\
+        .offset(offset)\
+        .limit(limit)\
+        .all()
+    
+    return FastJSONResponse({"data": [r.to_dict() for r in runs]})
+
+
 @router.put("/{workflow_id}", response_model=WorkflowResponse)
 def update_workflow(
     workflow_id: str,
     update: WorkflowUpdate,
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db)
 ):
     """Update a workflow."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
@@ -224,12 +616,10 @@ def update_workflow(
 @router.delete("/{workflow_id}")
 def delete_workflow(
     workflow_id: str,
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db)
 ):
     """Delete a workflow."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
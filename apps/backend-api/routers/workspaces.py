@@ -15,7 +15,7 @@ import logging
 
 import models
 import database
-from auth.firebase_auth import verify_firebase_token
+from auth.dependencies import verify_request_token
 
 logger = logging.getLogger(__name__)
 
@@ -78,8 +78,8 @@ class WorkflowResponse(BaseModel):
 # Helper Functions
 # ============================================================================
 
-def get_authenticated_user(authorization: Optional[str] = Header(None)):
-    """Extract and validate user from Firebase authorization header."""
+async def get_authenticated_user(authorization: Optional[str] = Header(None)):
+    """Extract and validate user from a Firebase or Bronn session authorization header."""
     if not authorization:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
@@ -91,12 +91,12 @@ def get_authenticated_user(authorization: Optional[str] = Header(None)):
     if not token:
         raise HTTPException(status_code=401, detail="No token provided")
     
-    # Verify with Firebase
-    decoded = verify_firebase_token(token)
+    # Verify the Bronn session token, or with Firebase
+    decoded = await verify_request_token(token)
     if not decoded:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    # Return user info from Firebase token
+    # Return user info from the token claims
     return {
         "uid": decoded.get("uid"),
         "email": decoded.get("email", ""),
@@ -112,12 +112,10 @@ def get_authenticated_user(authorization: Optional[str] = Header(None)):
 @router.post("", response_model=WorkspaceResponse)
 def create_workspace(
     workspace: WorkspaceCreate,
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db)
 ):
     """Create a new workspace."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
@@ -139,14 +137,12 @@ def create_workspace(
 
 @router.get("", response_model=List[WorkspaceResponse])
 def list_workspaces(
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db),
     limit: int = Query(50, le=100),
     offset: int = Query(0, ge=0)
 ):
     """List all workspaces for the authenticated user."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
@@ -164,12 +160,10 @@ def list_workspaces(
 @router.get("/{workspace_id}", response_model=WorkspaceResponse)
 def get_workspace(
     workspace_id: str,
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db)
 ):
     """Get a specific workspace by ID."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
@@ -197,12 +191,10 @@ def get_workspace(
 def update_workspace(
     workspace_id: str,
     update: WorkspaceUpdate,
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db)
 ):
     """Update a workspace."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
@@ -241,12 +233,10 @@ def update_workspace(
 @router.delete("/{workspace_id}")
 def delete_workspace(
     workspace_id: str,
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db)
 ):
     """Delete a workspace and all its workflows (cascade)."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
@@ -280,12 +270,10 @@ def delete_workspace(
 def create_workflow_in_workspace(
     workspace_id: str,
     workflow: WorkflowCreate,
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db)
 ):
     """Create a new workflow within a workspace."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
@@ -325,15 +313,13 @@ def create_workflow_in_workspace(
 @router.get("/{workspace_id}/workflows", response_model=List[WorkflowResponse])
 def list_workflows_in_workspace(
     workspace_id: str,
-    authorization: Optional[str] = Header(None),
+    user: dict = Depends(get_authenticated_user),
     db: Session = Depends(database.get_db),
     status: Optional[str] = Query(None),
     limit: int = Query(50, le=100),
     offset: int = Query(0, ge=0)
 ):
     """List all workflows in a workspace."""
-    user = get_authenticated_user(authorization)
-    
     # Set DB context for RLS
     tenant_id = user.get("tenant_id", "default")
     database.set_db_context(db, tenant_id, user["email"])
@@ -0,0 +1,356 @@
+"""
+Activepieces Run Event Ingestion
+
+Activepieces (or the Bronn piece) POSTs run-started / run-finished events
+to /api/webhooks/activepieces/runs. Events are buffered in memory, keyed
+by engine run ID, and written to `workflow_runs` on a short interval as
+one multi-row INSERT ... ON CONFLICT (engine_run_id) DO UPDATE per batch,
+so run history can be read locally instead of proxied to the engine.
+
+Writes are idempotent per run: events for the same run merge in the
+buffer and again in the upsert, a terminal status is never replaced by a
+non-terminal one, and the first started_at / last finished_at win, so
+retried or out-of-order deliveries converge on the same row.
+
+Runs are attached to workflows through Workflow.engine_flow_id (see
+flow_mirror). A run can start before the mirror has seen its flow, so
+events for flows that are not mirrored yet are parked in memory and
+retried after the next mirror sync that writes flows. Parked runs are
+dropped (and counted) after RUN_EVENTS_UNMATCHED_TTL seconds, or oldest
+first beyond RUN_EVENTS_MAX_UNMATCHED.
+
+Deliveries are authenticated with an HMAC-SHA256 of the raw body under
+RUN_EVENTS_SECRET, sent as `X-Bronn-Signature: sha256=<hex>`.
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from flow_mirror import parse_engine_timestamp
+
+logger = logging.getLogger(__name__)
+
+RUN_EVENTS_SECRET = os.getenv("RUN_EVENTS_SECRET", "")
+# Flush triggers: every RUN_EVENTS_FLUSH_INTERVAL seconds, or as soon as
+# RUN_EVENTS_BATCH_SIZE distinct runs are pending
+RUN_EVENTS_FLUSH_INTERVAL = float(os.getenv("RUN_EVENTS_FLUSH_INTERVAL", "1"))
+RUN_EVENTS_BATCH_SIZE = int(os.getenv("RUN_EVENTS_BATCH_SIZE", "500"))
+# Pending runs held before new deliveries are refused (503)
+RUN_EVENTS_MAX_PENDING = int(os.getenv("RUN_EVENTS_MAX_PENDING", "20000"))
+# Runs of not-yet-mirrored flows held for retry, and for how long (seconds)
+RUN_EVENTS_MAX_UNMATCHED = int(os.getenv("RUN_EVENTS_MAX_UNMATCHED", "20000"))
+RUN_EVENTS_UNMATCHED_TTL = float(os.getenv("RUN_EVENTS_UNMATCHED_TTL", "3600"))
+
+# Engine run status -> workflow_runs.status
+RUN_STATUS = {
+    "QUEUED": "pending",
+    "SCHEDULED": "pending",
+    "RUNNING": "running",
+    "PAUSED": "running",
+    "SUCCEEDED": "success",
+    "FAILED": "failed",
+    "TIMEOUT": "failed",
+    "INTERNAL_ERROR": "failed",
+    "QUOTA_EXCEEDED": "failed",
+    "STOPPED": "failed",
+}
+TERMINAL_RUN_STATUSES = ("success", "failed")
+
+
+def sign_payload(body: bytes, secret: str = None) -> str:
+    """X-Bronn-Signature header value for a raw request body."""
+    key = (RUN_EVENTS_SECRET if secret is None else secret).encode()
+    return "sha256=" + hmac.new(key, body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, signature: Optional[str], secret: str = None) -> bool:
+    """Constant-time check of an X-Bronn-Signature header."""
+    if not signature:
+        return False
+    return hmac.compare_digest(sign_payload(body, secret), signature.strip())
+
+
+def run_status(event_type: str, status: Optional[str]) -> str:
+    """workflow_runs.status for an event; the type decides when status is absent."""
+    if status:
+        return RUN_STATUS.get(status.upper(), "pending")
+    return "success" if event_type == "run.finished" else "running"
+
+
+def _merge(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine two events for the same run, as the upsert does."""
+    status = new["status"]
+    if old["status"] in TERMINAL_RUN_STATUSES and status not in TERMINAL_RUN_STATUSES:
+        status = old["status"]
+    return {
+        "flow_id": new["flow_id"] or old["flow_id"],
+        "status": status,
+        "started_at": old["started_at"] or new["started_at"],
+        "finished_at": new["finished_at"] or old["finished_at"],
+        "error_message": new["error_message"] or old["error_message"],
+    }
+
+
+class RunEventBuffer:
+    """
+    Buffers run events per engine run ID and flushes them in batches.
+
+    Each flush resolves flow IDs to workflows with one SELECT, then writes
+    each batch as one multi-row upsert per tenant. Runs whose flow is not
+    mirrored yet are parked until retry_unmatched().
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: int = RUN_EVENTS_BATCH_SIZE,
+        flush_interval: float = RUN_EVENTS_FLUSH_INTERVAL,
+        max_pending: int = RUN_EVENTS_MAX_PENDING,
+        max_unmatched: int = RUN_EVENTS_MAX_UNMATCHED,
+        unmatched_ttl: float = RUN_EVENTS_UNMATCHED_TTL,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_unmatched = max_unmatched
+        self.unmatched_ttl = unmatched_ttl
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # run ID -> (parked at, entry), oldest first
+        self._unmatched: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.received = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.unmatched = 0
+        self.unmatched_dropped = 0
+        self.failures = 0
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def add(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Queue a delivery of events. Each event has type, run_id, flow_id
+        and optionally status, started_at, finished_at and error.
+
+        All or nothing: returns False, queuing none of them, if the buffer
+        cannot take the delivery's new runs.
+        """
+        entries = []
+        for event in events:
+            entries.append((event["run_id"], {
+                "flow_id": event["flow_id"],
+                "status": run_status(event["type"], event.get("status")),
+                "started_at": parse_engine_timestamp(event.get("started_at")),
+                "finished_at": parse_engine_timestamp(event.get("finished_at")),
+                "error_message": event.get("error") or None,
+            }))
+        with self._lock:
+            new_runs = {run_id for run_id, _ in entries if run_id not in self._pending}
+            if len(self._pending) + len(new_runs) > self.max_pending:
+                self.rejected += len(events)
+                return False
+            for run_id, entry in entries:
+                old = self._pending.get(run_id)
+                self._pending[run_id] = entry if old is None else _merge(old, entry)
+            self.received += len(events)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+        return True
+
+    def _requeue(self, batch: Dict[str, Dict[str, Any]]) -> None:
+        """Put a failed batch back, merging with events that arrived since."""
+        with self._lock:
+            merged = dict(batch)
+            for run_id, entry in self._pending.items():
+                old = merged.get(run_id)
+                merged[run_id] = entry if old is None else _merge(old, entry)
+            self._pending = merged
+
+    def _park(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Hold runs whose flow is not mirrored yet, merging with earlier ones."""
+        now = time.monotonic()
+        with self._lock:
+            for run_id, entry in entries.items():
+                parked = self._unmatched.pop(run_id, None)
+                if parked is None:
+                    self.unmatched += 1
+                else:
+                    entry = _merge(parked[1], entry)
+                self._unmatched[run_id] = (parked[0] if parked else now, entry)
+            while len(self._unmatched) > self.max_unmatched:
+                self._unmatched.popitem(last=False)
+                self.unmatched_dropped += 1
+
+    def retry_unmatched(self) -> int:
+        """
+        Queue parked runs for another flush, e.g. after the flow mirror
+        wrote new flows. Runs parked longer than unmatched_ttl are dropped.
+        Returns the number of runs queued.
+        """
+        deadline = time.monotonic() - self.unmatched_ttl
+        with self._lock:
+            parked, self._unmatched = self._unmatched, OrderedDict()
+            retry = {}
+            for run_id, (parked_at, entry) in parked.items():
+                if parked_at < deadline:
+                    self.unmatched_dropped += 1
+                else:
+                    retry[run_id] = entry
+            for run_id, entry in retry.items():
+                newer = self._pending.get(run_id)
+                self._pending[run_id] = entry if newer is None else _merge(entry, newer)
+        if retry:
+            self._wakeup.set()
+        return len(retry)
+
+    def flush(self) -> int:
+        """Write all pending runs. Returns the number of rows upserted."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            written = done = 0
+            items = list(batch.items())
+            try:
+                for start in range(0, len(items), self.batch_size):
+                    chunk = dict(items[start:start + self.batch_size])
+                    written += self._write(chunk)
+                    done = start + len(chunk)
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Failed to flush {len(batch) - done} run events: {e}")
+                self._requeue(dict(items[done:]))
+            self.flushes += 1
+            self.rows_written += written
+            return written
+
+    def _write(self, batch: Dict[str, Dict[str, Any]]) -> int:
+        from database import set_db_context
+        from models import Workflow, WorkflowRun
+
+        db = self._new_session()
+        try:
+            flow_ids = {entry["flow_id"] for entry in batch.values()}
+            workflows = {
+                engine_flow_id: (workflow_id, tenant_id)
+                for engine_flow_id, workflow_id, tenant_id in db.query(
+                    Workflow.engine_flow_id, Workflow.id, Workflow.tenant_id
+                ).filter(Workflow.engine_flow_id.in_(flow_ids))
+            }
+
+            rows_by_tenant: Dict[Optional[str], List[Dict[str, Any]]] = {}
+            unmatched = {}
+            for run_id, entry in batch.items():
+                workflow = workflows.get(entry["flow_id"])
+                if workflow is None:
+                    unmatched[run_id] = entry
+                    continue
+                rows_by_tenant.setdefault(workflow[1], []).append({
+                    "id": uuid.uuid4(),
+                    "engine_run_id": run_id,
+                    "workflow_id": workflow[0],
+                    "tenant_id": workflow[1],
+                    "status": entry["status"],
+                    "started_at": entry["started_at"],
+                    "finished_at": entry["finished_at"],
+                    "error_message": entry["error_message"],
+                })
+
+            table = WorkflowRun.__table__
+            insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+            written = 0
+            for tenant_id, rows in rows_by_tenant.items():
+                set_db_context(db, tenant_id, "run-events")
+                stmt = insert(table).values(rows)
+                excluded = stmt.excluded
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.engine_run_id],
+                    set_={
+                        "status": case(
+                            (table.c.status.in_(TERMINAL_RUN_STATUSES), table.c.status),
+                            else_=excluded.status,
+                        ),
+                        "started_at": func.coalesce(table.c.started_at, excluded.started_at),
+                        "finished_at": func.coalesce(excluded.finished_at, table.c.finished_at),
+                        "error_message": func.coalesce(excluded.error_message, table.c.error_message),
+                    },
+                )
+                db.execute(stmt)
+                written += len(rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        # Only once the batch is committed, so a failed one is requeued whole
+        if unmatched:
+            self._park(unmatched)
+        return written
+
+    def start(self) -> None:
+        """Start the background flush thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="run-event-ingest", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write whatever is still pending."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            if not self._stopped.is_set():
+                self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            "pending": len(self._pending),
+            "received": self.received,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "unmatched": self.unmatched,
+            "unmatched_parked": len(self._unmatched),
+            "unmatched_dropped": self.unmatched_dropped,
+            "failures": self.failures,
+        }
+
+
+run_events = RunEventBuffer()
@@ -0,0 +1,62 @@
+"""
+Fast JSON Serialization
+
+JSON encoding and decoding for API responses and Activepieces payloads,
+backed by orjson when it is installed (the stdlib json module otherwise).
+
+FastJSONResponse is the application's default response class. Routes
+with a response_model return plain data, so FastAPI still validates it
+before rendering. Routes without one may return a FastJSONResponse
+themselves to skip the jsonable_encoder pass over a payload that
+to_dict() has already made JSON-ready.
+
+orjson serializes datetime, UUID, Enum and dataclass values natively;
+anything else (pydantic models, Decimal, sets) goes through `_default`.
+"""
+
+import json
+from decimal import Decimal
+from typing import Any, Union
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Encode types the JSON backend does not handle natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parse a JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -69,10 +69,10 @@ MIIEpAIBAAKCAQEA2mKqH...test-key
         mock_response.json.return_value = {"token": "test-session-token"}
         
         async def run_test():
-            with patch("httpx.AsyncClient") as mock_client:
+            with patch("auth.activepieces_sync.get_http_client") as mock_client:
                 mock_instance = AsyncMock()
-                mock_instance.post.return_value = mock_response
-                mock_client.return_value.__aenter__.return_value = mock_instance
+                mock_instance.request.return_value = mock_response
+                mock_client.return_value = mock_instance
                 
                 with patch("auth.activepieces_sync.create_activepieces_jwt", return_value="mock-jwt"):
                     token, error = await get_activepieces_session(
@@ -83,9 +83,9 @@ MIIEpAIBAAKCAQEA2mKqH...test-key
                     )
                     
                     # Verify correct endpoint was called
-                    mock_instance.post.assert_called_once()
-                    call_args = mock_instance.post.call_args
-                    assert "/v1/managed-authn/external-token" in call_args[0][0]
+                    mock_instance.request.assert_called_once()
+                    call_args = mock_instance.request.call_args
+                    assert "/v1/managed-authn/external-token" in call_args[0][1]
         
         asyncio.get_event_loop().run_until_complete(run_test())
 
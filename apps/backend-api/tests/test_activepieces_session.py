@@ -0,0 +1,118 @@
+"""
+Unit Tests for Activepieces Session Token Caching
+
+Tests reuse, merging of concurrent exchanges, refresh-ahead and negative
+caching in auth.activepieces_sync.get_activepieces_session.
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from jose import jwt
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import activepieces_sync
+
+
+def session_token(expires_in: int) -> str:
+    return jwt.encode({"id": "ap-user", "exp": int(time.time()) + expires_in}, "secret", algorithm="HS256")
+
+
+class FakeExchange:
+    """Stand-in for the managed-authn round trip."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        result = self.results[min(self.calls, len(self.results)) - 1]
+        return result
+
+
+@pytest.fixture(autouse=True)
+def configured():
+    activepieces_sync._session_cache.clear()
+    with patch.object(activepieces_sync, "ACTIVEPIECES_AVAILABLE", True):
+        yield
+    activepieces_sync._session_cache.clear()
+
+
+async def get_session(user_id="u1", project_id="default"):
+    return await activepieces_sync.get_activepieces_session(user_id=user_id, project_id=project_id)
+
+
+class TestSessionCache:
+
+    async def test_session_is_reused(self):
+        exchange = FakeExchange([(session_token(3600), None)])
+        with patch.object(activepieces_sync, "_exchange_session", exchange):
+            first = await get_session()
+            second = await get_session()
+
+        assert first == second
+        assert first[1] is None
+        assert exchange.calls == 1
+
+    async def test_concurrent_requests_share_one_exchange(self):
+        exchange = FakeExchange([(session_token(3600), None)])
+        with patch.object(activepieces_sync, "_exchange_session", exchange):
+            results = await asyncio.gather(*[get_session() for _ in range(10)])
+
+        assert exchange.calls == 1
+        assert len(set(results)) == 1
+
+    async def test_sessions_are_per_user_and_project(self):
+        exchange = FakeExchange([(session_token(3600), None)])
+        with patch.object(activepieces_sync, "_exchange_session", exchange):
+            await get_session("u1", "p1")
+            await get_session("u2", "p1")
+            await get_session("u1", "p2")
+
+        assert exchange.calls == 3
+
+    async def test_failures_are_negatively_cached(self):
+        exchange = FakeExchange([(None, "Managed auth failed: 503")])
+        with patch.object(activepieces_sync, "_exchange_session", exchange):
+            for _ in range(5):
+                token, error = await get_session()
+                assert token is None
+                assert "503" in error
+
+        assert exchange.calls == 1
+
+    async def test_failure_backoff_expires(self):
+        exchange = FakeExchange([(None, "down"), (session_token(3600), None)])
+        with patch.object(activepieces_sync, "_exchange_session", exchange), \
+                patch.object(activepieces_sync, "ACTIVEPIECES_SESSION_FAILURE_TTL", 0.05):
+            assert (await get_session())[0] is None
+            await asyncio.sleep(0.06)
+            assert (await get_session())[0] is not None
+
+    async def test_refresh_ahead_serves_cached_token(self):
+        old = session_token(60)
+        new = session_token(3600)
+        exchange = FakeExchange([(old, None), (new, None)])
+        # 60s left is inside the 300s refresh margin
+        with patch.object(activepieces_sync, "_exchange_session", exchange):
+            assert (await get_session())[0] == old
+            assert (await get_session())[0] == old  # served while refreshing
+            await asyncio.sleep(0.05)
+            assert (await get_session())[0] == new
+
+        assert exchange.calls == 2
+
+    async def test_failed_refresh_keeps_valid_token(self):
+        old = session_token(60)
+        exchange = FakeExchange([(old, None), (None, "down")])
+        with patch.object(activepieces_sync, "_exchange_session", exchange):
+            await get_session()
+            await get_session()
+            await asyncio.sleep(0.05)
+            assert (await get_session())[0] == old
@@ -130,6 +130,52 @@ class TestActivepiecesJWT:
             assert decoded["role"] == role
 
 
+class TestActivepiecesJWTReuse:
+    """Tests for provisioning JWT reuse."""
+    
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        from auth import signing_key
+        signing_key._jwt_cache.clear()
+        yield
+        signing_key._jwt_cache.clear()
+    
+    @patch('auth.signing_key.create_activepieces_jwt', wraps=create_activepieces_jwt)
+    def test_same_user_project_role_reuses_token(self, mock_create):
+        """Test that repeated requests return the same token without re-signing."""
+        from auth.signing_key import get_activepieces_jwt, get_jwt_cache_stats
+        
+        first, exp = get_activepieces_jwt(user_id="u1", project_id="p1", role="EDITOR")
+        second, _ = get_activepieces_jwt(user_id="u1", project_id="p1", role="EDITOR")
+        
+        assert first == second
+        assert mock_create.call_count == 1
+        assert exp > datetime.utcnow().timestamp()
+        assert get_jwt_cache_stats()["hits"] == 1
+    
+    def test_different_role_or_project_mints_new_token(self):
+        """Test that the cache key separates role, project and display name."""
+        from auth.signing_key import get_activepieces_jwt
+        
+        base, _ = get_activepieces_jwt(user_id="u1", project_id="p1", role="EDITOR")
+        assert get_activepieces_jwt(user_id="u1", project_id="p1", role="ADMIN")[0] != base
+        assert get_activepieces_jwt(user_id="u1", project_id="p2", role="EDITOR")[0] != base
+        assert get_activepieces_jwt(
+            user_id="u1", project_id="p1", role="EDITOR", project_name="Sales"
+        )[0] != base
+    
+    @patch('auth.signing_key.create_activepieces_jwt', wraps=create_activepieces_jwt)
+    def test_token_is_not_reused_inside_margin(self, mock_create):
+        """Test that a token with too little lifetime left is re-minted."""
+        from auth import signing_key
+        
+        with patch.object(signing_key, "ACTIVEPIECES_JWT_REUSE_MARGIN", 1.0):
+            signing_key.get_activepieces_jwt(user_id="u1", project_id="p1")
+            signing_key.get_activepieces_jwt(user_id="u1", project_id="p1")
+        
+        assert mock_create.call_count == 2
+
+
 class TestTokenExchangeEndpoint:
     """Tests for the Firebase-to-Activepieces token exchange endpoint."""
     
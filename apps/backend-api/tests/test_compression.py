@@ -0,0 +1,140 @@
+"""
+Tests for Negotiated Response Compression
+
+Checks Accept-Encoding negotiation, the size threshold, skipped bodies,
+streaming responses and metrics of compression.CompressionMiddleware.
+"""
+
+import gzip
+import zlib
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compression
+from compression import CompressionMiddleware, compression_stats, negotiate
+
+BIG = "bronn " * 2000
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse(BIG, headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(BIG.encode()), headers={"Content-Encoding": "gzip"})
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        def chunks():
+            for i in range(5):
+                yield f"chunk-{i} " * 200
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return TestClient(app)
+
+
+def raw_get(client, path, accept="gzip"):
+    """GET without httpx's transparent decoding, so the wire bytes are visible."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestNegotiate:
+
+    @pytest.mark.parametrize("header,expected", [
+        ("gzip, deflate", "gzip"),
+        ("x-gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("*", "gzip"),
+        ("*;q=0.5, gzip;q=0", None),
+        ("", None),
+    ])
+    def test_gzip_only(self, header, expected):
+        with patch.dict(compression.CODECS, {"gzip": compression.CODECS["gzip"]}, clear=True):
+            assert negotiate(header) == expected
+
+    def test_q_values_and_preference(self):
+        codecs = {"gzip": compression.CODECS["gzip"], "br": compression.CODECS["gzip"]}
+        with patch.dict(compression.CODECS, codecs, clear=True):
+            assert negotiate("gzip, br") == "br"
+            assert negotiate("gzip;q=1, br;q=0.5") == "gzip"
+            assert negotiate("gzip, br", preference=["gzip", "br"]) == "gzip"
+
+
+class TestCompressionMiddleware:
+
+    def test_large_body_is_gzipped(self, client):
+        response, body = raw_get(client, "/big")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"abc"'
+        assert int(response.headers["content-length"]) == len(body) < len(BIG)
+        assert gzip.decompress(body).decode() == BIG
+
+    def test_not_accepted(self, client):
+        response, body = raw_get(client, "/big", accept="identity")
+        assert "content-encoding" not in response.headers
+        assert body.decode() == BIG
+
+    @pytest.mark.parametrize("path,reason", [
+        ("/small", "too_small"),
+        ("/encoded", "already_encoded"),
+        ("/image", "content_type"),
+    ])
+    def test_skipped(self, client, path, reason):
+        before = compression_stats.skipped.get(reason, 0)
+        response, body = raw_get(client, path)
+
+        assert compression_stats.skipped[reason] == before + 1
+        if path != "/encoded":
+            assert "content-encoding" not in response.headers
+
+    def test_streaming_response(self, client):
+        response, body = raw_get(client, "/stream")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        expected = "".join(f"chunk-{i} " * 200 for i in range(5))
+        assert zlib.decompress(body, 31).decode() == expected
+
+    def test_metrics(self, client):
+        before = compression_stats.stats()["encodings"]["gzip"]
+        raw_get(client, "/big")
+        after = compression_stats.stats()["encodings"]["gzip"]
+
+        assert after["responses"] == before["responses"] + 1
+        assert after["bytes_in"] - before["bytes_in"] == len(BIG)
+        assert after["level"] == compression.COMPRESSION_GZIP_LEVEL
+        assert 0 < after["ratio"] < 1
+        assert after["cpu_ms"] >= 0
+
+    def test_large_chunks_are_offloaded(self, client):
+        with patch.object(compression, "COMPRESSION_OFFLOAD_SIZE", 1000), \
+                patch.object(compression, "run_blocking", wraps=compression.run_blocking) as offload:
+            response, body = raw_get(client, "/big")
+
+        assert offload.called
+        assert gzip.decompress(body).decode() == BIG
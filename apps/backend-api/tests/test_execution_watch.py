@@ -0,0 +1,177 @@
+"""
+Tests for Shared Execution Watchers
+
+Checks that concurrent waiters share one poller, that terminal states
+fan out to every waiter, and the long-poll / SSE endpoints.
+"""
+
+import asyncio
+import uuid
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from models import Workflow, Workspace
+from workflow_engine import ExecutionInfo, ExecutionStatus, WorkflowEngine, execution_watchers
+from workflow_engine import execution_watch
+
+
+class ScriptedEngine(WorkflowEngine):
+    """
+    Reports RUNNING for `running_polls` polls, then SUCCEEDED. IDs starting
+    with "foreign" belong to another tenant's flow; "broken" and "slow"
+    ones fail after the first poll.
+    """
+
+    create_workflow = get_workflow = list_workflows = update_workflow_status = None
+    delete_workflow = execute_workflow = list_executions = None
+
+    def __init__(self, running_polls: int = 3):
+        self.running_polls = running_polls
+        self.polls = 0
+
+    async def get_execution_status(self, execution_id):
+        self.polls += 1
+        if execution_id == "missing":
+            return None
+        if self.polls > 1 and execution_id.startswith("broken"):
+            raise httpx.ConnectError("engine down")
+        if self.polls > 1 and execution_id.startswith("slow"):
+            raise httpx.ReadTimeout("engine slow")
+        status = ExecutionStatus.RUNNING if self.polls <= self.running_polls else ExecutionStatus.SUCCEEDED
+        flow_id = "flow-other" if execution_id.startswith("foreign") else "flow-1"
+        return ExecutionInfo(id=execution_id, workflow_id=flow_id, status=status, started_at="")
+
+
+@pytest.fixture(autouse=True)
+def fast_polls():
+    with patch.object(execution_watch, "EXECUTION_POLL_MIN", 0.01), \
+            patch.object(execution_watch, "EXECUTION_POLL_MAX", 0.02):
+        yield
+
+
+class TestExecutionWatchers:
+
+    async def test_waiters_share_one_poller(self):
+        engine = ScriptedEngine(running_polls=3)
+
+        results = await asyncio.gather(*(engine.wait_for_execution("run-1", timeout=2) for _ in range(25)))
+
+        assert all(r.status == ExecutionStatus.SUCCEEDED for r in results)
+        assert engine.polls == 4
+        assert execution_watchers.stats()["active"] == 0
+
+    async def test_timeout_returns_latest_status(self):
+        engine = ScriptedEngine(running_polls=10_000)
+
+        result = await engine.wait_for_execution("run-2", timeout=0.1)
+
+        assert result.status == ExecutionStatus.RUNNING
+        await asyncio.sleep(0.05)
+        # The last waiter left, so polling stopped
+        polls = engine.polls
+        await asyncio.sleep(0.05)
+        assert engine.polls == polls
+
+    async def test_missing_execution(self):
+        assert await ScriptedEngine().wait_for_execution("missing", timeout=1) is None
+
+    async def test_polling_error_is_raised_to_waiters(self):
+        engine = ScriptedEngine(running_polls=10_000)
+
+        with pytest.raises(httpx.ConnectError):
+            await engine.wait_for_execution("broken-1", timeout=0.1)
+
+    async def test_updates_yield_each_change(self):
+        engine = ScriptedEngine(running_polls=2)
+        seen = [e.status async for e in execution_watchers.updates(engine, "run-3", timeout=2)]
+        assert seen == [ExecutionStatus.RUNNING, ExecutionStatus.SUCCEEDED]
+
+
+class TestExecutionEndpoints:
+
+    @pytest.fixture
+    def client(self):
+        from main import app
+
+        bind = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        for model in (Workspace, Workflow):
+            model.__table__.create(bind)
+        factory = sessionmaker(bind=bind)
+        db = factory()
+        mine = Workspace(id=uuid.uuid4(), name="Mine", owner_id="u", tenant_id="default")
+        theirs = Workspace(id=uuid.uuid4(), name="Theirs", owner_id="other", tenant_id="default")
+        db.add_all([mine, theirs])
+        db.add(Workflow(workspace_id=mine.id, name="f1", engine_flow_id="flow-1", created_by="u", tenant_id="default"))
+        db.add(Workflow(workspace_id=theirs.id, name="f2", engine_flow_id="flow-other", created_by="other", tenant_id="default"))
+        db.commit()
+        db.close()
+
+        def get_db():
+            session = factory()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        engine = ScriptedEngine(running_polls=1)
+        app.dependency_overrides[database.get_db] = get_db
+        try:
+            with patch("routers.workflows.verify_request_token", return_value={"uid": "u", "email": "u@bronn.dev"}), \
+                    patch("routers.workflows.get_workflow_engine", lambda: engine):
+                yield TestClient(app)
+        finally:
+            app.dependency_overrides.clear()
+
+    def test_long_poll(self, client):
+        response = client.get("/api/workflows/executions/run-4/wait", headers={"Authorization": "Bearer t"})
+
+        assert response.status_code == 200
+        assert response.json()["done"] is True
+        assert response.json()["execution"]["status"] == "succeeded"
+
+    def test_long_poll_missing(self, client):
+        response = client.get("/api/workflows/executions/missing/wait", headers={"Authorization": "Bearer t"})
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("path", ["wait", "events"])
+    def test_other_tenants_execution_is_not_found(self, client, path):
+        response = client.get(f"/api/workflows/executions/foreign-1/{path}", headers={"Authorization": "Bearer t"})
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("execution_id,status_code", [("broken-1", 502), ("slow-1", 504)])
+    def test_upstream_failure_is_not_a_404(self, client, execution_id, status_code):
+        response = client.get(
+            f"/api/workflows/executions/{execution_id}/wait",
+            params={"timeout": 0.1},
+            headers={"Authorization": "Bearer t"},
+        )
+        assert response.status_code == status_code
+
+    def test_event_stream(self, client):
+        response = client.get("/api/workflows/executions/run-5/events", headers={"Authorization": "Bearer t"})
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line for line in response.text.splitlines() if line.startswith("event:")]
+        assert events == ["event: status", "event: status", "event: end"]
+        assert '"done":true' in response.text
+
+    def test_event_stream_reports_upstream_failure(self, client):
+        response = client.get(
+            "/api/workflows/executions/broken-2/events",
+            params={"timeout": 0.1},
+            headers={"Authorization": "Bearer t"},
+        )
+
+        events = [line for line in response.text.splitlines() if line.startswith("event:")]
+        assert events == ["event: status", "event: error", "event: end"]
+        assert '"status_code":502' in response.text
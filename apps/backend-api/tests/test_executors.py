@@ -0,0 +1,85 @@
+"""
+Unit Tests for the Bounded Executor Layer
+
+Checks that blocking work runs off the event loop, that pools shed load
+once full, and that loop latency stays flat under concurrent blocking calls.
+"""
+
+import asyncio
+import time
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executors import BoundedExecutor, ExecutorSaturated
+
+
+def slow_login(delay: float = 0.05) -> str:
+    """Stand-in for a blocking Firebase verify + RSA sign."""
+    time.sleep(delay)
+    return "ok"
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Return the worst observed delay of a periodic loop tick."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+class TestBoundedExecutor:
+
+    async def test_runs_function_and_records_metrics(self):
+        executor = BoundedExecutor("test", max_workers=2, max_pending=10)
+        try:
+            assert await executor.run(slow_login, 0.01) == "ok"
+            stats = executor.stats()
+            assert stats["completed"] == 1
+            assert stats["pending"] == 0
+        finally:
+            executor.shutdown()
+
+    async def test_exceptions_propagate(self):
+        executor = BoundedExecutor("test", max_workers=1, max_pending=10)
+
+        def boom():
+            raise ValueError("boom")
+
+        try:
+            with pytest.raises(ValueError):
+                await executor.run(boom)
+            assert executor.stats()["failed"] == 1
+        finally:
+            executor.shutdown()
+
+    async def test_rejects_when_saturated(self):
+        executor = BoundedExecutor("test", max_workers=1, max_pending=2)
+        try:
+            results = await asyncio.gather(
+                *[executor.run(slow_login, 0.05) for _ in range(5)],
+                return_exceptions=True
+            )
+            rejected = [r for r in results if isinstance(r, ExecutorSaturated)]
+            assert len(rejected) == 3
+            assert executor.stats()["rejected"] == 3
+        finally:
+            executor.shutdown()
+
+    async def test_event_loop_latency_stays_flat_under_concurrent_logins(self):
+        executor = BoundedExecutor("test", max_workers=8, max_pending=100)
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop))
+        try:
+            await asyncio.gather(*[executor.run(slow_login, 0.05) for _ in range(32)])
+        finally:
+            stop.set()
+            executor.shutdown()
+
+        worst_lag = await lag_task
+        # Calling slow_login inline 32 times would block the loop for ~1.6s
+        assert worst_lag < 0.05
@@ -0,0 +1,119 @@
+"""
+Tests for the Fake Activepieces Server
+
+Drives ActivepiecesAdapter and activepieces_sync against the in-process
+fake (over httpx.ASGITransport), including injected latency, errors and
+payload padding.
+"""
+
+import time
+import httpx
+import pytest
+from unittest.mock import patch
+from jose import jwt
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_clients
+from auth import activepieces_sync
+from benchmarks.fake_activepieces import FakeActivepieces, Faults
+from http_clients import UpstreamClient
+from workflow_engine import ActivepiecesAdapter, ExecutionStatus
+from workflow_engine import execution_watch
+
+
+@pytest.fixture
+def fake():
+    server = FakeActivepieces(flows=25, runs_per_flow=2, faults=Faults(run_duration_ms=50))
+    http_clients._clients.pop("activepieces", None)
+    with patch.object(
+        UpstreamClient, "_new_client",
+        lambda self: httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app))
+    ):
+        yield server
+    http_clients._clients.pop("activepieces", None)
+
+
+def adapter() -> ActivepiecesAdapter:
+    engine = ActivepiecesAdapter(api_token="t")
+    engine.base_url = "http://ap/v1"
+    return engine
+
+
+class TestFakeActivepieces:
+
+    async def test_adapter_pages_through_flows(self, fake):
+        flows = [f async for f in adapter().iter_workflows("proj-1", page_size=10)]
+
+        assert len(flows) == 25
+        assert len({f.id for f in flows}) == 25
+        assert fake.requests["GET /v1/flows"] == 3
+
+    async def test_created_run_finishes(self, fake):
+        engine = adapter()
+        flow = next(iter(fake.flows))
+
+        run = await engine.execute_workflow(flow, {"a": 1})
+        assert run.status == ExecutionStatus.RUNNING
+        with patch.object(execution_watch, "EXECUTION_POLL_MIN", 0.02):
+            done = await engine.wait_for_execution(run.id, timeout=2)
+
+        assert done.status == ExecutionStatus.SUCCEEDED
+
+    async def test_concurrent_reads(self, fake):
+        fake.faults = Faults(latency_ms=5)
+        ids = list(fake.flows) * 4
+
+        results = await adapter().get_workflows(ids)
+
+        assert all(r.ok for r in results)
+        assert [r.value.id for r in results] == ids
+
+    async def test_projects_by_external_id(self, fake):
+        fake.project_external_id = "ws-1"
+
+        assert await adapter().list_project_ids("ws-1") == ["proj-1"]
+        assert await adapter().list_project_ids("ws-2") == []
+
+    async def test_delete_without_body(self, fake):
+        flow = next(iter(fake.flows))
+
+        assert await adapter().delete_workflow(flow) is True
+        assert flow not in fake.flows
+
+    async def test_injected_latency_and_errors(self, fake):
+        engine = adapter()
+        flow = next(iter(fake.flows))
+
+        fake.faults = Faults(latency_ms=50)
+        start = time.perf_counter()
+        await engine.get_workflow(flow)
+        assert time.perf_counter() - start >= 0.05
+
+        fake.faults = Faults(error_rate=1.0, error_status=500)
+        with pytest.raises(httpx.HTTPStatusError):
+            await engine.get_workflow(flow)
+        assert fake.injected_errors >= 1
+
+    async def test_payload_padding_and_auth(self, fake):
+        fake.faults = Faults(payload_bytes=4096)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app), base_url="http://ap") as client:
+            padded = await client.get("/api/v1/flows", params={"limit": 1}, headers={"Authorization": "Bearer t"})
+            anonymous = await client.get("/v1/flows")
+
+        assert len(padded.json()["data"][0]["metadata"]["padding"]) == 4096
+        assert anonymous.status_code == 401
+
+    async def test_managed_auth_exchange(self, fake):
+        def external_jwt(**claims):
+            return jwt.encode({"externalUserId": claims["user_id"], "externalProjectId": claims["project_id"]},
+                              "secret", algorithm="HS256")
+
+        with patch.object(activepieces_sync, "ACTIVEPIECES_URL", "http://ap"), \
+                patch.object(activepieces_sync, "create_activepieces_jwt", external_jwt):
+            token, error = await activepieces_sync._exchange_session("u1", "proj-1", "A", "B", "EDITOR")
+
+        assert error is None
+        assert jwt.get_unverified_claims(token)["id"] == "u1"
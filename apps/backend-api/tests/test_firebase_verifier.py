@@ -0,0 +1,177 @@
+"""
+Unit Tests for Local Firebase ID Token Verification
+
+Uses a local stand-in issuer (an RSA key pair served through the injectable
+key source) instead of Google's securetoken certs.
+"""
+
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from jose import jwt, JWTError
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth.signing_key import generate_signing_key
+from auth.firebase_auth import FirebaseTokenVerifier
+
+PROJECT_ID = "bronn-test"
+
+
+@pytest.fixture(scope="module")
+def issuer():
+    """A stand-in issuer: (kid, private_pem, public_pem)."""
+    return generate_signing_key()
+
+
+@pytest.fixture
+def verifier(issuer):
+    kid, _, public_pem = issuer
+    calls = []
+
+    def key_source():
+        calls.append(1)
+        return {kid: public_pem}, 3600
+
+    v = FirebaseTokenVerifier(PROJECT_ID, key_source=key_source)
+    v.source_calls = calls
+    return v
+
+
+def make_token(issuer, kid=None, **overrides):
+    default_kid, private_pem, _ = issuer
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "firebase-uid-1",
+        "email": "user@bronn.dev",
+        "iat": now,
+        "auth_time": now,
+        "exp": now + 3600,
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid or default_kid})
+
+
+class TestFirebaseTokenVerifier:
+
+    def test_valid_token_sets_uid(self, issuer, verifier):
+        claims = verifier.verify(make_token(issuer))
+        assert claims["uid"] == "firebase-uid-1"
+        assert claims["email"] == "user@bronn.dev"
+
+    def test_keys_are_loaded_once(self, issuer, verifier):
+        for _ in range(5):
+            verifier.verify(make_token(issuer))
+        assert len(verifier.source_calls) == 1
+
+    @pytest.mark.parametrize("overrides", [
+        {"aud": "other-project"},
+        {"iss": "https://securetoken.google.com/other-project"},
+        {"exp": int(time.time()) - 3600},
+        {"sub": ""},
+        {"iat": int(time.time()) + 3600},
+    ])
+    def test_invalid_claims_are_rejected(self, issuer, verifier, overrides):
+        with pytest.raises(JWTError):
+            verifier.verify(make_token(issuer, **overrides))
+
+    def test_unknown_kid_is_rejected_without_fetching(self, issuer, verifier):
+        verifier.refresh()
+        with pytest.raises(JWTError):
+            verifier.verify(make_token(issuer, kid="unknown-kid"))
+        assert len(verifier.source_calls) == 1
+
+    def test_wrong_signer_is_rejected(self, issuer, verifier):
+        kid = issuer[0]
+        _, other_private, _ = generate_signing_key()
+        forged = jwt.encode(
+            {"aud": PROJECT_ID, "sub": "x", "exp": int(time.time()) + 60},
+            other_private, algorithm="RS256", headers={"kid": kid}
+        )
+        with pytest.raises(JWTError):
+            verifier.verify(forged)
+
+    def test_failed_refresh_keeps_previous_keys(self, issuer):
+        kid, _, public_pem = issuer
+        responses = [({kid: public_pem}, 3600)]
+
+        def flaky_source():
+            if responses:
+                return responses.pop()
+            raise RuntimeError("network down")
+
+        v = FirebaseTokenVerifier(PROJECT_ID, key_source=flaky_source)
+        assert v.refresh() is True
+        assert v.refresh() is False
+        assert v.verify(make_token(issuer))["uid"] == "firebase-uid-1"
+        assert v.stats()["refresh_failures"] == 1
+
+    def test_background_refresh_loads_keys(self, issuer, verifier):
+        verifier.start()
+        try:
+            deadline = time.time() + 5
+            while not verifier.ready and time.time() < deadline:
+                time.sleep(0.01)
+            assert verifier.ready
+        finally:
+            verifier.stop()
+
+    def test_cold_verifications_wait_for_prefetch(self, issuer):
+        kid, _, public_pem = issuer
+        calls = []
+
+        def slow_source():
+            calls.append(1)
+            time.sleep(0.2)
+            return {kid: public_pem}, 3600
+
+        v = FirebaseTokenVerifier(PROJECT_ID, key_source=slow_source)
+        v.start()
+        try:
+            with ThreadPoolExecutor(8) as pool:
+                results = list(pool.map(v.verify, [make_token(issuer)] * 8))
+        finally:
+            v.stop()
+
+        assert all(r["uid"] == "firebase-uid-1" for r in results)
+        assert len(calls) == 1
+
+    def test_cold_verifications_share_one_load_without_refresher(self, issuer):
+        kid, _, public_pem = issuer
+        calls = []
+
+        def slow_source():
+            calls.append(1)
+            time.sleep(0.2)
+            return {kid: public_pem}, 3600
+
+        v = FirebaseTokenVerifier(PROJECT_ID, key_source=slow_source)
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(v.verify, [make_token(issuer)] * 8))
+
+        assert all(r["uid"] == "firebase-uid-1" for r in results)
+        assert len(calls) == 1
+
+    def test_cold_verifications_fail_fast_while_certs_are_down(self, issuer):
+        def down():
+            raise RuntimeError("certs unavailable")
+
+        v = FirebaseTokenVerifier(PROJECT_ID, key_source=down)
+        v.start()
+        try:
+            deadline = time.time() + 5
+            while not v._cold_failed and time.time() < deadline:
+                time.sleep(0.01)
+            start = time.perf_counter()
+            for _ in range(3):
+                with pytest.raises(JWTError):
+                    v.verify(make_token(issuer))
+            elapsed = time.perf_counter() - start
+        finally:
+            v.stop()
+
+        assert elapsed < 0.5
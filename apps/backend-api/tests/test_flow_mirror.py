@@ -0,0 +1,245 @@
+"""
+Tests for the Activepieces Flow Mirror
+
+Runs syncs into an in-memory SQLite database, checking that only new or
+changed flows are written, and serves the mirrored list through the
+workflows router.
+"""
+
+import uuid
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from flow_mirror import FlowMirror, register_project
+from models import FlowSyncState, Workflow, Workspace
+from workflow_engine import WorkflowInfo, WorkflowStatus
+from workflow_engine.interface import Page, WorkflowEngine
+
+OWNER = "uid-1"
+
+
+def flow(flow_id: str, updated: str) -> WorkflowInfo:
+    return WorkflowInfo(
+        id=flow_id, name=f"Flow {flow_id}", status=WorkflowStatus.ACTIVE, project_id="proj-1",
+        created_at="2026-01-01T00:00:00.000Z", updated_at=updated,
+        definition={"id": flow_id, "updated": updated},
+    )
+
+
+class FakeEngine(WorkflowEngine):
+    """Serves `flows` two per page."""
+
+    create_workflow = get_workflow = update_workflow_status = None
+    delete_workflow = execute_workflow = get_execution_status = list_executions = None
+
+    def __init__(self, flows, projects=None):
+        self.flows = flows
+        self.projects = projects or {}
+
+    async def list_project_ids(self, external_id):
+        return self.projects.get(external_id, [])
+
+    async def list_workflows(self, project_id, folder_id=None, limit=50, cursor=None):
+        return (await self.list_workflows_page(project_id, folder_id, limit, cursor)).items
+
+    async def list_workflows_page(self, project_id, folder_id=None, limit=50, cursor=None):
+        start = int(cursor or 0)
+        return Page(self.flows[start:start + 2], str(start + 2) if start + 2 < len(self.flows) else None)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    for model in (Workspace, Workflow, FlowSyncState):
+        model.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def workspace(session_factory):
+    db = session_factory()
+    ws = Workspace(id=uuid.uuid4(), name="Ops", owner_id=OWNER, tenant_id="default")
+    db.add(ws)
+    db.commit()
+    register_project(db, "proj-1", ws.id, OWNER, "default")
+    db.close()
+    return ws
+
+
+def mirrored(session_factory):
+    db = session_factory()
+    try:
+        return {w.engine_flow_id: w.definition_json["updated"] for w in db.query(Workflow).all()}
+    finally:
+        db.close()
+
+
+class TestFlowMirror:
+
+    async def test_incremental_sync(self, session_factory, workspace):
+        flows = [flow("a", "2026-01-01T00:00:01Z"), flow("b", "2026-01-01T00:00:02Z"), flow("c", "2026-01-01T00:00:03Z")]
+        engine = FakeEngine(flows)
+        mirror = FlowMirror(session_factory=session_factory, engine_factory=lambda: engine)
+
+        first = await mirror.sync_project("proj-1")
+        assert first == {"scanned": 3, "written": 3, "deleted": 0}
+
+        engine.flows = [flows[0], flow("b", "2026-02-01T00:00:00Z"), flows[2]]
+        second = await mirror.sync_project("proj-1")
+
+        assert second["written"] == 1
+        assert mirrored(session_factory)["b"] == "2026-02-01T00:00:00Z"
+        db = session_factory()
+        assert db.get(FlowSyncState, "proj-1").high_water_mark == "2026-02-01T00:00:00Z"
+        db.close()
+
+    async def test_edit_missed_mid_walk_is_picked_up(self, session_factory, workspace):
+        a, b = flow("a", "2026-01-01T00:00:01Z"), flow("b", "2026-01-01T00:00:01Z")
+        engine = FakeEngine([a, b])
+        mirror = FlowMirror(session_factory=session_factory, engine_factory=lambda: engine)
+        await mirror.sync_project("proj-1")
+
+        # The walk already read `a` (T1) when it was edited at T2; `b` was
+        # edited at T3 before the walk reached it
+        engine.flows = [a, flow("b", "2026-01-01T00:00:03Z")]
+        await mirror.sync_project("proj-1")
+        engine.flows = [flow("a", "2026-01-01T00:00:02Z"), engine.flows[1]]
+        result = await mirror.sync_project("proj-1")
+
+        assert result["written"] == 1
+        assert mirrored(session_factory)["a"] == "2026-01-01T00:00:02Z"
+
+    async def test_flow_at_the_mark_is_written(self, session_factory, workspace):
+        engine = FakeEngine([flow("a", "2026-01-01T00:00:05Z")])
+        mirror = FlowMirror(session_factory=session_factory, engine_factory=lambda: engine)
+        await mirror.sync_project("proj-1")
+
+        engine.flows.append(flow("b", "2026-01-01T00:00:05Z"))
+        result = await mirror.sync_project("proj-1")
+
+        assert result["written"] == 1
+        assert set(mirrored(session_factory)) == {"a", "b"}
+
+    async def test_deleted_flows_are_removed(self, session_factory, workspace):
+        engine = FakeEngine([flow("a", "2026-01-01T00:00:01Z"), flow("b", "2026-01-01T00:00:02Z")])
+        mirror = FlowMirror(session_factory=session_factory, engine_factory=lambda: engine)
+        await mirror.sync_project("proj-1")
+
+        engine.flows = engine.flows[:1]
+        result = await mirror.sync_project("proj-1")
+
+        assert result == {"scanned": 1, "written": 0, "deleted": 1}
+        assert list(mirrored(session_factory)) == ["a"]
+
+    async def test_listeners_run_after_writes(self, session_factory, workspace):
+        engine = FakeEngine([flow("a", "2026-01-01T00:00:01Z")])
+        mirror = FlowMirror(session_factory=session_factory, engine_factory=lambda: engine)
+        calls = []
+        mirror.add_listener(lambda: calls.append(1))
+
+        await mirror.sync_project("proj-1")
+        await mirror.sync_project("proj-1")
+
+        # The second sync wrote nothing
+        assert calls == [1]
+
+    async def test_unregistered_project_is_ignored(self, session_factory):
+        mirror = FlowMirror(session_factory=session_factory, engine_factory=lambda: FakeEngine([]))
+        assert (await mirror.sync_project("nope"))["scanned"] == 0
+
+
+class TestMirroredFlowsEndpoint:
+
+    async def test_list_is_served_from_database(self, session_factory, workspace):
+        engine = FakeEngine([flow("a", "2026-01-01T00:00:01Z")])
+        await FlowMirror(session_factory=session_factory, engine_factory=lambda: engine).sync_project("proj-1")
+
+        from main import app
+
+        def get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[database.get_db] = get_db
+        try:
+            with patch("routers.workflows.verify_request_token", return_value={"uid": OWNER, "email": "a@bronn.dev"}):
+                client = TestClient(app)
+                ok = client.get("/api/workflows/mirror/projects/proj-1/flows", headers={"Authorization": "Bearer t"})
+                missing = client.get("/api/workflows/mirror/projects/proj-2/flows", headers={"Authorization": "Bearer t"})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert ok.status_code == 200
+        assert [f["id"] for f in ok.json()["data"]] == ["a"]
+        assert missing.status_code == 404
+
+
+class TestMirrorProjectEndpoint:
+
+    @pytest.fixture
+    def client(self, session_factory):
+        from main import app
+
+        db = session_factory()
+        mine = Workspace(id=uuid.uuid4(), name="Mine", owner_id=OWNER, tenant_id="default")
+        db.add(mine)
+        db.commit()
+        db.refresh(mine)
+        db.close()
+
+        def get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        engine = FakeEngine([], projects={str(mine.id): ["proj-mine"], "someone-else": ["proj-theirs"]})
+        app.dependency_overrides[database.get_db] = get_db
+        try:
+            with patch("routers.workflows.verify_request_token", return_value={"uid": OWNER, "email": "a@bronn.dev"}), \
+                    patch("routers.workflows.get_workflow_engine", lambda: engine), \
+                    patch("routers.workflows.flow_mirror") as mirror:
+                yield TestClient(app), str(mine.id), mirror
+        finally:
+            app.dependency_overrides.clear()
+
+    def test_registers_workspace_project(self, client, session_factory):
+        client, workspace_id, mirror = client
+        response = client.post(
+            "/api/workflows/mirror/projects",
+            json={"project_id": "proj-mine", "workspace_id": workspace_id},
+            headers={"Authorization": "Bearer t"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["project_id"] == "proj-mine"
+        mirror.sync_project.assert_called_once_with("proj-mine")
+
+    def test_rejects_other_tenants_project(self, client, session_factory):
+        client, workspace_id, mirror = client
+        response = client.post(
+            "/api/workflows/mirror/projects",
+            json={"project_id": "proj-theirs", "workspace_id": workspace_id},
+            headers={"Authorization": "Bearer t"},
+        )
+
+        assert response.status_code == 403
+        assert not mirror.sync_project.called
+        db = session_factory()
+        try:
+            assert db.get(FlowSyncState, "proj-theirs") is None
+        finally:
+            db.close()
@@ -0,0 +1,117 @@
+"""
+Unit Tests for the Shared Outbound HTTP Clients
+
+Tests connection reuse, per-route timeouts and metrics in http_clients.
+"""
+
+import asyncio
+import threading
+import httpx
+import pytest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_clients
+from http_clients import UpstreamClient, route_timeout
+
+
+@pytest.fixture
+def upstream():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.path == "/fail":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    client = UpstreamClient("test")
+    client.seen = seen
+    with patch.object(
+        UpstreamClient, "_new_client",
+        lambda self: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    ):
+        yield client
+
+
+class TestUpstreamClient:
+
+    async def test_reuses_one_client(self, upstream):
+        first = upstream.client
+        await upstream.request("GET", "http://ap/a", route="proxy")
+        await upstream.request("GET", "http://ap/b", route="proxy")
+
+        assert upstream.client is first
+        assert upstream.stats()["requests"] == 2
+        await upstream.aclose()
+
+    async def test_route_timeout_is_applied(self, upstream):
+        with patch.dict(http_clients.ROUTE_TIMEOUTS, {"managed_auth": 2.5}):
+            await upstream.request("POST", "http://ap/x", route="managed_auth")
+
+        timeout = upstream.seen[0].extensions["timeout"]
+        assert timeout["read"] == 2.5
+        assert timeout["connect"] == 2.5
+        await upstream.aclose()
+
+    async def test_explicit_timeout_wins(self, upstream):
+        await upstream.request("GET", "http://ap/x", route="proxy", timeout=1.0)
+        assert upstream.seen[0].extensions["timeout"]["read"] == 1.0
+        await upstream.aclose()
+
+    async def test_errors_are_counted(self, upstream):
+        with pytest.raises(httpx.ConnectError):
+            await upstream.request("GET", "http://ap/fail", route="proxy")
+        stats = upstream.stats()
+        assert stats["errors"] == 1
+        assert stats["inflight"] == 0
+        await upstream.aclose()
+
+    def test_new_event_loop_gets_new_client(self, upstream):
+        async def current():
+            return upstream.client, upstream.stats()["clients"]
+
+        first, _ = asyncio.run(current())
+        second, clients = asyncio.run(current())
+        assert first is not second
+        # The first loop is closed: its client was dropped, not kept alive
+        assert clients == 1
+
+    async def test_live_loops_keep_their_clients(self, upstream):
+        other = asyncio.new_event_loop()
+        thread = threading.Thread(target=other.run_forever, daemon=True)
+        thread.start()
+        try:
+            async def current():
+                return upstream.client
+
+            theirs = asyncio.run_coroutine_threadsafe(current(), other).result(5)
+            mine = upstream.client
+
+            assert mine is not theirs and not theirs.is_closed
+            assert upstream.stats()["clients"] == 2
+
+            await upstream.aclose()
+            for _ in range(50):
+                if theirs.is_closed:
+                    break
+                await asyncio.sleep(0.01)
+            assert mine.is_closed and theirs.is_closed
+        finally:
+            other.call_soon_threadsafe(other.stop)
+            thread.join(5)
+            other.close()
+
+
+class TestRouteTimeouts:
+
+    def test_connect_timeout_is_capped(self):
+        timeout = route_timeout("proxy")
+        assert timeout.connect == http_clients.HTTP_CONNECT_TIMEOUT
+        assert timeout.read == http_clients.ROUTE_TIMEOUTS["proxy"]
+
+    def test_unknown_route_uses_default(self):
+        assert route_timeout("nope").read == http_clients.DEFAULT_TIMEOUT
@@ -0,0 +1,90 @@
+"""
+Unit Tests for JWKS Publication
+
+Tests the JWKS document built by SigningKeyManager and the cacheable
+/api/workflows/engine/jwks.json endpoint.
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+from jose import jwk, jwt
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import signing_key
+from auth.signing_key import SigningKeyManager, create_activepieces_jwt
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = SigningKeyManager(tmp_path, check_interval=0)
+    with patch.object(signing_key, "_key_manager", manager):
+        yield manager
+
+
+class TestJWKSDocument:
+
+    def test_lists_all_active_kids(self, manager):
+        old = manager.current()
+        new = manager.rotate()
+
+        body, _ = manager.jwks()
+        keys = json.loads(body)["keys"]
+
+        assert [k["kid"] for k in keys] == [new.key_id, old.key_id]
+        assert all(k["kty"] == "RSA" and k["alg"] == "RS256" and k["use"] == "sig" for k in keys)
+
+    def test_jwk_verifies_minted_tokens(self, manager):
+        token = create_activepieces_jwt(user_id="u1", project_id="p1")
+        kid = jwt.get_unverified_header(token)["kid"]
+        entry = next(k for k in json.loads(manager.jwks()[0])["keys"] if k["kid"] == kid)
+
+        claims = jwt.decode(token, jwk.construct(entry, "RS256"), algorithms=["RS256"])
+        assert claims["externalUserId"] == "u1"
+
+    def test_built_once_per_key_set(self, manager):
+        first = manager.jwks()
+        with patch.object(signing_key, "public_jwk", side_effect=AssertionError("rebuilt")):
+            assert manager.jwks() is not None
+        assert manager.jwks() == first
+
+        manager.rotate()
+        assert manager.jwks()[1] != first[1]
+
+    def test_identical_across_instances(self, manager, tmp_path):
+        manager.current()
+        other = SigningKeyManager(tmp_path, check_interval=0)
+        assert other.jwks() == manager.jwks()
+
+
+class TestJWKSEndpoint:
+
+    @pytest.fixture
+    def client(self, manager):
+        from main import app
+        return TestClient(app)
+
+    def test_caching_headers_and_304(self, client):
+        response = client.get("/api/workflows/engine/jwks.json")
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("public, max-age=")
+        etag = response.headers["etag"]
+        assert etag.startswith('"')
+        assert response.json()["keys"]
+
+        revalidated = client.get("/api/workflows/engine/jwks.json", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+    def test_public_key_is_cacheable(self, client):
+        response = client.get("/api/workflows/engine/public-key")
+        assert "BEGIN PUBLIC KEY" in response.json()["publicKey"]
+
+        revalidated = client.get(
+            "/api/workflows/engine/public-key", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
@@ -0,0 +1,181 @@
+"""
+Tests for Proxy Response Revalidation
+
+Checks ETag/304 answers on the flows proxy and the catch-all engine proxy,
+conditional requests to Activepieces, and invalidation on mutations.
+"""
+
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_clients
+from http_clients import UpstreamClient
+from proxy_cache import ProxyCache, etag_matches, strong_etag
+from routers import activepieces, flows_proxy
+
+
+def streamed(status_code: int, body: bytes = b"", **headers) -> httpx.Response:
+    # A real upstream body arrives as a stream; bytes content would be pre-read
+    async def stream():
+        yield body
+    return httpx.Response(status_code, content=stream(), headers=headers)
+
+
+class FakeActivepieces:
+    """Serves versioned JSON with an upstream ETag and honours If-None-Match."""
+
+    def __init__(self):
+        self.version = 1
+        self.requests = []
+
+    def etag(self) -> str:
+        return f'"v{self.version}"'
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.method != "GET":
+            self.version += 1
+            return streamed(200, b'{"ok": true}', **{"content-type": "application/json"})
+        if request.headers.get("if-none-match") == self.etag():
+            return streamed(304, etag=self.etag())
+        body = json.dumps({"path": request.url.path, "version": self.version}).encode()
+        return streamed(200, body, **{
+            "content-type": "application/json",
+            "content-length": str(len(body)),
+            "etag": self.etag(),
+        })
+
+
+@pytest.fixture
+def upstream():
+    return FakeActivepieces()
+
+
+@pytest.fixture
+def client(upstream):
+    http_clients._clients.pop("activepieces", None)
+    flows_proxy._flows_cache.clear()
+    activepieces._proxy_cache.clear()
+    with patch.object(
+        UpstreamClient, "_new_client",
+        lambda self: httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    ), patch.object(activepieces, "ACTIVEPIECES_URL", "http://ap"), \
+            patch.object(flows_proxy, "ACTIVEPIECES_URL", "http://ap"), \
+            patch.object(flows_proxy, "ACTIVEPIECES_API_KEY", "ap-key"):
+        from main import app
+        yield TestClient(app)
+    http_clients._clients.pop("activepieces", None)
+
+
+class TestProxyCache:
+
+    def test_etag_matching(self):
+        assert etag_matches({"if-none-match": 'W/"a", "b"'}, '"a"')
+        assert etag_matches({"if-none-match": "*"}, '"a"')
+        assert not etag_matches({}, '"a"')
+
+    def test_invalidate_drops_the_collection_only(self):
+        cache = ProxyCache(maxsize=10)
+        cache.store("a", "/flows?projectId=p", b"1", {})
+        cache.store("b", "/flows/f1", b"2", {})
+        cache.store("c", "/flow-runs/r1", b"3", {})
+
+        assert cache.invalidate("flows/f1/test") == 2
+        assert cache.lookup("c") is not None
+
+    def test_bounded_by_total_bytes(self):
+        cache = ProxyCache(maxsize=100, max_bytes=10)
+        cache.store("a", "/flows/a", b"1234", {})
+        cache.store("b", "/flows/b", b"1234", {})
+        cache.lookup("a")
+        cache.store("c", "/flows/c", b"1234", {})
+
+        # "b" was least recently used
+        assert cache.lookup("b") is None
+        assert cache.lookup("a") is not None and cache.lookup("c") is not None
+        assert cache.nbytes == 8
+
+        cache.store("a", "/flows/a", b"12", {})
+        cache.invalidate("flows")
+        assert len(cache) == 0 and cache.nbytes == 0
+
+    def test_large_bodies_are_not_kept(self):
+        cache = ProxyCache(maxsize=10)
+        with patch("proxy_cache.PROXY_CACHE_MAX_BODY", 4):
+            entry = cache.store("a", "/flows", b"too large", {})
+        assert entry.etag == strong_etag(b"too large")
+        assert len(cache) == 0
+
+
+class TestFlowsProxyRevalidation:
+
+    def test_client_etag_gets_304(self, client):
+        first = client.get("/api/flows-proxy/flows/f1")
+        etag = first.headers["etag"]
+
+        second = client.get("/api/flows-proxy/flows/f1", headers={"If-None-Match": etag})
+
+        assert first.json()["version"] == 1
+        assert second.status_code == 304
+        assert second.content == b""
+
+    def test_upstream_is_asked_conditionally(self, client, upstream):
+        client.get("/api/flows-proxy/flows/f1")
+        before = flows_proxy._flows_cache.revalidated
+        second = client.get("/api/flows-proxy/flows/f1")
+
+        assert upstream.requests[-1].headers["if-none-match"] == '"v1"'
+        assert flows_proxy._flows_cache.revalidated == before + 1
+        assert second.json()["version"] == 1
+
+    def test_mutation_invalidates(self, client, upstream):
+        etag = client.get("/api/flows-proxy/flow-runs/r1").headers["etag"]
+        client.post("/api/flows-proxy/flows/f1/run", json={})
+
+        response = client.get("/api/flows-proxy/flow-runs/r1", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        assert "if-none-match" not in upstream.requests[-1].headers
+
+
+class TestEngineProxyRevalidation:
+
+    def test_client_etag_gets_304(self, client, upstream):
+        etag = client.get("/api/workflows/engine/flows/f1").headers["etag"]
+
+        response = client.get("/api/workflows/engine/flows/f1", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        # The client's validator is ours, not Activepieces'
+        assert upstream.requests[-1].headers["if-none-match"] == '"v1"'
+
+    def test_uncacheable_collections_are_streamed(self, client, upstream):
+        response = client.get("/api/workflows/engine/flow-runs/r1", headers={"If-None-Match": '"v1"'})
+
+        # Passed through untouched: upstream's own 304 and validator
+        assert response.status_code == 304
+        assert upstream.requests[-1].headers["if-none-match"] == '"v1"'
+        assert len(activepieces._proxy_cache) == 0
+
+    def test_callers_do_not_share_entries(self, client, upstream):
+        client.get("/api/workflows/engine/flows/f1", headers={"Authorization": "Bearer a"})
+        client.get("/api/workflows/engine/flows/f1", headers={"Authorization": "Bearer b"})
+
+        assert "if-none-match" not in upstream.requests[-1].headers
+
+    def test_mutation_invalidates(self, client):
+        etag = client.get("/api/workflows/engine/flows/f1").headers["etag"]
+        client.post("/api/workflows/engine/flows/f1/test", json={})
+
+        response = client.get("/api/workflows/engine/flows/f1", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
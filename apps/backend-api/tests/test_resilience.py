@@ -0,0 +1,174 @@
+"""
+Unit Tests for Outbound Call Resilience
+
+Tests the circuit breaker, retry budget, bulkhead and adaptive timeouts,
+alone and as applied by UpstreamClient.
+"""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resilience
+import http_clients
+from http_clients import UpstreamClient
+from resilience import Bulkhead, CircuitBreaker, LatencyTracker, RetryBudget, UpstreamUnavailable
+
+
+@pytest.fixture
+def upstream():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        path = request.url.path
+        if path == "/down":
+            raise httpx.ConnectError("refused", request=request)
+        if path == "/flaky" and len(calls) == 1:
+            return httpx.Response(503)
+        if path == "/slow":
+            await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"path": path})
+
+    client = UpstreamClient("test")
+    client.calls = calls
+    with patch.object(
+        UpstreamClient, "_new_client",
+        lambda self: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    ), patch.object(resilience, "RETRY_BACKOFF_BASE", 0.001):
+        yield client
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_probes_once(self):
+        breaker = CircuitBreaker("t", threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.state == breaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == breaker.OPEN
+
+        # reset_timeout elapsed: a single half-open probe is let through
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == breaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("t", threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        assert not breaker.allow()
+        breaker.opened_at -= 60
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == breaker.OPEN
+        assert breaker.retry_after() > 0
+
+
+class TestRetryBudget:
+
+    def test_retries_are_a_fraction_of_traffic(self):
+        budget = RetryBudget(ratio=0.5, minimum=1)
+        assert budget.withdraw()
+        assert not budget.withdraw()
+        budget.deposit()
+        budget.deposit()
+        assert budget.withdraw()
+
+
+class TestBulkhead:
+
+    def test_rejects_beyond_limit(self):
+        bulkhead = Bulkhead("t", limit=1)
+        assert bulkhead.acquire()
+        assert not bulkhead.acquire()
+        bulkhead.release()
+        assert bulkhead.acquire()
+
+
+class TestLatencyTracker:
+
+    def test_timeout_follows_p99_within_bounds(self):
+        tracker = LatencyTracker()
+        assert tracker.timeout(30) == 30
+        for _ in range(100):
+            tracker.record(1.0)
+        assert tracker.timeout(30) == 1.0 * resilience.ADAPTIVE_TIMEOUT_FACTOR
+        assert tracker.timeout(2.5) == 2.5
+
+    def test_window_slides_in_sorted_order(self):
+        tracker = LatencyTracker(window=3)
+        for seconds in (5.0, 1.0, 3.0, 2.0):
+            tracker.record(seconds)
+
+        assert tracker.stats()["samples"] == 3
+        assert tracker.percentile(0.1) == 1.0
+        assert tracker.percentile(100) == 3.0
+
+
+class TestUpstreamClientResilience:
+
+    async def test_get_is_retried_on_503(self, upstream):
+        response = await upstream.request("GET", "http://ap/flaky", route="engine")
+
+        assert response.status_code == 200
+        assert len(upstream.calls) == 2
+        assert upstream.retry_budget.retries == 1
+        await upstream.aclose()
+
+    async def test_post_is_not_retried(self, upstream):
+        response = await upstream.request("POST", "http://ap/flaky", route="engine")
+
+        assert response.status_code == 503
+        assert len(upstream.calls) == 1
+        await upstream.aclose()
+
+    async def test_open_circuit_fails_fast(self, upstream):
+        for _ in range(resilience.CB_FAILURE_THRESHOLD):
+            with pytest.raises(httpx.ConnectError):
+                await upstream.request("POST", "http://ap/down", route="engine")
+        sent = len(upstream.calls)
+
+        with pytest.raises(UpstreamUnavailable) as raised:
+            await upstream.request("GET", "http://ap/ok", route="engine")
+
+        assert len(upstream.calls) == sent
+        assert raised.value.retry_after > 0
+        # Other routes are unaffected
+        assert (await upstream.request("GET", "http://ap/ok", route="flows")).status_code == 200
+        assert upstream.stats()["routes"]["engine"]["breaker"]["state"] == "open"
+        await upstream.aclose()
+
+    async def test_bulkhead_caps_concurrency_per_route(self, upstream):
+        with patch.dict(resilience.BULKHEAD_LIMITS, {"mcp": 2}):
+            results = await asyncio.gather(
+                *(upstream.request("GET", "http://ap/slow", route="mcp") for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        assert sum(isinstance(r, UpstreamUnavailable) for r in results) == 1
+        assert upstream.bulkhead("mcp").active == 0
+        await upstream.aclose()
+
+    async def test_timeout_adapts_to_latency(self, upstream):
+        for _ in range(resilience.ADAPTIVE_MIN_SAMPLES):
+            upstream.latency("engine").record(0.01)
+
+        await upstream.request("GET", "http://ap/ok", route="engine")
+
+        assert upstream.calls[0].extensions["timeout"]["read"] == resilience.ADAPTIVE_TIMEOUT_FLOOR
+        await upstream.aclose()
+
+    async def test_proxy_route_keeps_configured_timeout(self, upstream):
+        for _ in range(resilience.ADAPTIVE_MIN_SAMPLES):
+            upstream.latency("proxy").record(0.01)
+
+        await upstream.request("GET", "http://ap/ok", route="proxy")
+
+        assert upstream.calls[0].extensions["timeout"]["read"] == http_clients.route_timeout("proxy").read
+        await upstream.aclose()
@@ -0,0 +1,186 @@
+"""
+Tests for Activepieces Run Event Ingestion
+
+Buffers run events, flushes them as upserts into an in-memory SQLite
+database, and checks the signed webhook endpoint.
+"""
+
+import json
+import uuid
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import run_events
+from run_events import RunEventBuffer, sign_payload
+from models import Workflow, WorkflowRun, Workspace
+
+SECRET = "test-secret"
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    for model in (Workspace, Workflow, WorkflowRun):
+        model.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    ws = Workspace(id=uuid.uuid4(), name="Ops", owner_id="uid-1", tenant_id="default")
+    db.add(ws)
+    db.add(Workflow(id=uuid.uuid4(), workspace_id=ws.id, name="Flow", created_by="uid-1",
+                    engine_flow_id="flow-1", tenant_id="default"))
+    db.commit()
+    db.close()
+    return factory
+
+
+def started(run_id, at="2026-10-17T10:00:00Z"):
+    return {"type": "run.started", "run_id": run_id, "flow_id": "flow-1", "status": "RUNNING", "started_at": at}
+
+
+def finished(run_id, status="SUCCEEDED", at="2026-10-17T10:00:05Z", error=None):
+    return {"type": "run.finished", "run_id": run_id, "flow_id": "flow-1", "status": status,
+            "finished_at": at, "error": error}
+
+
+def runs(session_factory):
+    db = session_factory()
+    try:
+        return {r.engine_run_id: r for r in db.query(WorkflowRun).all()}
+    finally:
+        db.close()
+
+
+class TestRunEventBuffer:
+
+    def test_events_merge_into_one_row(self, session_factory):
+        buffer = RunEventBuffer(session_factory=session_factory)
+        buffer.add([started("r1"), finished("r1")])
+
+        assert buffer.flush() == 1
+        run = runs(session_factory)["r1"]
+        assert run.status == "success"
+        assert run.started_at.isoformat() == "2026-10-17T10:00:00"
+        assert run.finished_at.isoformat() == "2026-10-17T10:00:05"
+
+    def test_upsert_is_idempotent_and_order_independent(self, session_factory):
+        buffer = RunEventBuffer(session_factory=session_factory)
+        # Finished arrives first; a late started and a redelivery follow
+        buffer.add([finished("r1", status="FAILED", error="boom")])
+        buffer.flush()
+        buffer.add([started("r1")])
+        buffer.flush()
+        buffer.add([finished("r1", status="FAILED", error="boom")])
+        buffer.flush()
+
+        all_runs = runs(session_factory)
+        assert list(all_runs) == ["r1"]
+        run = all_runs["r1"]
+        assert run.status == "failed"
+        assert run.error_message == "boom"
+        assert run.started_at is not None and run.finished_at is not None
+
+    def test_unmatched_runs_are_retried_after_mirror_sync(self, session_factory):
+        buffer = RunEventBuffer(session_factory=session_factory)
+        buffer.add([{**started("r2"), "flow_id": "flow-2"}])
+
+        assert buffer.flush() == 0
+        assert buffer.stats()["unmatched_parked"] == 1
+        # The run finishes before the flow is mirrored: merged while parked
+        buffer.add([{**finished("r2"), "flow_id": "flow-2"}])
+        buffer.flush()
+        assert buffer.stats()["unmatched_parked"] == 1
+
+        db = session_factory()
+        ws = db.query(Workspace).first()
+        db.add(Workflow(workspace_id=ws.id, name="Flow 2", created_by="uid-1",
+                        engine_flow_id="flow-2", tenant_id="default"))
+        db.commit()
+        db.close()
+
+        assert buffer.retry_unmatched() == 1
+        assert buffer.flush() == 1
+        run = runs(session_factory)["r2"]
+        assert run.status == "success" and run.started_at is not None
+        assert buffer.stats()["unmatched_parked"] == 0
+
+    def test_unmatched_runs_expire(self, session_factory):
+        buffer = RunEventBuffer(session_factory=session_factory, unmatched_ttl=0, max_unmatched=1)
+        buffer.add([{**started("a"), "flow_id": "x"}, {**started("b"), "flow_id": "x"}])
+        buffer.flush()
+
+        # Over max_unmatched: the oldest went first; the other expires
+        assert buffer.stats()["unmatched_parked"] == 1
+        assert buffer.retry_unmatched() == 0
+        assert buffer.stats()["unmatched_dropped"] == 2
+
+    def test_full_buffer_refuses_delivery(self, session_factory):
+        buffer = RunEventBuffer(session_factory=session_factory, max_pending=2)
+
+        assert buffer.add([started("a"), started("b")])
+        assert buffer.add([finished("a")])  # Existing run, no new slot needed
+        assert not buffer.add([started("c")])
+        assert buffer.stats()["pending"] == 2
+
+    def test_failed_flush_is_requeued(self, session_factory):
+        buffer = RunEventBuffer(session_factory=session_factory)
+        buffer.add([started("r1")])
+        with patch.object(buffer, "_write", side_effect=RuntimeError("db down")):
+            assert buffer.flush() == 0
+        assert buffer.stats()["pending"] == 1
+
+        buffer.add([finished("r1")])
+        assert buffer.flush() == 1
+        assert runs(session_factory)["r1"].status == "success"
+
+
+class TestRunEventWebhook:
+
+    @pytest.fixture
+    def client(self, session_factory):
+        from main import app
+        buffer = RunEventBuffer(session_factory=session_factory)
+        with patch.object(run_events, "RUN_EVENTS_SECRET", SECRET), \
+                patch("routers.webhooks.run_events", buffer):
+            yield TestClient(app), buffer
+
+    def post(self, client, payload, signature=None):
+        body = json.dumps(payload).encode()
+        return client.post(
+            "/api/webhooks/activepieces/runs",
+            content=body,
+            headers={"Content-Type": "application/json",
+                     "X-Bronn-Signature": signature or sign_payload(body, SECRET)},
+        )
+
+    def test_signed_delivery_is_accepted(self, client):
+        client, buffer = client
+        response = self.post(client, {"events": [started("r1"), finished("r1")]})
+
+        assert response.status_code == 202
+        assert response.json() == {"accepted": 2}
+        assert buffer.stats()["pending"] == 1
+
+    def test_bad_signature_is_rejected(self, client):
+        client, buffer = client
+        response = self.post(client, {"events": [started("r1")]}, signature="sha256=00")
+
+        assert response.status_code == 401
+        assert buffer.stats()["pending"] == 0
+
+    def test_unconfigured_secret(self, client):
+        client, _ = client
+        with patch.object(run_events, "RUN_EVENTS_SECRET", ""):
+            assert self.post(client, {"events": []}).status_code == 503
+
+    def test_invalid_event(self, client):
+        client, _ = client
+        response = self.post(client, {"events": [{"type": "run.exploded", "run_id": "r", "flow_id": "f"}]})
+        assert response.status_code == 422
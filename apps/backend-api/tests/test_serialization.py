@@ -0,0 +1,126 @@
+"""
+Tests for Fast JSON Serialization
+
+Covers the orjson and stdlib backends of serialization.dumps/loads, the
+default response class, and validated workflow lists.
+"""
+
+import enum
+import uuid
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import serialization
+from models import Workflow, Workspace
+from routers.workflows import WorkflowResponse
+from serialization import FastJSONResponse, dumps, loads
+
+OWNER = "uid-1"
+
+
+class Color(str, enum.Enum):
+    RED = "red"
+
+
+class Point(BaseModel):
+    x: int
+
+
+PAYLOAD = {
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "at": datetime(2026, 10, 17, 12, 30, 0),
+    "color": Color.RED,
+    "point": Point(x=1),
+    "price": Decimal("1.5"),
+    "tags": {"a"},
+    "name": "Ünïcode",
+    1: "int key",
+}
+EXPECTED = {
+    "id": "12345678-1234-5678-1234-567812345678",
+    "at": "2026-10-17T12:30:00",
+    "color": "red",
+    "point": {"x": 1},
+    "price": 1.5,
+    "tags": ["a"],
+    "name": "Ünïcode",
+    "1": "int key",
+}
+
+
+class TestDumps:
+
+    @pytest.mark.parametrize("backend", ["orjson", "json"])
+    def test_round_trip(self, backend):
+        orjson = serialization.orjson if backend == "orjson" else None
+        with patch.object(serialization, "orjson", orjson):
+            encoded = dumps(PAYLOAD)
+            assert loads(encoded) == EXPECTED
+        # Compact separators, raw UTF-8
+        assert '"name":"Ünïcode"'.encode() in encoded
+
+    def test_response_renders_bytes(self):
+        response = FastJSONResponse({"ok": True, "at": datetime(2026, 1, 1)})
+        assert response.body == b'{"ok":true,"at":"2026-01-01T00:00:00"}'
+        assert response.media_type == "application/json"
+
+
+class TestWorkflowList:
+
+    @pytest.fixture
+    def session_factory(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        for model in (Workspace, Workflow):
+            model.__table__.create(engine)
+        factory = sessionmaker(bind=engine)
+        db = factory()
+        ws = Workspace(id=uuid.uuid4(), name="Ops", owner_id=OWNER, tenant_id="default")
+        db.add(ws)
+        for i in range(20):
+            db.add(Workflow(workspace_id=ws.id, name=f"Flow {i}", created_by=OWNER, tenant_id="default"))
+        db.commit()
+        db.close()
+        return factory
+
+    def test_list_includes_workspace_in_one_query(self, session_factory):
+        from main import app
+
+        statements = []
+        bind = session_factory.kw["bind"]
+        listener = lambda *args: statements.append(args[2])
+
+        def get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[database.get_db] = get_db
+        event.listen(bind, "before_cursor_execute", listener)
+        try:
+            with patch("routers.workflows.verify_request_token", return_value={"uid": OWNER, "email": "a@bronn.dev"}):
+                response = TestClient(app).get("/api/workflows", headers={"Authorization": "Bearer t"})
+        finally:
+            event.remove(bind, "before_cursor_execute", listener)
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body) == 20
+        assert body[0]["workspace"]["name"] == "Ops"
+        # Filtered through response_model
+        assert set(body[0]) == set(WorkflowResponse.model_fields)
+        assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
@@ -0,0 +1,215 @@
+"""
+Unit Tests for Bronn Session Tokens
+
+Tests issuing, verification, refresh rotation, the maximum session age,
+revocation shared through the database (sqlite here), the fail-closed
+secret in auth.session_tokens, and bearer dispatch in
+auth.dependencies.verify_request_token.
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import dependencies, session_tokens
+from auth.dependencies import verify_request_token
+from auth.session_tokens import (
+    RevocationList,
+    SessionsDisabled,
+    decode_session_token,
+    is_session_token,
+    issue_session,
+    refresh_session,
+    revoke_token,
+)
+from models.session_revocation import RevokedToken, UserRevocation
+
+SECRET = "test-session-secret-" + "x" * 32
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    for model in (RevokedToken, UserRevocation):
+        model.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def fresh_revocations(session_factory):
+    with patch.object(session_tokens, "revocations", RevocationList(session_factory=session_factory)), \
+            patch.object(session_tokens, "BRONN_SESSION_SECRET", SECRET):
+        yield
+
+
+def new_session(**overrides):
+    kwargs = dict(firebase_uid="fb-1", user_id="user-1", email="ada@bronn.dev",
+                  tenant_id="acme", is_admin=True, name="Ada Lovelace")
+    kwargs.update(overrides)
+    return issue_session(**kwargs)
+
+
+class TestSessionTokens:
+
+    def test_round_trip_claims(self):
+        claims = decode_session_token(new_session()["session_token"])
+
+        assert claims["sub"] == "fb-1"
+        assert claims["uid"] == "user-1"
+        assert claims["email"] == "ada@bronn.dev"
+        assert claims["tenant_id"] == "acme"
+        assert claims["admin"] is True
+
+    def test_refresh_token_is_not_a_session(self):
+        session = new_session()
+        assert decode_session_token(session["refresh_token"]) is None
+        assert decode_session_token(session["session_token"], "refresh") is None
+
+    def test_expired_session_is_rejected(self):
+        with patch.object(session_tokens, "BRONN_SESSION_TTL", -10):
+            token = new_session()["session_token"]
+        assert decode_session_token(token) is None
+
+    def test_wrong_secret_is_rejected(self):
+        forged = jwt.encode(
+            {"sub": "fb-1", "iss": "bronn", "typ": "session", "exp": int(time.time()) + 60},
+            "not-the-secret", algorithm="HS256"
+        )
+        assert decode_session_token(forged) is None
+
+    def test_refresh_rotates_and_is_single_use(self):
+        session = new_session()
+        refreshed = refresh_session(session["refresh_token"])
+
+        assert decode_session_token(refreshed["session_token"])["email"] == "ada@bronn.dev"
+        assert refresh_session(session["refresh_token"]) is None
+
+    def test_revoked_session_is_rejected(self):
+        token = new_session()["session_token"]
+        assert revoke_token(token)
+        assert decode_session_token(token) is None
+
+    def test_revoke_user_cuts_off_earlier_tokens(self):
+        token = new_session()["session_token"]
+        session_tokens.revoke_user("fb-1")
+        assert decode_session_token(token) is None
+
+
+class TestSessionLifetime:
+
+    def test_refresh_keeps_original_login_time(self):
+        session = new_session()
+        auth_time = decode_session_token(session["session_token"])["auth_time"]
+
+        refreshed = refresh_session(session["refresh_token"])
+
+        assert decode_session_token(refreshed["session_token"])["auth_time"] == auth_time
+
+    def test_no_refresh_past_max_age(self):
+        session = new_session(auth_time=int(time.time()) - 3600)
+        with patch.object(session_tokens, "BRONN_SESSION_MAX_AGE", 3600):
+            assert refresh_session(session["refresh_token"]) is None
+
+    def test_tokens_expire_at_max_age(self):
+        with patch.object(session_tokens, "BRONN_SESSION_MAX_AGE", 3600):
+            session = new_session(auth_time=int(time.time()) - 3500)
+        claims = jwt.get_unverified_claims(session["refresh_token"])
+
+        assert claims["exp"] == claims["auth_time"] + 3600
+        assert session["expires_in"] <= 100
+
+    def test_inactive_account_cannot_refresh_and_loses_sessions(self):
+        session = new_session()
+        checked = []
+
+        def account_active(claims):
+            checked.append(claims["sub"])
+            return False
+
+        assert refresh_session(session["refresh_token"], account_active) is None
+        assert checked == ["fb-1"]
+        assert decode_session_token(session["session_token"]) is None
+
+
+class TestSharedRevocations:
+
+    def test_refresh_token_works_once_across_instances(self, session_factory):
+        session = new_session()
+        assert refresh_session(session["refresh_token"]) is not None
+
+        # Another instance (or this one after a restart) has an empty memory
+        with patch.object(session_tokens, "revocations", RevocationList(session_factory=session_factory)):
+            assert refresh_session(session["refresh_token"]) is None
+
+    def test_other_instances_pick_up_revocations(self, session_factory):
+        logged_out = new_session()["session_token"]
+        other_user = new_session(firebase_uid="fb-2")["session_token"]
+        assert revoke_token(logged_out)
+        session_tokens.revoke_user("fb-2")
+
+        other = RevocationList(session_factory=session_factory)
+        with patch.object(session_tokens, "revocations", other):
+            assert decode_session_token(logged_out) is not None
+            assert other.sync() == 2
+            assert decode_session_token(logged_out) is None
+            assert decode_session_token(other_user) is None
+
+    def test_sync_purges_expired_rows(self, session_factory):
+        session_tokens.revocations.revoke("old", time.time() - 1)
+        session_tokens.revocations.revoke("live", time.time() + 60)
+
+        session_tokens.revocations.sync()
+
+        db = session_factory()
+        assert [row.jti for row in db.query(RevokedToken)] == ["live"]
+        db.close()
+
+
+class TestSecret:
+
+    @pytest.mark.parametrize("secret", ["", "short"])
+    def test_no_sessions_without_a_real_secret(self, secret):
+        token = new_session()["session_token"]
+        with patch.object(session_tokens, "BRONN_SESSION_SECRET", secret):
+            with pytest.raises(SessionsDisabled):
+                new_session()
+            # Tokens signed with the placeholder (or anything) are not accepted
+            forged = jwt.encode(
+                {"sub": "fb-1", "iss": "bronn", "typ": "session", "admin": True, "exp": int(time.time()) + 60},
+                secret, algorithm="HS256"
+            )
+            assert decode_session_token(forged) is None
+            assert decode_session_token(token) is None
+
+    def test_jwt_default_is_not_used(self):
+        forged = jwt.encode(
+            {"sub": "fb-1", "iss": "bronn", "typ": "session", "exp": int(time.time()) + 60},
+            "your-secret-key-change-in-production", algorithm="HS256"
+        )
+        assert decode_session_token(forged) is None
+
+
+class TestVerifyRequestToken:
+
+    async def test_session_tokens_skip_firebase(self):
+        token = new_session()["session_token"]
+        with patch.object(dependencies, "verify_firebase_token", side_effect=AssertionError):
+            decoded = await verify_request_token(token)
+
+        assert decoded["uid"] == "fb-1"
+        assert decoded["tenant_id"] == "acme"
+
+    async def test_other_tokens_go_to_firebase(self):
+        firebase_token = jwt.encode({"sub": "x"}, "k", algorithm="HS512")
+        assert not is_session_token(firebase_token)
+        with patch.object(dependencies, "verify_firebase_token", return_value={"uid": "x"}) as verify:
+            assert await verify_request_token(firebase_token) == {"uid": "x"}
+        verify.assert_called_once()
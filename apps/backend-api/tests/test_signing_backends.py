@@ -0,0 +1,105 @@
+"""
+Unit Tests for Pluggable JWT Signing
+
+Tests every algorithm/backend pair in auth.signing_key and batch minting,
+in-process and across worker processes.
+"""
+
+import json
+import base64
+import pytest
+from unittest.mock import patch
+from jose import jwt
+from cryptography.hazmat.primitives import serialization
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth.signing_key import (
+    SIGNING_BACKENDS,
+    SUPPORTED_ALGORITHMS,
+    SigningKeyManager,
+    build_activepieces_claims,
+    generate_signing_key,
+    get_signing_backend,
+    key_algorithm,
+    mint_activepieces_jwts,
+    shutdown_mint_pool,
+    sign_jwt_batch,
+)
+
+
+def b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def verify(token: str, public_pem: str, algorithm: str) -> dict:
+    """Verify with jose where it can, and with cryptography for EdDSA."""
+    if algorithm != "EdDSA":
+        return jwt.decode(token, public_pem, algorithms=[algorithm])
+    header, payload, signature = token.split(".")
+    public_key = serialization.load_pem_public_key(public_pem.encode())
+    public_key.verify(b64decode(signature), f"{header}.{payload}".encode())
+    return json.loads(b64decode(payload))
+
+
+PAIRS = [
+    (algorithm, name)
+    for algorithm in SUPPORTED_ALGORITHMS
+    for name, backend in SIGNING_BACKENDS.items()
+    if algorithm in backend.algorithms
+]
+
+
+class TestSigningBackends:
+
+    @pytest.mark.parametrize("algorithm,backend", PAIRS)
+    def test_tokens_verify(self, algorithm, backend):
+        key_id, private_pem, public_pem = generate_signing_key(algorithm)
+        payload = build_activepieces_claims(user_id="u1", project_id="p1")
+
+        token = sign_jwt_batch([payload], private_pem, key_id, backend)[0]
+
+        assert jwt.get_unverified_header(token) == {"alg": algorithm, "typ": "JWT", "kid": key_id}
+        assert verify(token, public_pem, algorithm)["externalUserId"] == "u1"
+
+    @pytest.mark.parametrize("algorithm", SUPPORTED_ALGORITHMS)
+    def test_algorithm_is_read_from_key(self, algorithm):
+        _, private_pem, public_pem = generate_signing_key(algorithm)
+        assert key_algorithm(private_pem) == algorithm
+        assert key_algorithm(public_pem) == algorithm
+
+    def test_eddsa_falls_back_to_a_capable_backend(self):
+        assert get_signing_backend("EdDSA", "jose").name == "cryptography"
+        assert get_signing_backend("RS256", "jose").name == "jose"
+
+    def test_rotation_can_switch_algorithm(self, tmp_path):
+        manager = SigningKeyManager(tmp_path, check_interval=0)
+        assert manager.current().algorithm == "RS256"
+        assert manager.rotate("ES256").algorithm == "ES256"
+
+
+class TestBatchMint:
+
+    @pytest.fixture
+    def es256_key(self):
+        key_id, private_pem, public_pem = generate_signing_key("ES256")
+        with patch("auth.signing_key.get_or_create_signing_key", return_value=(key_id, private_pem)):
+            yield public_pem
+
+    def requests(self, count):
+        return [{"user_id": f"user-{i}", "project_id": "p1"} for i in range(count)]
+
+    def test_in_process(self, es256_key):
+        tokens = mint_activepieces_jwts(self.requests(50))
+        assert [verify(t, es256_key, "ES256")["externalUserId"] for t in tokens] == \
+            [f"user-{i}" for i in range(50)]
+
+    def test_process_pool_keeps_order(self, es256_key):
+        try:
+            tokens = mint_activepieces_jwts(self.requests(40), processes=2)
+        finally:
+            shutdown_mint_pool()
+        assert [verify(t, es256_key, "ES256")["externalUserId"] for t in tokens] == \
+            [f"user-{i}" for i in range(40)]
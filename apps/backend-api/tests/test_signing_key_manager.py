@@ -0,0 +1,80 @@
+"""
+Unit Tests for the In-Memory Signing Key Manager
+
+Tests mtime-based reloading, rotation and multi-key publication.
+"""
+
+import json
+import os
+import pytest
+from unittest.mock import patch
+from jose import jwt
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import signing_key
+from auth.signing_key import SigningKeyManager, create_activepieces_jwt
+
+
+@pytest.fixture
+def manager(tmp_path):
+    # check_interval=0 so every call looks at the file mtimes
+    return SigningKeyManager(tmp_path, check_interval=0)
+
+
+class TestSigningKeyManager:
+
+    def test_creates_key_on_first_use(self, manager):
+        key = manager.current()
+        assert key.key_id.startswith("bronn-key-")
+        assert "BEGIN PRIVATE KEY" in key.private_key
+        assert manager.current_file.exists()
+
+    def test_file_is_read_only_once_while_unchanged(self, manager):
+        manager.current()
+        with patch("builtins.open", side_effect=AssertionError("key file re-read")):
+            for _ in range(10):
+                manager.current()
+        assert manager.reloads == 1
+
+    def test_reloads_when_file_changes(self, manager):
+        manager.current()
+        data = json.loads(manager.current_file.read_text())
+        data["key_id"] = "externally-rotated"
+        manager.current_file.write_text(json.dumps(data))
+        stat = manager.current_file.stat()
+        os.utime(manager.current_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert manager.current().key_id == "externally-rotated"
+        assert manager.reloads == 2
+
+    def test_rotate_keeps_previous_key_active(self, manager):
+        old = manager.current()
+        new = manager.rotate()
+
+        assert new.key_id != old.key_id
+        assert manager.current().key_id == new.key_id
+        assert [k.key_id for k in manager.active_keys()] == [new.key_id, old.key_id]
+        assert manager.get(old.key_id).private_key is None
+
+    def test_retired_keys_expire_after_grace(self, manager):
+        old = manager.current()
+        manager.rotate()
+        with patch.object(signing_key, "SIGNING_KEY_RETIRE_GRACE", -1):
+            assert manager.get(old.key_id) is None
+
+    def test_tokens_from_before_rotation_still_verify(self, manager):
+        with patch.object(signing_key, "_key_manager", manager):
+            token = create_activepieces_jwt(user_id="u1", project_id="p1")
+            kid = jwt.get_unverified_header(token)["kid"]
+            manager.rotate()
+
+            public_key = manager.get(kid).public_key
+            assert jwt.decode(token, public_key, algorithms=["RS256"])["externalUserId"] == "u1"
+
+    def test_minting_does_not_touch_disk(self, manager):
+        with patch.object(signing_key, "_key_manager", manager):
+            create_activepieces_jwt(user_id="u1", project_id="p1")
+            with patch("builtins.open", side_effect=AssertionError("key file re-read")):
+                create_activepieces_jwt(user_id="u2", project_id="p1")
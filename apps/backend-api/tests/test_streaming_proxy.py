@@ -0,0 +1,130 @@
+"""
+Tests for the Streaming Activepieces Proxy
+
+Runs the catch-all /api/workflows/engine/{path} route against a mock
+Activepieces transport.
+"""
+
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_clients
+from http_clients import UpstreamClient
+from routers import activepieces
+from routers.activepieces import filter_hop_by_hop
+
+CHUNK = b"x" * 65536
+
+
+async def export_chunks(count):
+    for _ in range(count):
+        yield CHUNK
+
+
+def streamed_json(data) -> httpx.Response:
+    # A real upstream body arrives as a stream; bytes content would be pre-read
+    async def body():
+        yield json.dumps(data).encode()
+    return httpx.Response(200, content=body(), headers={"content-type": "application/json"})
+
+
+async def upstream_handler(request: httpx.Request) -> httpx.Response:
+    upstream_handler.last = request
+    path = request.url.path
+    if path == "/v1/flows/export":
+        return httpx.Response(
+            200,
+            content=export_chunks(32),
+            headers=[
+                ("content-type", "application/octet-stream"),
+                ("connection", "x-internal"),
+                ("x-internal", "secret"),
+                ("keep-alive", "timeout=5"),
+                ("set-cookie", "a=1"),
+                ("set-cookie", "b=2"),
+            ],
+        )
+    if path == "/v1/flows/import":
+        body = await request.aread()
+        return streamed_json({"received": len(body)})
+    if path == "/v1/slow":
+        raise httpx.ReadTimeout("idle", request=request)
+    return streamed_json({"path": path, "query": dict(request.url.params)})
+
+
+@pytest.fixture
+def client():
+    http_clients._clients.pop("activepieces", None)
+    with patch.object(
+        UpstreamClient, "_new_client",
+        lambda self: httpx.AsyncClient(transport=httpx.MockTransport(upstream_handler))
+    ), patch.object(activepieces, "ACTIVEPIECES_URL", "http://ap"):
+        from main import app
+        yield TestClient(app)
+    http_clients._clients.pop("activepieces", None)
+
+
+class TestStreamingProxy:
+
+    def test_large_response_is_relayed(self, client):
+        response = client.get("/api/workflows/engine/flows/export")
+
+        assert response.status_code == 200
+        assert response.content == CHUNK * 32
+
+    def test_response_hop_by_hop_headers_are_dropped(self, client):
+        response = client.get("/api/workflows/engine/flows/export")
+
+        assert "x-internal" not in response.headers
+        assert "keep-alive" not in response.headers
+        assert response.headers.get_list("set-cookie") == ["a=1", "b=2"]
+
+    def test_upload_is_forwarded(self, client):
+        payload = b"y" * 300_000
+        response = client.post("/api/workflows/engine/flows/import", content=payload)
+
+        assert response.json() == {"received": len(payload)}
+
+    def test_request_hop_by_hop_headers_are_dropped(self, client):
+        client.get(
+            "/api/workflows/engine/flows?limit=5",
+            headers={"Connection": "x-trace", "X-Trace": "1", "Proxy-Authorization": "p", "X-Keep": "k"},
+        )
+        sent = upstream_handler.last.headers
+
+        assert "x-trace" not in sent
+        assert "proxy-authorization" not in sent
+        assert sent["x-keep"] == "k"
+        assert upstream_handler.last.url.params["limit"] == "5"
+
+    def test_upstream_idle_timeout_is_gateway_timeout(self, client):
+        assert client.get("/api/workflows/engine/slow").status_code == 504
+
+    def test_open_circuit_is_shed_with_503(self, client):
+        breaker = http_clients.get_http_client("activepieces").breaker("proxy")
+        for _ in range(breaker.threshold):
+            breaker.record_failure()
+
+        response = client.get("/api/workflows/engine/flows")
+
+        assert response.status_code == 503
+        assert int(response.headers["retry-after"]) > 0
+
+    def test_buffered_mode_still_available(self, client):
+        with patch.object(activepieces, "PROXY_STREAMING", False):
+            response = client.get("/api/workflows/engine/flows")
+        assert response.json()["path"] == "/v1/flows"
+
+
+class TestHopByHopFilter:
+
+    def test_connection_named_headers_are_dropped(self):
+        headers = httpx.Headers({"Connection": "close, X-A", "X-A": "1", "X-B": "2", "TE": "trailers"})
+        assert filter_hop_by_hop(headers) == [("x-b", "2")]
@@ -0,0 +1,114 @@
+"""
+Unit Tests for the Verified-Token Cache
+
+Tests the generic TTL/LRU cache and its use in Firebase token verification.
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import TTLCache
+from auth import firebase_auth
+
+
+class TestTTLCache:
+    """Tests for the TTLCache primitive."""
+
+    def test_expired_entries_are_not_served(self):
+        cache = TTLCache(maxsize=4)
+        cache.set("a", 1, time.time() + 60)
+        cache.set("b", 2, time.time() - 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2)
+        expires = time.time() + 60
+        cache.set("a", 1, expires)
+        cache.set("b", 2, expires)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3, expires)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_concurrent_loads_are_coalesced(self):
+        cache = TTLCache(maxsize=4)
+        calls = []
+        release = threading.Event()
+
+        def loader():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "value", time.time() + 60
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 8
+
+    def test_uncacheable_results_are_not_stored(self):
+        cache = TTLCache(maxsize=4)
+        assert cache.get_or_load("k", lambda: (None, None)) is None
+        assert len(cache) == 0
+
+
+class TestFirebaseTokenCache:
+    """Tests for cached Firebase ID token verification."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        firebase_auth._token_cache.clear()
+        with patch("auth.firebase_auth.init_firebase", return_value=True), \
+                patch("auth.firebase_auth.get_local_verifier", return_value=None):
+            yield
+        firebase_auth._token_cache.clear()
+
+    def test_repeat_verification_hits_cache(self):
+        claims = {"uid": "u1", "email": "a@b.c", "exp": time.time() + 3600}
+        with patch("auth.firebase_auth.auth.verify_id_token", return_value=claims) as mock_verify:
+            for _ in range(10):
+                assert firebase_auth.verify_firebase_token("token-1")["uid"] == "u1"
+
+        assert mock_verify.call_count == 1
+
+    def test_cache_respects_token_exp(self):
+        claims = {"uid": "u1", "exp": time.time() - 1}
+        with patch("auth.firebase_auth.auth.verify_id_token", return_value=claims) as mock_verify:
+            firebase_auth.verify_firebase_token("token-1")
+            firebase_auth.verify_firebase_token("token-1")
+
+        assert mock_verify.call_count == 2
+
+    def test_invalid_tokens_are_not_cached(self):
+        with patch("auth.firebase_auth.auth.verify_id_token", side_effect=ValueError("bad")) as mock_verify:
+            assert firebase_auth.verify_firebase_token("bad-token") is None
+            assert firebase_auth.verify_firebase_token("bad-token") is None
+
+        assert mock_verify.call_count == 2
+
+    def test_raw_token_is_not_used_as_key(self):
+        claims = {"uid": "u1", "exp": time.time() + 3600}
+        with patch("auth.firebase_auth.auth.verify_id_token", return_value=claims):
+            firebase_auth.verify_firebase_token("secret-token")
+
+        assert "secret-token" not in firebase_auth._token_cache._data
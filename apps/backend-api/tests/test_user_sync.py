@@ -0,0 +1,246 @@
+"""
+Unit Tests for Single-Statement User Provisioning
+
+Runs the upsert, the user snapshot cache and the write-behind login
+buffer against an in-memory SQLite database.
+"""
+
+import dataclasses
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.user import User
+from auth import user_sync
+from auth.user_sync import (
+    LoginWriteBuffer, UserSnapshot, upsert_user_from_token, get_or_create_user,
+    get_user_snapshot, invalidate_cached_user, record_login,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_sync._user_cache.clear()
+    yield
+    user_sync._user_cache.clear()
+
+
+@pytest.fixture
+def engine():
+    # One shared connection so every session sees the same in-memory database
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    User.__table__.create(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    session.statements = []
+    event.listen(
+        engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: session.statements.append(statement)
+    )
+    yield session
+    session.close()
+
+
+CLAIMS = {
+    "uid": "uid-1",
+    "email": "ada@bronn.dev",
+    "name": "Ada Lovelace",
+    "picture": "https://img/ada.png",
+}
+
+
+class TestUpsertUser:
+
+    def test_creates_user_in_one_statement(self, db):
+        user = upsert_user_from_token(db, CLAIMS)
+
+        assert user.firebase_uid == "uid-1"
+        assert user.first_name == "Ada"
+        assert user.last_name == "Lovelace"
+        assert user.last_login_at is not None
+        assert len([s for s in db.statements if s.lstrip().upper().startswith("INSERT")]) == 1
+        assert not any(s.lstrip().upper().startswith("SELECT") for s in db.statements)
+
+    def test_existing_user_is_updated_not_duplicated(self, db):
+        first = upsert_user_from_token(db, CLAIMS)
+        second = upsert_user_from_token(db, {**CLAIMS, "picture": "https://img/new.png"})
+
+        assert second.id == first.id
+        assert second.avatar_url == "https://img/new.png"
+        assert db.query(User).count() == 1
+
+    def test_missing_profile_claims_keep_stored_values(self, db):
+        upsert_user_from_token(db, CLAIMS)
+        user = upsert_user_from_token(db, {"uid": "uid-1", "email": "ada@bronn.dev"})
+
+        assert user.avatar_url == "https://img/ada.png"
+        assert user.display_name == "Ada Lovelace"
+
+    def test_links_existing_email_to_new_uid(self, db):
+        original = upsert_user_from_token(db, CLAIMS)
+        linked = upsert_user_from_token(db, {**CLAIMS, "uid": "uid-2"})
+
+        assert linked.id == original.id
+        assert linked.firebase_uid == "uid-2"
+        assert db.query(User).count() == 1
+
+    def test_returned_user_is_loaded_after_commit(self, db):
+        user = upsert_user_from_token(db, CLAIMS)
+        count = len(db.statements)
+        assert user.email == "ada@bronn.dev"
+        assert len(db.statements) == count
+
+
+class TestGetOrCreateUser:
+
+    def test_provisions_then_reads(self, db):
+        created = get_or_create_user(db, CLAIMS)
+        fetched = get_or_create_user(db, CLAIMS)
+
+        assert created.id == fetched.id
+        assert db.query(User).count() == 1
+
+
+class TestUserSnapshotCache:
+
+    def test_hit_skips_database(self, db):
+        upsert_user_from_token(db, CLAIMS)
+        invalidate_cached_user(CLAIMS["uid"])
+        first = get_user_snapshot(db, CLAIMS)
+        db.statements.clear()
+
+        second = get_user_snapshot(db, CLAIMS)
+
+        assert second == first
+        assert db.statements == []
+
+    def test_snapshot_is_detached_and_read_only(self, db):
+        upsert_user_from_token(db, CLAIMS)
+        snapshot = get_user_snapshot(db, CLAIMS)
+
+        assert isinstance(snapshot, UserSnapshot)
+        assert snapshot.to_dict()["email"] == "ada@bronn.dev"
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.display_name = "changed"
+
+    def test_our_updates_refresh_the_snapshot(self, db):
+        upsert_user_from_token(db, CLAIMS)
+        get_user_snapshot(db, CLAIMS)
+        upsert_user_from_token(db, {**CLAIMS, "name": "Countess Lovelace"})
+
+        assert get_user_snapshot(db, CLAIMS).display_name == "Countess Lovelace"
+
+    def test_relink_drops_previous_uid(self, db):
+        upsert_user_from_token(db, CLAIMS)
+        get_user_snapshot(db, CLAIMS)
+        upsert_user_from_token(db, {**CLAIMS, "uid": "uid-2"})
+
+        assert user_sync._user_cache.get(CLAIMS["uid"]) is None
+        assert user_sync._user_cache.get("uid-2").firebase_uid == "uid-2"
+
+    def test_entries_expire(self, db):
+        upsert_user_from_token(db, CLAIMS)
+        with patch.object(user_sync, "USER_CACHE_TTL", -1):
+            invalidate_cached_user(CLAIMS["uid"])
+            get_user_snapshot(db, CLAIMS)
+        db.statements.clear()
+
+        get_user_snapshot(db, CLAIMS)
+        assert any(s.lstrip().upper().startswith("SELECT") for s in db.statements)
+
+
+class TestLoginWriteBehind:
+
+    @pytest.fixture
+    def buffer(self, engine, monkeypatch):
+        buffer = LoginWriteBuffer(session_factory=sessionmaker(bind=engine), batch_size=100)
+        monkeypatch.setattr(user_sync, "login_writes", buffer)
+        return buffer
+
+    def make_users(self, db, count):
+        return [
+            upsert_user_from_token(db, {"uid": f"uid-{i}", "email": f"u{i}@bronn.dev"})
+            for i in range(count)
+        ]
+
+    def test_returning_login_does_not_write(self, db, buffer):
+        upsert_user_from_token(db, CLAIMS)
+        db.statements.clear()
+
+        user = record_login(db, {**CLAIMS, "picture": "https://img/new.png"})
+
+        assert user.avatar_url == "https://img/new.png"
+        assert all(s.lstrip().upper().startswith("SELECT") for s in db.statements)
+        assert buffer.stats()["pending"] == 1
+        assert not db.dirty
+        # The cached snapshot already reflects the pending update
+        assert get_user_snapshot(db, CLAIMS).avatar_url == "https://img/new.png"
+
+    def test_new_user_is_written_immediately(self, db, buffer):
+        user = record_login(db, CLAIMS)
+
+        assert db.query(User).filter(User.id == user.id).count() == 1
+        assert buffer.stats()["pending"] == 0
+
+    def test_flush_is_one_update_for_many_users(self, db, buffer):
+        users = self.make_users(db, 20)
+        stamp = datetime(2030, 1, 1)
+        for user in users:
+            buffer.add(user.id, stamp, display_name=f"name-{user.id}")
+        db.statements.clear()
+
+        assert buffer.flush() == 20
+
+        updates = [s for s in db.statements if s.lstrip().upper().startswith("UPDATE")]
+        assert len(updates) == 1
+        db.expire_all()
+        for user in db.query(User).all():
+            assert user.last_login_at == stamp
+            assert user.display_name == f"name-{user.id}"
+
+    def test_repeated_logins_coalesce_and_keep_unchanged_fields(self, db, buffer):
+        user = upsert_user_from_token(db, CLAIMS)
+        buffer.add(user.id, datetime(2030, 1, 1), avatar_url="https://img/new.png")
+        buffer.add(user.id, datetime(2030, 1, 2))
+        buffer.flush()
+
+        db.expire_all()
+        stored = db.query(User).one()
+        assert stored.last_login_at == datetime(2030, 1, 2)
+        assert stored.avatar_url == "https://img/new.png"
+        assert stored.display_name == "Ada Lovelace"
+
+    def test_failed_flush_is_retried(self, db, buffer):
+        user = upsert_user_from_token(db, CLAIMS)
+        buffer.add(user.id, datetime(2030, 1, 1))
+        factory = buffer._session_factory
+
+        def broken():
+            raise RuntimeError("database unavailable")
+
+        buffer._session_factory = broken
+        assert buffer.flush() == 0
+        assert buffer.stats()["pending"] == 1
+
+        buffer._session_factory = factory
+        assert buffer.flush() == 1
+
+    def test_stop_flushes_pending(self, db, buffer):
+        user = upsert_user_from_token(db, CLAIMS)
+        buffer.start()
+        buffer.add(user.id, datetime(2030, 1, 1))
+        buffer.stop()
+
+        db.expire_all()
+        assert db.query(User).one().last_login_at == datetime(2030, 1, 1)
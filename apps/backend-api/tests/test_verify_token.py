@@ -0,0 +1,209 @@
+"""
+Tests for the /api/auth/verify-token Login Flow
+
+Checks that the Activepieces session fetch overlaps the user upsert, that
+a slow Activepieces leg is reported as pending instead of delaying the
+login, and that the login issues a working Bronn session. Also covers the
+account check on refresh and bearer verification on the engine /token
+endpoint.
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from auth import session_tokens
+from routers import auth as auth_router
+from auth.user_sync import cache_user, invalidate_cached_user
+from database import get_db
+from auth.session_tokens import RevocationList
+from models.session_revocation import RevokedToken, UserRevocation
+from models.user import User
+
+CLAIMS = {"uid": "firebase-uid-1", "email": "user@bronn.dev", "name": "Ada Lovelace"}
+
+
+def fake_user() -> User:
+    return User(
+        id="user-1",
+        firebase_uid=CLAIMS["uid"],
+        email=CLAIMS["email"],
+        first_name="Ada",
+        last_name="Lovelace",
+        display_name="Ada Lovelace",
+        is_admin=False,
+    )
+
+
+def slow_upsert(db, decoded, delay=0.3):
+    time.sleep(delay)
+    return fake_user()
+
+
+def slow_activepieces(delay, token="ap-session"):
+    async def ensure(**kwargs):
+        await asyncio.sleep(delay)
+        return token
+    return ensure
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_db] = lambda: None
+    with patch("routers.auth.verify_firebase_token", return_value=dict(CLAIMS)), \
+            patch("routers.auth.record_login", side_effect=slow_upsert):
+        yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+class TestVerifyTokenConcurrency:
+
+    def test_latency_is_max_not_sum(self, client):
+        with patch("routers.auth.ensure_user_in_activepieces", slow_activepieces(0.3)):
+            start = time.perf_counter()
+            response = client.post("/api/auth/verify-token", headers={"Authorization": "Bearer t"})
+            elapsed = time.perf_counter() - start
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["activepieces_token"] == "ap-session"
+        assert body["activepieces_pending"] is False
+        # Sequential would be ~0.6s
+        assert elapsed < 0.5
+
+    def test_late_activepieces_is_reported_pending(self, client):
+        with patch("routers.auth.ensure_user_in_activepieces", slow_activepieces(5)), \
+                patch("routers.auth.ACTIVEPIECES_LOGIN_DEADLINE", 0.4):
+            start = time.perf_counter()
+            response = client.post("/api/auth/verify-token", headers={"Authorization": "Bearer t"})
+            elapsed = time.perf_counter() - start
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["activepieces_token"] is None
+        assert body["activepieces_pending"] is True
+        assert body["user"]["email"] == CLAIMS["email"]
+        assert elapsed < 2
+
+    def test_activepieces_session_uses_names_from_claims_when_uncached(self, client):
+        calls = []
+
+        async def ensure(**kwargs):
+            calls.append(kwargs)
+            return "ap-session"
+
+        with patch("routers.auth.ensure_user_in_activepieces", ensure):
+            client.post("/api/auth/verify-token", headers={"Authorization": "Bearer t"})
+
+        assert calls[0]["first_name"] == "Ada"
+        assert calls[0]["last_name"] == "Lovelace"
+
+    def test_activepieces_session_prefers_cached_row_names(self, client):
+        calls = []
+
+        async def ensure(**kwargs):
+            calls.append(kwargs)
+            return "ap-session"
+
+        stored = User(firebase_uid=CLAIMS["uid"], email=CLAIMS["email"], first_name="Augusta", last_name="King")
+        cache_user(stored)
+        try:
+            with patch("routers.auth.ensure_user_in_activepieces", ensure):
+                client.post("/api/auth/verify-token", headers={"Authorization": "Bearer t"})
+        finally:
+            invalidate_cached_user(CLAIMS["uid"])
+
+        assert (calls[0]["first_name"], calls[0]["last_name"]) == ("Augusta", "King")
+
+
+class TestSessionIssue:
+
+    def test_login_issues_usable_session(self, client):
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        for model in (RevokedToken, UserRevocation):
+            model.__table__.create(engine)
+        store = RevocationList(session_factory=sessionmaker(bind=engine))
+        with patch.object(session_tokens, "BRONN_SESSION_SECRET", "s" * 32), \
+                patch.object(session_tokens, "revocations", store), \
+                patch("routers.auth._account_active", return_value=True), \
+                patch("routers.auth.ensure_user_in_activepieces", slow_activepieces(0)):
+            body = client.post("/api/auth/verify-token", headers={"Authorization": "Bearer t"}).json()
+
+            session = body["session_token"]
+            assert body["session_expires_in"] > 0
+
+            refreshed = client.post("/api/auth/refresh", json={"refresh_token": body["refresh_token"]})
+            assert refreshed.status_code == 200
+            # Refresh tokens are single-use
+            again = client.post("/api/auth/refresh", json={"refresh_token": body["refresh_token"]})
+            assert again.status_code == 401
+
+            assert client.post("/api/auth/logout", headers={"Authorization": f"Bearer {session}"}).status_code == 200
+            assert client.post("/api/auth/logout", headers={"Authorization": f"Bearer {session}"}).status_code == 401
+
+    def test_no_session_without_secret(self, client):
+        with patch.object(session_tokens, "BRONN_SESSION_SECRET", ""), \
+                patch("routers.auth.ensure_user_in_activepieces", slow_activepieces(0)):
+            response = client.post("/api/auth/verify-token", headers={"Authorization": "Bearer t"})
+
+        assert response.status_code == 200
+        assert response.json()["session_token"] is None
+
+
+class TestRefreshAccountCheck:
+
+    @pytest.fixture
+    def db(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        User.__table__.create(engine)
+        db = sessionmaker(bind=engine)()
+        db.add(fake_user())
+        db.commit()
+        yield db
+        db.close()
+
+    @pytest.mark.parametrize("record,active", [
+        ({"disabled": False, "tokens_valid_after": 0}, True),
+        ({"disabled": True, "tokens_valid_after": 0}, False),
+        # Firebase refresh tokens revoked after this session's login
+        ({"disabled": False, "tokens_valid_after": 2000}, False),
+        (None, False),
+    ])
+    def test_firebase_state(self, db, record, active):
+        with patch("routers.auth.get_firebase_user", return_value=record):
+            assert auth_router._account_active(db, {"sub": CLAIMS["uid"], "auth_time": 1000}) is active
+
+    def test_deactivated_or_missing_row(self, db):
+        with patch("routers.auth.get_firebase_user", return_value={"disabled": False, "tokens_valid_after": 0}):
+            assert not auth_router._account_active(db, {"sub": "someone-else", "auth_time": 1000})
+            db.query(User).update({"is_active": False})
+            assert not auth_router._account_active(db, {"sub": CLAIMS["uid"], "auth_time": 1000})
+
+
+class TestEngineToken:
+
+    def test_accepts_verified_bearer_tokens(self):
+        with patch("routers.activepieces.verify_request_token", return_value=dict(CLAIMS)), \
+                patch("routers.activepieces.get_activepieces_jwt", return_value=("ap-jwt", 300)) as sign:
+            response = TestClient(app).get("/api/workflows/engine/token", headers={"Authorization": "Bearer t"})
+
+        assert response.status_code == 200
+        assert response.json()["token"] == "ap-jwt"
+        assert sign.call_args.kwargs["user_id"] == CLAIMS["email"]
+        assert sign.call_args.kwargs["last_name"] == "Lovelace"
+
+    def test_rejects_unverified_tokens(self):
+        with patch("routers.activepieces.verify_request_token", return_value=None):
+            response = TestClient(app).get("/api/workflows/engine/token", headers={"Authorization": "Bearer t"})
+
+        assert response.status_code == 401
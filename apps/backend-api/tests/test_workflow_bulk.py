@@ -0,0 +1,213 @@
+"""
+Tests for Bulk WorkflowEngine Operations
+
+Checks bounded fan-out, ordering and per-item errors in bulk_map, the
+ActivepiecesAdapter bulk methods, and the /api/workflows/batch endpoints.
+"""
+
+import asyncio
+import uuid
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import http_clients
+from http_clients import UpstreamClient
+from models import Workflow, Workspace
+from workflow_engine import ActivepiecesAdapter, ExecutionStatus, WorkflowStatus
+from workflow_engine.interface import bulk_map
+
+
+def adapter() -> ActivepiecesAdapter:
+    engine = ActivepiecesAdapter(api_token="t")
+    engine.base_url = "http://ap/v1"
+    return engine
+
+
+@pytest.fixture
+def activepieces():
+    state = {"inflight": 0, "peak": 0, "paths": []}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["paths"].append(request.url.path)
+        state["inflight"] += 1
+        state["peak"] = max(state["peak"], state["inflight"])
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            state["inflight"] -= 1
+        item_id = request.url.path.rsplit("/", 1)[-1]
+        if item_id.startswith("missing"):
+            return httpx.Response(404, json={"message": "not found"})
+        if item_id.startswith("broken"):
+            return httpx.Response(400, json={"message": "bad"})
+        if request.url.path.startswith("/v1/flow-runs"):
+            flow_id = "flow-other" if item_id.startswith("foreign") else "flow-1"
+            return httpx.Response(200, json={"id": item_id, "flowId": flow_id, "status": "RUNNING"})
+        return httpx.Response(200, json={"id": item_id, "status": "ENABLED", "version": {"displayName": item_id}})
+
+    http_clients._clients.pop("activepieces", None)
+    with patch.object(
+        UpstreamClient, "_new_client",
+        lambda self: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    ):
+        yield state
+    http_clients._clients.pop("activepieces", None)
+
+
+class TestBulkMap:
+
+    async def test_bounded_and_ordered(self):
+        inflight, peak = 0, 0
+
+        async def work(n):
+            nonlocal inflight, peak
+            inflight += 1
+            peak = max(peak, inflight)
+            await asyncio.sleep(0.01 * (5 - n % 5))
+            inflight -= 1
+            if n == 3:
+                raise ValueError("three")
+            return n * 10
+
+        results = await bulk_map(list(range(10)), work, str, concurrency=3)
+
+        assert peak == 3
+        assert [r.id for r in results] == [str(n) for n in range(10)]
+        assert results[3].error == "three"
+        assert results[4].value == 40
+
+
+class TestAdapterBulk:
+
+    async def test_execution_statuses_fan_out(self, activepieces):
+        ids = [f"run-{i}" for i in range(20)] + ["missing-1"]
+        with patch.object(ActivepiecesAdapter, "bulk_concurrency", 5):
+            results = await adapter().get_execution_statuses(ids)
+
+        assert activepieces["peak"] == 5
+        assert [r.id for r in results] == ids
+        assert results[0].value.status == ExecutionStatus.RUNNING
+        assert results[-1].error == "Not found"
+
+    async def test_status_updates_report_per_item(self, activepieces):
+        results = await adapter().update_workflow_statuses({
+            "flow-1": WorkflowStatus.ACTIVE,
+            "broken-2": WorkflowStatus.PAUSED,
+        })
+
+        assert results[0].ok and results[0].value.status == WorkflowStatus.ACTIVE
+        assert results[1].error.startswith("400")
+
+
+class TestBatchEndpoints:
+
+    @pytest.fixture
+    def client(self, activepieces):
+        from main import app
+
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        for model in (Workspace, Workflow):
+            model.__table__.create(engine)
+        factory = sessionmaker(bind=engine)
+        db = factory()
+        mine = Workspace(id=uuid.uuid4(), name="Mine", owner_id="u", tenant_id="default")
+        theirs = Workspace(id=uuid.uuid4(), name="Theirs", owner_id="other", tenant_id="default")
+        db.add_all([mine, theirs])
+        for flow_id in ("flow-1", "missing-2", "broken-2"):
+            db.add(Workflow(workspace_id=mine.id, name=flow_id, engine_flow_id=flow_id, created_by="u", tenant_id="default"))
+        db.add(Workflow(workspace_id=theirs.id, name="other", engine_flow_id="flow-other", created_by="other", tenant_id="default"))
+        db.commit()
+        db.close()
+
+        def get_db():
+            session = factory()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[database.get_db] = get_db
+        try:
+            with patch("routers.workflows.verify_request_token", return_value={"uid": "u", "email": "u@bronn.dev"}), \
+                    patch("routers.workflows.get_workflow_engine", adapter):
+                yield TestClient(app)
+        finally:
+            app.dependency_overrides.clear()
+
+    def test_batch_get(self, client):
+        response = client.post(
+            "/api/workflows/batch/get",
+            json={"ids": ["flow-1", "missing-2"]},
+            headers={"Authorization": "Bearer t"},
+        )
+
+        body = response.json()
+        assert body["succeeded"] == 1 and body["failed"] == 1
+        assert body["results"][0]["data"]["status"] == "active"
+        assert body["results"][1] == {"id": "missing-2", "ok": False, "data": None, "error": "Not found"}
+
+    def test_batch_get_hides_other_tenants_flows(self, client, activepieces):
+        response = client.post(
+            "/api/workflows/batch/get",
+            json={"ids": ["flow-other", "flow-1", "unmirrored"]},
+            headers={"Authorization": "Bearer t"},
+        )
+
+        results = response.json()["results"]
+        assert [r["id"] for r in results] == ["flow-other", "flow-1", "unmirrored"]
+        assert [r["ok"] for r in results] == [False, True, False]
+        assert results[0]["error"] == "Not found"
+        assert activepieces["paths"] == ["/v1/flows/flow-1"]
+
+    def test_batch_execute(self, client):
+        response = client.post(
+            "/api/workflows/batch/execute",
+            json={"runs": [{"workflow_id": "flow-1", "input_data": {"a": 1}}, {"workflow_id": "flow-other"}]},
+            headers={"Authorization": "Bearer t"},
+        )
+
+        body = response.json()
+        assert body["succeeded"] == 1
+        assert body["results"][1]["error"] == "Not found"
+
+    def test_batch_status_skips_other_tenants_flows(self, client, activepieces):
+        response = client.post(
+            "/api/workflows/batch/status",
+            json={"statuses": {"flow-other": "paused", "flow-1": "active"}},
+            headers={"Authorization": "Bearer t"},
+        )
+
+        assert [r["ok"] for r in response.json()["results"]] == [False, True]
+        assert all("flow-other" not in path for path in activepieces["paths"])
+
+    def test_execution_statuses_of_other_tenants_are_hidden(self, client):
+        response = client.post(
+            "/api/workflows/batch/executions/status",
+            json={"ids": ["run-1", "foreign-1"]},
+            headers={"Authorization": "Bearer t"},
+        )
+
+        results = response.json()["results"]
+        assert results[0]["ok"] and results[0]["data"]["workflow_id"] == "flow-1"
+        assert results[1] == {"id": "foreign-1", "ok": False, "data": None, "error": "Not found"}
+
+    def test_invalid_status_is_rejected(self, client):
+        response = client.post(
+            "/api/workflows/batch/status",
+            json={"statuses": {"flow-1": "exploded"}},
+            headers={"Authorization": "Bearer t"},
+        )
+        assert response.status_code == 400
+
+    def test_batch_requires_auth(self, client):
+        assert client.post("/api/workflows/batch/get", json={"ids": ["a"]}).status_code == 401
@@ -0,0 +1,133 @@
+"""
+Tests for Auto-Paginating Workflow Engine Iterators
+
+Checks cursor following, next-page prefetch and early stop for
+iter_workflows / iter_executions.
+"""
+
+import asyncio
+import time
+import httpx
+import pytest
+from contextlib import aclosing
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_clients
+from http_clients import UpstreamClient
+from workflow_engine import ActivepiecesAdapter, Page, WorkflowEngine
+from workflow_engine.interface import paginate
+
+PAGES = 4
+PAGE_SIZE = 3
+
+
+def adapter() -> ActivepiecesAdapter:
+    engine = ActivepiecesAdapter(api_token="t")
+    engine.base_url = "http://ap/v1"
+    return engine
+
+
+def run(i: int) -> dict:
+    return {"id": f"run-{i}", "flowId": "flow-1", "status": "SUCCEEDED", "startTime": ""}
+
+
+@pytest.fixture
+def activepieces():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        page = int(request.url.params.get("cursor", "0"))
+        start = page * PAGE_SIZE
+        return httpx.Response(200, json={
+            "data": [run(i) for i in range(start, start + PAGE_SIZE)],
+            "next": str(page + 1) if page + 1 < PAGES else None,
+        })
+
+    http_clients._clients.pop("activepieces", None)
+    with patch.object(
+        UpstreamClient, "_new_client",
+        lambda self: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    ):
+        yield requests
+    http_clients._clients.pop("activepieces", None)
+
+
+class TestAdapterIterators:
+
+    async def test_follows_cursors(self, activepieces):
+        runs = [r.id async for r in adapter().iter_executions("flow-1", page_size=PAGE_SIZE)]
+
+        assert runs == [f"run-{i}" for i in range(PAGES * PAGE_SIZE)]
+        assert [r.url.params.get("cursor") for r in activepieces] == [None, "1", "2", "3"]
+        assert activepieces[0].url.params["limit"] == str(PAGE_SIZE)
+
+    async def test_max_items_stops_fetching(self, activepieces):
+        runs = [r async for r in adapter().iter_executions("flow-1", page_size=PAGE_SIZE, max_items=4)]
+        await asyncio.sleep(0)
+
+        assert len(runs) == 4
+        # Page 2 was needed, page 3 at most prefetched
+        assert len(activepieces) <= 3
+
+    async def test_list_page_exposes_cursor(self, activepieces):
+        page = await adapter().list_workflows_page("project-1")
+        assert page.next_cursor == "1"
+        assert activepieces[0].url.params["projectId"] == "project-1"
+
+
+class TestPaginate:
+
+    async def test_next_page_is_prefetched(self):
+        async def fetch(cursor):
+            await asyncio.sleep(0.05)
+            page = int(cursor or 0)
+            return Page([page], str(page + 1) if page < 4 else None)
+
+        start = time.perf_counter()
+        async for _ in paginate(fetch):
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+
+        # Sequential would be 5 x (fetch + work) = 0.5s
+        assert elapsed < 0.4
+
+    async def test_break_cancels_prefetch(self):
+        pending = []
+
+        async def fetch(cursor):
+            try:
+                await asyncio.sleep(0 if cursor is None else 10)
+            except asyncio.CancelledError:
+                pending.append(cursor)
+                raise
+            return Page([1, 2], "next")
+
+        async with aclosing(paginate(fetch)) as items:
+            async for _ in items:
+                await asyncio.sleep(0.01)  # let the prefetch start
+                break
+
+        await asyncio.sleep(0)
+        assert pending == ["next"]
+
+
+class TestDefaultPages:
+
+    async def test_engine_without_cursors_is_one_page(self):
+        class ListOnly(WorkflowEngine):
+            create_workflow = get_workflow = update_workflow_status = None
+            delete_workflow = execute_workflow = get_execution_status = None
+
+            async def list_workflows(self, project_id, folder_id=None, limit=50, cursor=None):
+                return ["a", "b"]
+
+            async def list_executions(self, workflow_id, limit=50, cursor=None):
+                return []
+
+        engine = ListOnly()
+        assert [w async for w in engine.iter_workflows("p")] == ["a", "b"]
@@ -9,6 +9,9 @@ Usage:
     
     engine = get_workflow_engine()
     workflows = await engine.list_workflows(project_id="...")
+    
+    async for run in engine.iter_executions(workflow_id="..."):
+        ...
 """
 
 from .interface import (
@@ -17,8 +20,11 @@ from .interface import (
     WorkflowStatus,
     ExecutionInfo,
     ExecutionStatus,
+    Page,
+    BulkResult,
 )
 from .activepieces_adapter import get_workflow_engine, ActivepiecesAdapter
+from .execution_watch import TERMINAL_STATUSES, execution_watchers
 
 __all__ = [
     "WorkflowEngine",
@@ -26,6 +32,10 @@ __all__ = [
     "WorkflowStatus",
     "ExecutionInfo",
     "ExecutionStatus",
+    "Page",
+    "BulkResult",
     "get_workflow_engine",
     "ActivepiecesAdapter",
+    "TERMINAL_STATUSES",
+    "execution_watchers",
 ]
@@ -19,13 +19,19 @@ from .interface import (
     WorkflowStatus,
     ExecutionInfo,
     ExecutionStatus,
+    Page,
 )
 from auth.signing_key import create_activepieces_jwt
+from http_clients import get_http_client
+from serialization import loads
 
 
 # Activepieces API base URL - must be set via environment
 ACTIVEPIECES_URL = os.getenv("ACTIVEPIECES_URL", "")
 
+# Requests in flight per bulk operation (kept below the "engine" bulkhead)
+ENGINE_BULK_CONCURRENCY = int(os.getenv("ENGINE_BULK_CONCURRENCY", "10"))
+
 
 def _status_from_ap(ap_status: str) -> WorkflowStatus:
     """Convert Activepieces status to internal enum."""
@@ -61,6 +67,7 @@ def _workflow_from_response(data: Dict[str, Any]) -> WorkflowInfo:
         created_at=data.get("created", ""),
         updated_at=data.get("updated", ""),
         folder_id=data.get("folderId"),
+        definition=data,
     )
 
 
@@ -83,15 +90,20 @@ class ActivepiecesAdapter(WorkflowEngine):
     
     Uses Activepieces REST API to perform all operations.
     Authentication is handled via JWT tokens generated by Bronn.
+    Bulk operations fan out over the shared connection pool, at most
+    ENGINE_BULK_CONCURRENCY requests at a time.
     """
     
-    def __init__(self, api_token: Optional[str] = None, timeout: float = 30.0):
+    bulk_concurrency = ENGINE_BULK_CONCURRENCY
+    
+    def __init__(self, api_token: Optional[str] = None, timeout: Optional[float] = None):
         """
         Initialize the Activepieces adapter.
         
         Args:
             api_token: Optional API token for authentication
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (default: the "engine"
+                route timeout, tightened to observed latency)
         """
         self.base_url = f"{ACTIVEPIECES_URL}/v1"
         self.api_token = api_token or os.getenv("ACTIVEPIECES_API_KEY", "")
@@ -111,17 +123,20 @@ class ActivepiecesAdapter(WorkflowEngine):
         json: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Make a request to Activepieces API."""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.request(
-                method=method,
-                url=f"{self.base_url}{endpoint}",
-                headers=self._headers(),
-                json=json,
-                params=params,
-            )
-            response.raise_for_status()
-            return response.json()
+        """Make a request to Activepieces API over the shared connection pool."""
+        kwargs = {"timeout": self.timeout} if self.timeout is not None else {}
+        response = await get_http_client("activepieces").request(
+            method,
+            f"{self.base_url}{endpoint}",
+            route="engine",
+            headers=self._headers(),
+            json=json,
+            params=params,
+            **kwargs,
+        )
+        response.raise_for_status()
+        # DELETE answers 204 with no body
+        return loads(response.content) if response.content else {}
     
     async def create_workflow(
         self,
@@ -159,7 +174,18 @@ class ActivepiecesAdapter(WorkflowEngine):
         cursor: Optional[str] = None,
     ) -> List[WorkflowInfo]:
         """List workflows in a project from Activepieces."""
-        params = {"limit": limit}
+        page = await self.list_workflows_page(project_id, folder_id, limit, cursor)
+        return page.items
+    
+    async def list_workflows_page(
+        self,
+        project_id: str,
+        folder_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Page[WorkflowInfo]:
+        """One page of workflows plus Activepieces' `next` cursor."""
+        params = {"projectId": project_id, "limit": limit}
         if folder_id:
             params["folderId"] = folder_id
         if cursor:
@@ -167,7 +193,12 @@ class ActivepiecesAdapter(WorkflowEngine):
         
         data = await self._request("GET", "/flows", params=params)
         flows = data.get("data", [])
-        return [_workflow_from_response(f) for f in flows]
+        return Page([_workflow_from_response(f) for f in flows], data.get("next"))
+    
+    async def list_project_ids(self, external_id: str) -> List[str]:
+        """IDs of the Activepieces projects whose externalId is external_id."""
+        data = await self._request("GET", "/projects", params={"externalId": external_id, "limit": 100})
+        return [p["id"] for p in data.get("data", [])]
     
     async def update_workflow_status(
         self,
@@ -218,13 +249,23 @@ class ActivepiecesAdapter(WorkflowEngine):
         cursor: Optional[str] = None,
     ) -> List[ExecutionInfo]:
         """List executions for a workflow from Activepieces."""
+        page = await self.list_executions_page(workflow_id, limit, cursor)
+        return page.items
+    
+    async def list_executions_page(
+        self,
+        workflow_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Page[ExecutionInfo]:
+        """One page of executions plus Activepieces' `next` cursor."""
         params = {"flowId": workflow_id, "limit": limit}
         if cursor:
             params["cursor"] = cursor
         
         data = await self._request("GET", "/flow-runs", params=params)
         runs = data.get("data", [])
-        return [_execution_from_response(r) for r in runs]
+        return Page([_execution_from_response(r) for r in runs], data.get("next"))
 
 
 def get_workflow_engine(api_token: Optional[str] = None) -> WorkflowEngine:
@@ -0,0 +1,234 @@
+"""
+Shared Execution Watchers
+
+Waiting for a run to finish used to mean polling get_execution_status
+from every client. Here one watcher task per execution polls the engine,
+backing off while nothing changes, and fans each status change out to
+every waiter: long-poll requests, SSE streams, agents. N waiters on the
+same run cost Activepieces one poll stream.
+
+A watcher stops when the run reaches a terminal status, is not found, or
+its last waiter leaves. Polling errors do not stop it, but a waiter that
+leaves while the last poll has failed gets that error instead of a
+stale status.
+
+Configuration (environment):
+
+    EXECUTION_POLL_MIN      - first poll interval, and after any change (seconds)
+    EXECUTION_POLL_MAX      - slowest poll interval (seconds)
+    EXECUTION_POLL_BACKOFF  - interval multiplier while the status is unchanged
+"""
+
+import asyncio
+import logging
+import os
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
+
+from .interface import ExecutionInfo, ExecutionStatus
+
+if TYPE_CHECKING:
+    from .interface import WorkflowEngine
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_POLL_MIN = float(os.getenv("EXECUTION_POLL_MIN", "0.5"))
+EXECUTION_POLL_MAX = float(os.getenv("EXECUTION_POLL_MAX", "5"))
+EXECUTION_POLL_BACKOFF = float(os.getenv("EXECUTION_POLL_BACKOFF", "1.5"))
+
+TERMINAL_STATUSES = frozenset({
+    ExecutionStatus.SUCCEEDED,
+    ExecutionStatus.FAILED,
+    ExecutionStatus.TIMEOUT,
+})
+
+
+class ExecutionWatch:
+    """Polls one execution and publishes its status changes to waiters."""
+
+    def __init__(self, engine: "WorkflowEngine", execution_id: str):
+        self.engine = engine
+        self.execution_id = execution_id
+        self.loop = asyncio.get_running_loop()
+        self.latest: Optional[ExecutionInfo] = None
+        self.version = 0        # bumped on every status change
+        self.done = False       # terminal, not found, or watcher failed
+        self.error: Optional[Exception] = None  # last poll's error, None once one succeeds
+        self.waiters = 0
+        self.polls = 0
+        self._changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    async def _publish(self, info: Optional[ExecutionInfo], done: bool) -> None:
+        async with self._changed:
+            if info is not None and (self.latest is None or info.status != self.latest.status):
+                self.version += 1
+            if info is not None:
+                self.latest = info
+            self.done = done
+            self._changed.notify_all()
+
+    async def run(self) -> None:
+        delay = EXECUTION_POLL_MIN
+        try:
+            while True:
+                try:
+                    info = await self.engine.get_execution_status(self.execution_id)
+                except Exception as e:
+                    # Upstream trouble: keep watching, more slowly
+                    logger.warning(f"Polling execution {self.execution_id} failed: {e}")
+                    self.error = e
+                    changed = False
+                else:
+                    self.polls += 1
+                    self.error = None
+                    if info is None:
+                        await self._publish(None, done=True)
+                        return
+                    changed = self.latest is None or info.status != self.latest.status
+                    await self._publish(info, done=info.status in TERMINAL_STATUSES)
+                    if self.done:
+                        return
+                delay = EXECUTION_POLL_MIN if changed else min(delay * EXECUTION_POLL_BACKOFF, EXECUTION_POLL_MAX)
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Watcher for execution {self.execution_id} crashed")
+            self.error = e
+            await self._publish(None, done=True)
+    
+    @property
+    def failed(self) -> bool:
+        """The last poll failed and the run is not known to have finished."""
+        return self.error is not None and (
+            self.latest is None or self.latest.status not in TERMINAL_STATUSES
+        )
+
+    async def wait_change(self, seen_version: int, timeout: float) -> bool:
+        """Wait until version > seen_version or done. False on timeout."""
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self.version > seen_version or self.done),
+                    max(0.0, timeout),
+                )
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+
+class ExecutionWatchers:
+    """Registry of live watchers, one per execution ID."""
+
+    def __init__(self):
+        self._watches: Dict[str, ExecutionWatch] = {}
+        self.started = 0
+        self.waits = 0
+
+    def _attach(self, engine: "WorkflowEngine", execution_id: str) -> ExecutionWatch:
+        watch = self._watches.get(execution_id)
+        # A watch belongs to its event loop; a finished one is not reused
+        if watch is None or watch.loop is not asyncio.get_running_loop() or watch.task.done():
+            watch = ExecutionWatch(engine, execution_id)
+            watch.task = watch.loop.create_task(watch.run())
+            watch.task.add_done_callback(lambda _: self._forget(watch))
+            self._watches[execution_id] = watch
+            self.started += 1
+        watch.waiters += 1
+        self.waits += 1
+        return watch
+
+    def _detach(self, watch: ExecutionWatch) -> None:
+        watch.waiters -= 1
+        if watch.waiters <= 0 and not watch.task.done():
+            watch.task.cancel()
+            self._forget(watch)
+
+    def _forget(self, watch: ExecutionWatch) -> None:
+        if self._watches.get(watch.execution_id) is watch:
+            del self._watches[watch.execution_id]
+
+    async def wait(
+        self,
+        engine: "WorkflowEngine",
+        execution_id: str,
+        timeout: float,
+    ) -> Optional[ExecutionInfo]:
+        """
+        Wait up to `timeout` seconds for the execution to finish.
+
+        Returns the terminal ExecutionInfo, the latest known one if the
+        timeout expired first, or None if the execution does not exist
+        (or has not been seen yet). Raises the polling error if the last
+        poll failed.
+        """
+        watch = self._attach(engine, execution_id)
+        try:
+            await self._wait_done(watch, timeout)
+            if watch.failed:
+                raise watch.error
+            return watch.latest
+        finally:
+            self._detach(watch)
+
+    async def _wait_done(self, watch: ExecutionWatch, timeout: float) -> None:
+        deadline = watch.loop.time() + timeout
+        seen = watch.version
+        while not watch.done:
+            if not await watch.wait_change(seen, deadline - watch.loop.time()):
+                return
+            seen = watch.version
+
+    async def updates(
+        self,
+        engine: "WorkflowEngine",
+        execution_id: str,
+        timeout: float,
+        heartbeat: Optional[float] = None,
+    ) -> AsyncIterator[Optional[ExecutionInfo]]:
+        """
+        Yield the execution on every status change until it finishes or
+        `timeout` expires. Yields None every `heartbeat` seconds without
+        a change, so streaming responses can keep the connection alive.
+        Raises the polling error at the end if the last poll failed.
+        """
+        watch = self._attach(engine, execution_id)
+        try:
+            deadline = watch.loop.time() + timeout
+            seen = 0
+            while True:
+                remaining = deadline - watch.loop.time()
+                if remaining <= 0:
+                    break
+                if not await watch.wait_change(seen, min(remaining, heartbeat or remaining)):
+                    if heartbeat and deadline - watch.loop.time() > 0:
+                        yield None
+                    continue
+                if watch.version > seen:
+                    seen = watch.version
+                    yield watch.latest
+                if watch.done:
+                    break
+            if watch.failed:
+                raise watch.error
+        finally:
+            self._detach(watch)
+
+    async def close(self) -> None:
+        """Cancel every watcher. Called on application shutdown."""
+        for watch in list(self._watches.values()):
+            watch.task.cancel()
+        self._watches.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            "active": len(self._watches),
+            "waiters": sum(w.waiters for w in self._watches.values()),
+            "active_polls": sum(w.polls for w in self._watches.values()),
+            "started": self.started,
+            "waits": self.waits,
+        }
+
+
+execution_watchers = ExecutionWatchers()
@@ -9,11 +9,15 @@ The adapter pattern isolates Activepieces implementation details from Bronn,
 supporting the future-proof upgrade strategy.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, AsyncIterator, Awaitable, Callable, Generic, Sequence, Tuple, TypeVar
+from dataclasses import dataclass, field
 from enum import Enum
 
+T = TypeVar("T")
+K = TypeVar("K")
+
 
 class WorkflowStatus(Enum):
     """Status of a workflow."""
@@ -43,6 +47,8 @@ class WorkflowInfo:
     created_at: str
     updated_at: str
     folder_id: Optional[str] = None
+    # Engine-native representation, for mirroring (not part of equality)
+    definition: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -57,6 +63,91 @@ class ExecutionInfo:
     error_message: Optional[str] = None
 
 
+@dataclass
+class Page(Generic[T]):
+    """One page of results and the cursor for the next (None on the last page)."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+async def paginate(
+    fetch_page: Callable[[Optional[str]], Awaitable[Page[T]]],
+    max_items: Optional[int] = None,
+) -> AsyncIterator[T]:
+    """
+    Yield items across pages, following next_cursor.
+    
+    The next page is requested as soon as the current one arrives, so its
+    round trip overlaps with the consumer's work on the current page. If
+    the consumer stops early (break, exception, max_items), the pending
+    prefetch is cancelled when the generator is closed; wrap it in
+    contextlib.aclosing() to close it deterministically.
+    """
+    pending = asyncio.ensure_future(fetch_page(None))
+    yielded = 0
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            if page.next_cursor and page.items:
+                pending = asyncio.ensure_future(fetch_page(page.next_cursor))
+            for item in page.items:
+                if max_items is not None and yielded >= max_items:
+                    return
+                yield item
+                yielded += 1
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+
+@dataclass
+class BulkResult(Generic[T]):
+    """Outcome of one item in a bulk operation: value on success, error otherwise."""
+    id: str
+    value: Optional[T] = None
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _describe_error(e: Exception) -> str:
+    response = getattr(e, "response", None)
+    if response is not None and getattr(response, "status_code", None):
+        return f"{response.status_code}: {e}"
+    return str(e) or type(e).__name__
+
+
+async def bulk_map(
+    items: Sequence[K],
+    fn: Callable[[K], Awaitable[T]],
+    key: Callable[[K], str],
+    concurrency: int,
+) -> List[BulkResult[T]]:
+    """
+    Run fn over items with at most `concurrency` calls in flight.
+    
+    Results come back in input order. A failing item is reported in its
+    BulkResult and does not affect the others; fn returning None (not
+    found) is reported as an error too.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def one(item: K) -> BulkResult[T]:
+        async with semaphore:
+            try:
+                value = await fn(item)
+            except Exception as e:
+                return BulkResult(key(item), error=_describe_error(e))
+        if value is None:
+            return BulkResult(key(item), error="Not found")
+        return BulkResult(key(item), value=value)
+    
+    return list(await asyncio.gather(*(one(item) for item in items)))
+
+
 class WorkflowEngine(ABC):
     """
     Abstract interface for workflow engine operations.
@@ -65,6 +156,9 @@ class WorkflowEngine(ABC):
     Bronn backend interacts ONLY through this interface.
     """
     
+    # Calls in flight per bulk operation; adapters raise this to fan out
+    bulk_concurrency: int = 1
+    
     @abstractmethod
     async def create_workflow(
         self,
@@ -203,3 +297,183 @@ class WorkflowEngine(ABC):
             List of ExecutionInfo objects
         """
         pass
+    
+    async def list_workflows_page(
+        self,
+        project_id: str,
+        folder_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Page[WorkflowInfo]:
+        """
+        One page of workflows with the cursor for the next page.
+        
+        Engines whose API returns a cursor should override this; the
+        default returns list_workflows() as a single, final page.
+        """
+        return Page(await self.list_workflows(project_id, folder_id, limit, cursor))
+    
+    async def list_executions_page(
+        self,
+        workflow_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Page[ExecutionInfo]:
+        """
+        One page of executions with the cursor for the next page.
+        
+        Engines whose API returns a cursor should override this; the
+        default returns list_executions() as a single, final page.
+        """
+        return Page(await self.list_executions(workflow_id, limit, cursor))
+    
+    async def list_project_ids(self, external_id: str) -> List[str]:
+        """
+        Engine projects provisioned for a Bronn workspace.
+        
+        Managed auth creates one engine project per workspace, with the
+        workspace ID as its external ID. Engines without that mapping keep
+        this default, which owns nothing.
+        
+        Args:
+            external_id: The Bronn workspace ID
+            
+        Returns:
+            IDs of the engine projects carrying that external ID
+        """
+        return []
+    
+    def iter_workflows(
+        self,
+        project_id: str,
+        folder_id: Optional[str] = None,
+        page_size: int = 100,
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[WorkflowInfo]:
+        """
+        Iterate over every workflow in a project, page by page.
+        
+        Args:
+            project_id: ID of the project/workspace
+            folder_id: Optional filter by folder
+            page_size: Results requested per page (a hint to the engine)
+            max_items: Stop after this many workflows
+            
+        Returns:
+            Async iterator of WorkflowInfo; the next page is prefetched
+        """
+        return paginate(
+            lambda cursor: self.list_workflows_page(project_id, folder_id, page_size, cursor),
+            max_items,
+        )
+    
+    def iter_executions(
+        self,
+        workflow_id: str,
+        page_size: int = 100,
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[ExecutionInfo]:
+        """
+        Iterate over every execution of a workflow, page by page.
+        
+        Args:
+            workflow_id: The workflow to get executions for
+            page_size: Results requested per page (a hint to the engine)
+            max_items: Stop after this many executions
+            
+        Returns:
+            Async iterator of ExecutionInfo; the next page is prefetched
+        """
+        return paginate(
+            lambda cursor: self.list_executions_page(workflow_id, page_size, cursor),
+            max_items,
+        )
+    
+    async def wait_for_execution(
+        self,
+        execution_id: str,
+        timeout: float = 30.0,
+    ) -> Optional[ExecutionInfo]:
+        """
+        Wait for an execution to reach a terminal status.
+        
+        Concurrent waiters on the same execution share one poller (see
+        execution_watch), so N callers cost the engine one poll stream.
+        
+        Args:
+            execution_id: The execution's unique identifier
+            timeout: Seconds to wait before returning the latest status
+            
+        Returns:
+            ExecutionInfo (terminal unless the timeout expired), or None
+            if the execution was not found
+            
+        Raises:
+            The engine's error if the last status poll failed
+        """
+        from .execution_watch import execution_watchers
+        return await execution_watchers.wait(self, execution_id, timeout)
+    
+    async def get_workflows(self, workflow_ids: Sequence[str]) -> List[BulkResult[WorkflowInfo]]:
+        """
+        Get several workflows by ID.
+        
+        Args:
+            workflow_ids: The workflows' unique identifiers
+            
+        Returns:
+            One BulkResult per ID, in the same order
+        """
+        return await bulk_map(workflow_ids, self.get_workflow, str, self.bulk_concurrency)
+    
+    async def update_workflow_statuses(
+        self,
+        statuses: Dict[str, WorkflowStatus],
+    ) -> List[BulkResult[WorkflowInfo]]:
+        """
+        Update the status of several workflows.
+        
+        Args:
+            statuses: New status per workflow ID
+            
+        Returns:
+            One BulkResult per workflow, in the mapping's order
+        """
+        return await bulk_map(
+            list(statuses.items()),
+            lambda item: self.update_workflow_status(*item),
+            lambda item: item[0],
+            self.bulk_concurrency,
+        )
+    
+    async def execute_workflows(
+        self,
+        batch: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+    ) -> List[BulkResult[ExecutionInfo]]:
+        """
+        Trigger several workflow executions.
+        
+        Args:
+            batch: (workflow_id, input_data) pairs
+            
+        Returns:
+            One BulkResult per pair, in the same order, keyed by workflow ID
+        """
+        return await bulk_map(
+            batch,
+            lambda item: self.execute_workflow(*item),
+            lambda item: item[0],
+            self.bulk_concurrency,
+        )
+    
+    async def get_execution_statuses(self, execution_ids: Sequence[str]) -> List[BulkResult[ExecutionInfo]]:
+        """
+        Get the status of several executions.
+        
+        Args:
+            execution_ids: The executions' unique identifiers
+            
+        Returns:
+            One BulkResult per ID, in the same order
+        """
+        return await bulk_map(execution_ids, self.get_execution_status, str, self.bulk_concurrency)